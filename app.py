@@ -1,9 +1,33 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 import numpy as np
-import random
+import io
+import hashlib
+import hmac
+import secrets
+import itertools
+import os
+import re
+import time
+
+from content import QUALITY_SYSTEMS, QUALITY_TOOLS, SIX_SIGMA, INTERVIEW_QA, QUIZ_QUESTIONS
+import msa
+import fmea
+import doe
+import stat_tests
+import capability
+import live_feed
+import spc
+import sigma
+import perf
+import report
+import skills
+import shared
+import permutation
+import procpool
 
 # ─────────────────────────────────────────────
 # PAGE CONFIG
@@ -14,509 +38,39 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+rerun_started = time.perf_counter()
 
 # ─────────────────────────────────────────────
-# CUSTOM CSS
+# CUSTOM CSS（static/style.css；Noto Sans SC 由 .streamlit/config.toml 的 theme.fontFaces 从 static/fonts 提供）
 # ─────────────────────────────────────────────
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@300;400;700&family=Rajdhani:wght@600;700&display=swap');
-
-html, body, [class*="css"] {
-    font-family: 'Noto Sans SC', sans-serif;
-}
-
-/* Main gradient background */
-.stApp {
-    background: linear-gradient(135deg, #0f0c29, #302b63, #24243e);
-    color: #e0e0e0;
-}
-
-/* Sidebar */
-[data-testid="stSidebar"] {
-    background: rgba(15, 12, 41, 0.95) !important;
-    border-right: 1px solid rgba(99, 179, 237, 0.2);
-}
-
-/* Cards */
-.card {
-    background: rgba(255,255,255,0.05);
-    border: 1px solid rgba(99,179,237,0.2);
-    border-radius: 12px;
-    padding: 20px;
-    margin: 10px 0;
-    backdrop-filter: blur(10px);
-    transition: all 0.3s ease;
-}
-.card:hover {
-    border-color: rgba(99,179,237,0.6);
-    background: rgba(255,255,255,0.08);
-}
+@perf.cache(st.cache_resource, show_spinner=False)
+def stylesheet():
+    # 每个进程只读取并压缩一次：去掉注释与多余空白
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "style.css"), encoding="utf-8") as f:
+        css = re.sub(r"/\*.*?\*/", "", f.read(), flags=re.S)
+    return re.sub(r"\s*([{};:,])\s*", r"\1", re.sub(r"\s+", " ", css)).strip()
 
-/* Hero Banner */
-.hero {
-    background: linear-gradient(90deg, rgba(99,179,237,0.15), rgba(168,85,247,0.15));
-    border: 1px solid rgba(99,179,237,0.3);
-    border-radius: 16px;
-    padding: 30px;
-    text-align: center;
-    margin-bottom: 20px;
-}
-.hero h1 {
-    font-family: 'Rajdhani', sans-serif;
-    font-size: 2.5em;
-    color: #63b3ed;
-    margin: 0;
-}
-.hero p { color: #a0aec0; font-size: 1.1em; }
-
-/* Tags */
-.tag {
-    display: inline-block;
-    background: rgba(99,179,237,0.2);
-    border: 1px solid rgba(99,179,237,0.4);
-    border-radius: 20px;
-    padding: 3px 12px;
-    font-size: 0.8em;
-    color: #63b3ed;
-    margin: 2px;
-}
-.tag-green {
-    background: rgba(72,187,120,0.2);
-    border-color: rgba(72,187,120,0.4);
-    color: #48bb78;
-}
-.tag-purple {
-    background: rgba(168,85,247,0.2);
-    border-color: rgba(168,85,247,0.4);
-    color: #a855f7;
-}
-.tag-orange {
-    background: rgba(237,137,54,0.2);
-    border-color: rgba(237,137,54,0.4);
-    color: #ed8936;
-}
-
-/* Section headers */
-.section-title {
-    font-family: 'Rajdhani', sans-serif;
-    font-size: 1.6em;
-    color: #63b3ed;
-    border-bottom: 2px solid rgba(99,179,237,0.3);
-    padding-bottom: 8px;
-    margin: 20px 0 15px 0;
-}
 
-/* Quiz buttons */
-.stButton > button {
-    background: linear-gradient(135deg, rgba(99,179,237,0.2), rgba(168,85,247,0.2));
-    border: 1px solid rgba(99,179,237,0.4);
-    color: #e0e0e0;
-    border-radius: 8px;
-    transition: all 0.3s;
-}
-.stButton > button:hover {
-    background: linear-gradient(135deg, rgba(99,179,237,0.4), rgba(168,85,247,0.4));
-    border-color: #63b3ed;
-    transform: translateY(-1px);
-}
-
-/* Metric cards */
-.metric-box {
-    background: rgba(99,179,237,0.1);
-    border: 1px solid rgba(99,179,237,0.3);
-    border-radius: 10px;
-    padding: 15px;
-    text-align: center;
-}
-.metric-num {
-    font-family: 'Rajdhani', sans-serif;
-    font-size: 2.5em;
-    color: #63b3ed;
-    line-height: 1;
-}
-.metric-label { color: #a0aec0; font-size: 0.85em; }
-
-/* Answer feedback */
-.correct { background: rgba(72,187,120,0.15); border: 1px solid rgba(72,187,120,0.4); border-radius: 8px; padding: 12px; color: #48bb78; }
-.wrong   { background: rgba(245,101,101,0.15); border: 1px solid rgba(245,101,101,0.4); border-radius: 8px; padding: 12px; color: #fc8181; }
-
-/* Info box */
-.info-box {
-    background: rgba(99,179,237,0.08);
-    border-left: 3px solid #63b3ed;
-    border-radius: 0 8px 8px 0;
-    padding: 12px 16px;
-    margin: 8px 0;
-    color: #cbd5e0;
-}
-
-/* Formula box */
-.formula {
-    background: rgba(168,85,247,0.1);
-    border: 1px dashed rgba(168,85,247,0.4);
-    border-radius: 8px;
-    padding: 12px 16px;
-    font-family: monospace;
-    color: #d6bcfa;
-    margin: 8px 0;
-}
-</style>
-""", unsafe_allow_html=True)
+st.html(f"<style>{stylesheet()}</style>")
 
 # ─────────────────────────────────────────────
-# DATA
+# SESSION STATE
 # ─────────────────────────────────────────────
-QUALITY_SYSTEMS = {
-    "ISO 9001": {
-        "icon": "🏆",
-        "full_name": "质量管理体系",
-        "tag": "体系认证",
-        "tag_color": "tag",
-        "version": "ISO 9001:2015",
-        "description": "全球最广泛采用的质量管理体系标准，基于七大质量管理原则，适用于任何规模和行业的组织。",
-        "principles": [
-            "以顾客为关注焦点",
-            "领导作用",
-            "全员积极参与",
-            "过程方法",
-            "改进",
-            "循证决策",
-            "关系管理"
-        ],
-        "key_clauses": {
-            "第4条": "组织环境（内外部议题、相关方需求）",
-            "第5条": "领导作用（质量方针、职责权限）",
-            "第6条": "策划（风险与机遇、质量目标）",
-            "第7条": "支持（资源、能力、意识、文件化信息）",
-            "第8条": "运行（产品和服务策划、外部供方控制）",
-            "第9条": "绩效评价（监视测量、内审、管理评审）",
-            "第10条": "改进（不合格品控制、纠正措施、持续改进）"
-        },
-        "pdca": "计划(Plan)→执行(Do)→检查(Check)→行动(Act) 是ISO 9001的核心循环"
-    },
-    "IATF 16949": {
-        "icon": "🚗",
-        "full_name": "汽车质量管理体系",
-        "tag": "汽车行业",
-        "tag_color": "tag-orange",
-        "version": "IATF 16949:2016",
-        "description": "汽车行业专用质量管理体系标准，在ISO 9001基础上增加汽车行业特定要求。",
-        "principles": [
-            "以顾客为导向",
-            "APQP产品质量先期策划",
-            "生产件批准程序PPAP",
-            "FMEA失效模式分析",
-            "测量系统分析MSA",
-            "统计过程控制SPC"
-        ],
-        "key_clauses": {
-            "顾客特定要求CSR": "各OEM客户的特殊要求须完全符合",
-            "产品安全": "安全相关零件需额外控制措施",
-            "保修与现场退回": "保修分析及根本原因调查",
-            "零缺陷目标": "以预防为主，向零缺陷迈进",
-            "分层过程审核LPA": "定期对制造过程进行分层审核",
-            "持续改进": "需制定年度改进目标和计划"
-        },
-        "pdca": "IATF 16949强调制造过程的稳健性和持续改进文化"
-    },
-    "ISO 14001": {
-        "icon": "🌱",
-        "full_name": "环境管理体系",
-        "tag": "环境体系",
-        "tag_color": "tag-green",
-        "version": "ISO 14001:2015",
-        "description": "国际环境管理体系标准，帮助组织识别、管理和减少环境影响，实现可持续发展目标。",
-        "principles": [
-            "生命周期视角",
-            "合规义务",
-            "环境绩效改进",
-            "基于风险的思维",
-            "领导力与承诺",
-            "持续改进"
-        ],
-        "key_clauses": {
-            "环境因素识别": "识别活动、产品和服务的环境因素",
-            "合规义务": "法律法规及其他要求的遵守",
-            "环境目标": "制定可测量的环境目标并跟踪",
-            "应急准备": "应对潜在紧急环境事故",
-            "内部审核": "定期评价体系有效性",
-            "管理评审": "最高管理者定期评审环境体系"
-        },
-        "pdca": "环境方针→规划→实施→检查→改进"
-    },
-    "ISO 45001": {
-        "icon": "⛑️",
-        "full_name": "职业健康安全管理",
-        "tag": "安全体系",
-        "tag_color": "tag-orange",
-        "version": "ISO 45001:2018",
-        "description": "职业健康安全管理体系标准，用于控制职业健康安全风险，防止工伤事故和职业病。",
-        "principles": [
-            "工人参与和协商",
-            "危险源识别和风险评估",
-            "法律合规",
-            "领导力与承诺",
-            "持续改进",
-            "应急准备和响应"
-        ],
-        "key_clauses": {
-            "危险源识别": "系统识别工作场所危险源",
-            "风险评估": "评估危险源相关风险和机遇",
-            "变更管理": "管理影响OH&S绩效的变更",
-            "采购控制": "控制供应商和承包商的OH&S",
-            "事件调查": "对事故、事件和不符合的调查",
-            "绩效监测": "监测、测量、分析OH&S绩效"
-        },
-        "pdca": "危险源识别→风险控制→实施→绩效评价→改进"
-    }
-}
+def new_quiz_stats():
+    # 作答时增量更新的计数器：侧边栏直接读取，不扫描作答历史
+    return {"total": 0, "correct": 0, "streak": 0, "best_streak": 0, "by_category": {}}
 
-QUALITY_TOOLS = {
-    "7大质量工具（QC七大工具）": {
-        "icon": "🔧",
-        "tools": [
-            {"name": "检查表 Check Sheet", "purpose": "数据收集和整理", "when": "数据收集阶段", "desc": "系统性收集和记录数据的表格，便于后续分析"},
-            {"name": "层别法 Stratification", "purpose": "数据分层分析", "when": "数据分析阶段", "desc": "将数据按类别分层，揭示不同类别间的差异"},
-            {"name": "柏拉图 Pareto Chart", "purpose": "识别主要问题", "when": "问题优先排序", "desc": "基于80/20原则，识别影响质量的主要因素"},
-            {"name": "因果图 Cause-Effect", "purpose": "根因分析", "when": "问题分析阶段", "desc": "鱼骨图/石川图，系统识别问题原因"},
-            {"name": "散点图 Scatter Diagram", "purpose": "相关性分析", "when": "关系验证阶段", "desc": "显示两个变量之间的关系和相关性"},
-            {"name": "直方图 Histogram", "purpose": "数据分布分析", "when": "过程能力评估", "desc": "显示数据的频率分布，评估过程稳定性"},
-            {"name": "控制图 Control Chart", "purpose": "过程监控", "when": "持续监控阶段", "desc": "基于统计控制限，实时监控过程变异"}
-        ]
-    },
-    "新7大管理工具": {
-        "icon": "📊",
-        "tools": [
-            {"name": "亲和图 Affinity Diagram", "purpose": "整理创意想法", "when": "头脑风暴后", "desc": "将大量想法归类整理，揭示主题和模式"},
-            {"name": "关联图 Relations Diagram", "purpose": "复杂关系分析", "when": "因果关系复杂时", "desc": "分析多个因素之间的因果关系"},
-            {"name": "系统图 Tree Diagram", "purpose": "目标分解", "when": "策略规划时", "desc": "将目标逐级分解为具体措施"},
-            {"name": "矩阵图 Matrix Diagram", "purpose": "多因素关系", "when": "需求与功能对比", "desc": "显示多组要素之间的关系和权重"},
-            {"name": "矩阵数据分析法", "purpose": "定量矩阵分析", "when": "数据量化分析", "desc": "对矩阵图中关系进行定量分析"},
-            {"name": "过程决策图 PDPC", "purpose": "风险预防", "when": "计划执行前", "desc": "预测可能出现的问题并制定对策"},
-            {"name": "箭线图 Arrow Diagram", "purpose": "项目进度管理", "when": "项目规划时", "desc": "规划和管理复杂项目的时间和资源"}
-        ]
-    },
-    "核心质量工具": {
-        "icon": "⚙️",
-        "tools": [
-            {"name": "FMEA 失效模式分析", "purpose": "预防性风险分析", "when": "设计/过程开发阶段", "desc": "识别潜在失效模式，评估风险优先数RPN，制定预防措施"},
-            {"name": "SPC 统计过程控制", "purpose": "过程实时监控", "when": "生产过程中", "desc": "使用控制图监控过程，区分普通原因和特殊原因变异"},
-            {"name": "MSA 测量系统分析", "purpose": "测量系统评估", "when": "新量具/过程验证时", "desc": "评估测量系统的重复性、再现性，确保测量数据可靠"},
-            {"name": "APQP 产品质量先期策划", "purpose": "产品开发质量策划", "when": "新产品开发阶段", "desc": "系统规划新产品开发过程，降低风险"},
-            {"name": "PPAP 生产件批准程序", "purpose": "供应商件批准", "when": "量产前", "desc": "验证供应商制造过程满足客户要求"},
-            {"name": "8D 问题解决", "purpose": "系统性问题解决", "when": "质量问题发生后", "desc": "8个步骤系统解决质量问题，防止再发"}
-        ]
-    }
-}
 
-SIX_SIGMA = {
-    "基础概念": {
-        "icon": "📐",
-        "content": {
-            "什么是六西格玛": "六西格玛（6σ）是一种以数据为驱动的质量管理方法，目标是将过程缺陷率降低到百万分之3.4（DPMO），即过程能力达到6σ水平。",
-            "西格玛水平对照": {
-                "1σ": "68.27% 合格率，317,300 DPMO",
-                "2σ": "95.45% 合格率，45,500 DPMO",
-                "3σ": "99.73% 合格率，2,700 DPMO",
-                "4σ": "99.9937% 合格率，63 DPMO",
-                "5σ": "99.99994% 合格率，0.57 DPMO",
-                "6σ": "99.9999998% 合格率，0.002 DPMO（含1.5σ漂移后为3.4 DPMO）"
-            },
-            "关键指标": {
-                "DPMO": "每百万机会缺陷数 = (缺陷数 / 机会总数) × 1,000,000",
-                "Cp": "过程能力指数 = (USL - LSL) / 6σ",
-                "Cpk": "过程性能指数 = min[(USL-μ)/3σ, (μ-LSL)/3σ]",
-                "Pp/Ppk": "长期过程性能指数（用总体标准差）"
-            }
-        }
-    },
-    "DMAIC方法论": {
-        "icon": "🔄",
-        "phases": {
-            "D - Define 定义": {
-                "color": "#63b3ed",
-                "goal": "定义项目范围、顾客需求和业务目标",
-                "tools": ["项目章程 Project Charter", "SIPOC图", "顾客之声VOC", "CTQ树（关键质量特性）", "帕累托图"],
-                "outputs": ["项目章程", "SIPOC流程图", "CTQ指标", "项目计划"]
-            },
-            "M - Measure 测量": {
-                "color": "#48bb78",
-                "goal": "建立基准，量化当前过程性能",
-                "tools": ["过程流程图", "数据收集计划", "MSA测量系统分析", "过程能力分析", "基线σ水平"],
-                "outputs": ["过程基准数据", "MSA报告", "过程σ水平"]
-            },
-            "A - Analyze 分析": {
-                "color": "#ed8936",
-                "goal": "识别根本原因，分析影响质量的关键因素",
-                "tools": ["因果图鱼骨图", "假设检验", "回归分析", "方差分析ANOVA", "5Why分析"],
-                "outputs": ["根本原因列表", "关键X因子验证", "数据统计分析报告"]
-            },
-            "I - Improve 改善": {
-                "color": "#a855f7",
-                "goal": "开发和实施解决方案，验证改善效果",
-                "tools": ["头脑风暴", "DOE实验设计", "Poka-Yoke防错法", "FMEA", "试点方案"],
-                "outputs": ["改善方案", "试点结果", "改善后σ水平"]
-            },
-            "C - Control 控制": {
-                "color": "#f6e05e",
-                "goal": "维持改善成果，建立标准化控制机制",
-                "tools": ["控制计划", "SPC统计过程控制", "标准作业程序SOP", "培训计划", "反应计划"],
-                "outputs": ["控制计划", "SPC控制图", "更新的SOP", "项目收益总结"]
-            }
-        }
-    },
-    "统计工具": {
-        "icon": "📊",
-        "content": [
-            {"name": "假设检验", "desc": "检验样本数据是否支持总体假设，包括t检验、F检验、卡方检验等", "formula": "H₀: μ₁ = μ₂（零假设）  H₁: μ₁ ≠ μ₂（备择假设）"},
-            {"name": "方差分析 ANOVA", "desc": "比较多组均值是否存在显著差异，分析因子对结果的影响", "formula": "F = 组间方差(MSB) / 组内方差(MSW)"},
-            {"name": "回归分析", "desc": "建立自变量（X）与因变量（Y）之间的数学关系模型", "formula": "Y = β₀ + β₁X₁ + β₂X₂ + ... + ε"},
-            {"name": "实验设计 DOE", "desc": "系统安排实验，同时研究多个因素对结果的影响", "formula": "全因子设计: 实验次数 = L^k（L=水平数，k=因子数）"},
-            {"name": "过程能力分析", "desc": "量化过程满足规格要求的能力", "formula": "Cp = (USL-LSL)/6σ；Cpk = min[(USL-μ)/3σ, (μ-LSL)/3σ]"}
-        ]
-    },
-    "角色与认证": {
-        "icon": "🎓",
-        "roles": {
-            "白带 White Belt": "了解六西格玛基本概念，参与改善项目",
-            "黄带 Yellow Belt": "掌握基础工具，参与并支持绿带/黑带项目",
-            "绿带 Green Belt": "掌握DMAIC方法论和统计工具，能独立主导中小型改善项目",
-            "黑带 Black Belt": "精通六西格玛所有工具，全职推动改善，辅导绿带",
-            "大黑带 Master Black Belt": "组织内六西格玛专家，制定战略，培训黑带"
-        }
-    }
-}
+def record_answer(stats, category, correct):
+    stats["total"] += 1
+    stats["correct"] += correct
+    stats["streak"] = stats["streak"] + 1 if correct else 0
+    stats["best_streak"] = max(stats["best_streak"], stats["streak"])
+    counts = stats["by_category"].setdefault(category, [0, 0])  # [答对, 作答]
+    counts[0] += correct
+    counts[1] += 1
 
-INTERVIEW_QA = [
-    {
-        "category": "质量体系",
-        "q": "ISO 9001:2015的七大质量管理原则是什么？",
-        "a": "七大原则：①以顾客为关注焦点、②领导作用、③全员积极参与、④过程方法、⑤改进、⑥循证决策、⑦关系管理。记忆法：顾客领导全员，过程改进，循证关系。",
-        "level": "基础"
-    },
-    {
-        "category": "质量体系",
-        "q": "IATF 16949与ISO 9001的主要区别是什么？",
-        "a": "IATF 16949是在ISO 9001基础上增加了汽车行业特定要求：①APQP产品质量先期策划、②PPAP生产件批准程序、③FMEA失效模式分析、④SPC统计过程控制、⑤MSA测量系统分析，以及各OEM的顾客特定要求(CSR)。",
-        "level": "中级"
-    },
-    {
-        "category": "质量工具",
-        "q": "什么是FMEA？RPN如何计算？",
-        "a": "FMEA（失效模式与影响分析）是预防性质量工具，系统识别产品/过程的潜在失效模式。RPN = 严重度(S) × 发生度(O) × 探测度(D)，每项评分1-10分，RPN越高风险越大（一般>100需优先采取措施）。",
-        "level": "中级"
-    },
-    {
-        "category": "六西格玛",
-        "q": "解释Cp和Cpk的区别？",
-        "a": "Cp是过程能力指数，衡量过程固有能力（规格宽度÷过程宽度），不考虑过程均值偏移。Cpk考虑了均值偏移，= min[(USL-μ)/3σ, (μ-LSL)/3σ]。Cp≥Cpk，当Cp=Cpk时表示过程居中。行业一般要求Cpk≥1.33（4σ）",
-        "level": "中级"
-    },
-    {
-        "category": "六西格玛",
-        "q": "DMAIC五个阶段各自的主要目标是什么？",
-        "a": "D(Define定义)：明确项目范围和顾客需求；M(Measure测量)：量化当前过程基准；A(Analyze分析)：找到根本原因；I(Improve改善)：实施和验证解决方案；C(Control控制)：维持改善成果，防止问题复发。",
-        "level": "基础"
-    },
-    {
-        "category": "质量工具",
-        "q": "什么是MSA（测量系统分析），Gage R&R是什么？",
-        "a": "MSA评估测量系统的可靠性。Gage R&R（量规重复性与再现性）是MSA的核心，包括：重复性(Repeatability)=同一操作员用同一量具重复测量的变差；再现性(Reproducibility)=不同操作员之间的变差。判定标准：%R&R<10%优秀，10-30%可接受，>30%不可接受。",
-        "level": "高级"
-    },
-    {
-        "category": "质量工具",
-        "q": "SPC控制图中的8条判异规则是什么？",
-        "a": "①1点超出控制限；②连续9点在中心线同侧；③连续6点递增或递减；④连续14点交替上下；⑤连续3点中有2点在2σ~3σ；⑥连续5点中有4点在1σ~3σ；⑦连续15点在1σ内（过于稳定）；⑧连续8点在1σ~3σ（两侧）。",
-        "level": "高级"
-    },
-    {
-        "category": "质量体系",
-        "q": "内部审核的目的和基本步骤是什么？",
-        "a": "目的：验证质量体系是否有效运行，发现不符合项和改进机会。步骤：①制定审核计划→②编制检查表→③召开首次会议→④现场审核（访谈/观察/查证）→⑤整理审核发现→⑥召开末次会议→⑦发布审核报告→⑧跟踪纠正措施。",
-        "level": "中级"
-    },
-    {
-        "category": "六西格玛",
-        "q": "什么是DOE（实验设计），与传统试验法有什么区别？",
-        "a": "DOE是系统地安排实验、研究多个因素对结果影响的统计方法。与传统OFAT（一次改变一个因素）相比：①效率更高，实验次数少；②能研究因素间的交互作用；③结果更可靠，有统计显著性保证；④可建立因素与响应的数学模型。常用设计：全因子、部分因子、中心复合设计(CCD)、田口方法。",
-        "level": "高级"
-    },
-    {
-        "category": "质量工具",
-        "q": "8D问题解决法的步骤是什么？",
-        "a": "D0:准备（评估是否需要8D）；D1:成立小组；D2:描述问题（5W2H）；D3:实施临时措施（遏制行动）；D4:确定并验证根本原因；D5:选择和验证永久纠正措施；D6:实施和验证永久纠正措施；D7:预防再发（横向展开）；D8:祝贺小组和总结。",
-        "level": "基础"
-    }
-]
-
-QUIZ_QUESTIONS = [
-    {
-        "q": "ISO 9001:2015基于几大质量管理原则？",
-        "options": ["5大原则", "6大原则", "7大原则", "8大原则"],
-        "correct": 2,
-        "explain": "ISO 9001:2015基于7大质量管理原则：顾客焦点、领导作用、全员参与、过程方法、改进、循证决策、关系管理（2015版从8大原则调整为7大）。"
-    },
-    {
-        "q": "六西格玛水平对应的DPMO（每百万机会缺陷数）约为多少？",
-        "options": ["3.4", "34", "340", "3400"],
-        "correct": 0,
-        "explain": "六西格玛对应3.4 DPMO（含1.5σ的长期漂移）。这意味着每百万次机会中只有3.4次缺陷，即99.99966%的合格率。"
-    },
-    {
-        "q": "FMEA中RPN的计算公式是？",
-        "options": ["S + O + D", "S × O × D", "S × O / D", "(S + O + D) / 3"],
-        "correct": 1,
-        "explain": "RPN（风险优先数）= 严重度(Severity) × 发生度(Occurrence) × 探测度(Detection)，每项1-10分，RPN最大为1000。"
-    },
-    {
-        "q": "Cpk ≥ 多少通常被认为是过程能力良好的最低要求？",
-        "options": ["1.00", "1.33", "1.50", "1.67"],
-        "correct": 1,
-        "explain": "行业普遍要求Cpk ≥ 1.33（对应4σ水平）。汽车行业关键特性通常要求Cpk ≥ 1.67（5σ水平）。"
-    },
-    {
-        "q": "在DMAIC方法中，'Analyze（分析）'阶段的主要目标是？",
-        "options": ["收集过程数据", "识别根本原因", "实施解决方案", "定义项目范围"],
-        "correct": 1,
-        "explain": "Analyze阶段的核心是通过数据分析（鱼骨图、假设检验、回归分析等）识别导致问题的根本原因（关键X因子）。"
-    },
-    {
-        "q": "Gage R&R结果中，%R&R小于多少认为测量系统优秀？",
-        "options": ["5%", "10%", "20%", "30%"],
-        "correct": 1,
-        "explain": "%R&R < 10%：优秀可接受；10%-30%：视情况可接受；> 30%：不可接受，需改进测量系统。"
-    },
-    {
-        "q": "柏拉图（Pareto Chart）基于哪个原则？",
-        "options": ["50/50原则", "70/30原则", "80/20原则", "90/10原则"],
-        "correct": 2,
-        "explain": "柏拉图基于80/20原则（帕累托法则）：80%的问题/缺陷来自20%的原因。帮助团队聚焦最重要的少数关键因素。"
-    },
-    {
-        "q": "PPAP（生产件批准程序）中，最完整的提交等级是第几级？",
-        "options": ["1级", "2级", "3级", "5级"],
-        "correct": 2,
-        "explain": "PPAP有5个提交等级，3级是标准提交级别（提交样件和完整文件包），1级只提交合规保证书，5级在客户现场审查。"
-    },
-    {
-        "q": "控制图中，UCL和LCL通常设定在中心线±多少σ？",
-        "options": ["±1σ", "±2σ", "±3σ", "±6σ"],
-        "correct": 2,
-        "explain": "控制限通常设在±3σ（99.73%的正常变异在此范围内），超出控制限的点表示可能存在特殊原因变异，需要调查。"
-    },
-    {
-        "q": "8D问题解决法中，'遏制行动'属于哪个步骤？",
-        "options": ["D1", "D2", "D3", "D4"],
-        "correct": 2,
-        "explain": "D3是实施临时遏制措施（Containment Actions），目的是在找到根本原因之前，立即保护顾客不受问题影响。"
-    }
-]
 
-# ─────────────────────────────────────────────
-# SESSION STATE
-# ─────────────────────────────────────────────
 if "quiz_idx" not in st.session_state:
     st.session_state.quiz_idx = 0
 if "quiz_score" not in st.session_state:
@@ -525,52 +79,214 @@ if "quiz_answered" not in st.session_state:
     st.session_state.quiz_answered = False
 if "quiz_selected" not in st.session_state:
     st.session_state.quiz_selected = None
-if "quiz_history" not in st.session_state:
-    st.session_state.quiz_history = []
-if "shuffled_quiz" not in st.session_state:
-    shuffled = QUIZ_QUESTIONS.copy()
-    random.shuffle(shuffled)
-    st.session_state.shuffled_quiz = shuffled
+if "quiz_stats" not in st.session_state:
+    st.session_state.quiz_stats = new_quiz_stats()
+if "quiz_seed" not in st.session_state:
+    # 每个会话独立的出题种子；URL 加 ?quiz_seed=<种子> 可复现某一会话的题目顺序
+    try:
+        st.session_state.quiz_seed = int(st.query_params.get("quiz_seed", ""))
+    except ValueError:  # 未指定或不是整数（isdigit() 对 '²' 等字符也为真，不能用来判断）
+        st.session_state.quiz_seed = secrets.randbits(63)
 
 # ─────────────────────────────────────────────
-# SIDEBAR
+# ANALYTICS（按上传数据缓存）
 # ─────────────────────────────────────────────
-with st.sidebar:
-    st.markdown("""
-    <div style='text-align:center; padding:15px 0;'>
-        <div style='font-family:Rajdhani,sans-serif; font-size:1.5em; color:#63b3ed;'>🎯 质量工程师</div>
-        <div style='color:#a0aec0; font-size:0.85em;'>学习备考平台</div>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    st.divider()
-    
-    menu = st.radio(
-        "导航",
-        ["🏠 首页总览", "📋 质量体系", "🔧 质量工具", "📐 六西格玛", "💼 面试题库", "🧠 随机测验", "📊 能力图谱"],
-        label_visibility="collapsed"
-    )
-    
-    st.divider()
-    
-    if st.session_state.quiz_history:
-        total = len(st.session_state.quiz_history)
-        correct = sum(st.session_state.quiz_history)
-        pct = correct / total * 100
-        st.markdown(f"""
-        <div style='text-align:center;'>
-            <div style='font-size:0.8em; color:#a0aec0;'>测验成绩</div>
-            <div style='font-size:2em; color:{"#48bb78" if pct>=70 else "#ed8936" if pct>=50 else "#fc8181"}; font-family:Rajdhani,sans-serif;'>{pct:.0f}%</div>
-            <div style='font-size:0.75em; color:#718096;'>{correct}/{total} 题正确</div>
-        </div>
-        """, unsafe_allow_html=True)
+@perf.cache(st.cache_data, show_spinner=False)
+def read_csv_cached(raw):
+    return pd.read_csv(io.BytesIO(raw))
+
+
+@perf.cache(st.cache_data, show_spinner=False)
+def msa_array_cached(raw):
+    return msa.to_array(read_csv_cached(raw))
+
+
+@perf.cache(st.cache_data, show_spinner=False)
+def gage_rr_cached(y, tolerance, method):
+    if method == "ANOVA法":
+        return msa.gage_rr_anova(y, tolerance)
+    return msa.gage_rr_xbar_r(y, tolerance)
+
+
+@perf.cache(st.cache_data, show_spinner=False)
+def fmea_demo_cached(n_rows):
+    return fmea.demo_frame(n_rows)
+
+
+@perf.cache(st.cache_data, show_spinner=False)
+def doe_design_cached(k, generators):
+    return doe.design_matrix(k, list(generators))
+
+
+@perf.cache(st.cache_data, show_spinner=False)
+def doe_csv_cached(k, generators):
+    # 完整设计矩阵的 CSV 字节与设计本身一同缓存，重跑时不再重新编码
+    levels = doe_design_cached(k, generators)
+    return pd.DataFrame(levels, columns=list(doe.FACTOR_NAMES[:k])).to_csv(index_label="run").encode("utf-8")
+
+
+@perf.cache(st.cache_data, show_spinner=False)
+def report_cached(fp, _X, chars, lsl, usl):
+    # 报告的汇总表与图表规格按 (数据指纹, 规格限) 缓存，重复导出直接复用
+    summary, fits, best = report.study(_X, list(chars), lsl, usl)
+    return summary, report.chart_specs(_X, summary, fits, best)
+
+
+@perf.cache(st.cache_data, show_spinner=False)
+def fit_capability_cached(fp, _X):
+    # 以数据指纹为缓存键，大矩阵本身不参与哈希
+    return capability.fit_all(_X)
+
+
+@perf.cache(st.cache_resource, show_spinner=False)
+def recommend_index():
+    # 题库与页面内容的 TF-IDF 索引；设置 QLA_SHARED_DIR 时由各工作进程共享同一份
+    return shared.recommend_index()
+
+
+@perf.cache(st.cache_resource, show_spinner=False)
+def skill_store():
+    # 进程内共享一个连接；首次启动时生成 5000 人的演示组织
+    store = skills.SkillStore(os.environ.get("QLA_SKILLS_DB", os.path.join(os.path.dirname(__file__), "skills.db")))
+    if not len(store):
+        skills.seed_demo(store)
+    return store
+
+
+# ─────────────────────────────────────────────
+# PERF（隐藏管理面板：设置 QLA_ADMIN_TOKEN 后，URL 加 ?admin=<令牌> 开启；未设置时不开放）
+# ─────────────────────────────────────────────
+@st.cache_resource(show_spinner=False)
+def metrics_server():
+    # 设置 QLA_METRICS_PORT 时在该端口提供 Prometheus /metrics（默认仅本机，QLA_METRICS_HOST 可改）
+    return perf.serve_metrics()
+
+
+def admin_panel():
+    with st.sidebar.expander("⚙️ 性能监控", expanded=True):
+        rows = perf.REGISTRY.rows()
+        if rows:
+            st.dataframe(pd.DataFrame(rows).round(4), use_container_width=True, hide_index=True)
+        cache_rows = perf.REGISTRY.cache_rows()
+        if cache_rows:
+            st.dataframe(pd.DataFrame(cache_rows).round(3), use_container_width=True, hide_index=True)
+        st.caption("图表规格缓存（压缩后按内容哈希复用，LRU）")
+        st.dataframe(pd.DataFrame([perf.FIGURES.stats()]).round(3), use_container_width=True, hide_index=True)
+        st.download_button("导出 Prometheus 文本", perf.REGISTRY.prometheus(), "metrics.prom", "text/plain",
+                           use_container_width=True)
+        c1, c2 = st.columns(2)
+        # 回调在重跑前执行，因此本次点击触发的重跑即被剖析
+        c1.button("剖析一次重跑", key="perf_profile_btn", use_container_width=True,
+                  on_click=lambda: st.session_state.update(perf_profile=True))
+        c2.button("清空指标", key="perf_reset", use_container_width=True, on_click=perf.REGISTRY.reset)
+        if "perf_report" in st.session_state:
+            st.code(st.session_state.perf_report, language=None)
+
+
+def admin_enabled():
+    # 未设置令牌时一律关闭；常量时间比较，避免按响应时间逐字符猜测
+    token = os.environ.get("QLA_ADMIN_TOKEN", "")
+    given = st.query_params.get("admin", "")
+    return bool(token) and hmac.compare_digest(given.encode(), token.encode())
+
+
+metrics_server()
+is_admin = admin_enabled()
+
+# ─────────────────────────────────────────────
+# LIVE CHARTS（st.fragment：每次刷新只重跑本片段）
+# ─────────────────────────────────────────────
+LIVE_MAX_SOURCES = 8  # 进程内同时采集的数据源上限，超出时最久未用的被停止
+
+
+@perf.cache(st.cache_resource, show_spinner=False, max_entries=LIVE_MAX_SOURCES, on_release=lambda w: w.stop())
+def live_worker(kind, target, subgroup_size):
+    # 同一数据源在进程内只采集一次，所有会话共享；被逐出缓存时停止采集线程
+    if kind == "SQLite":
+        source = live_feed.SQLiteSource(target)
+    elif kind == "CSV":
+        source = live_feed.CSVTailSource(target)
+    elif kind == "Socket":
+        source = live_feed.SocketSource(*live_feed.parse_address(target))
+    else:
+        source = live_feed.SimulatedSource()
+    return live_feed.IngestionWorker(source, live_feed.ChartState(subgroup_size)).start()
+
+
+def release_live_lease(lease):
+    *args, worker = lease
+    # 最后一个使用者离开：停止采集并移出共享缓存
+    if worker.release():
+        live_worker.clear(*args)
+
+
+@perf.cache(st.cache_resource, show_spinner=False, scope="session", max_entries=1, on_release=release_live_lease)
+def live_lease(kind, target, subgroup_size):
+    # 本会话对共享采集线程的占用；切换数据源、关闭开关或会话断开时释放
+    worker = live_worker(kind, target, subgroup_size)
+    worker.acquire()
+    return kind, target, subgroup_size, worker
+
+
+def live_chart(title, index, values, limits, fmt):
+    lcl, cl, ucl = limits
+    fig = perf.figure()
+    colors = ['#fc8181' if (v > ucl or v < lcl) else '#63b3ed' for v in values]
+    fig.add_trace(go.Scatter(x=index, y=values, mode='lines+markers', line=dict(color='#63b3ed', width=1.5),
+                             marker=dict(color=colors, size=7), name=title))
+    fig.add_hline(y=ucl, line=dict(color='#fc8181', dash='dash', width=2), annotation_text=f"UCL={ucl:{fmt}}")
+    fig.add_hline(y=cl, line=dict(color='#48bb78', width=2), annotation_text=f"CL={cl:{fmt}}")
+    fig.add_hline(y=lcl, line=dict(color='#fc8181', dash='dash', width=2), annotation_text=f"LCL={lcl:{fmt}}")
+    fig.update_layout(title=title, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
+                      font=dict(color='#e0e0e0'), xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
+                      yaxis=dict(gridcolor='rgba(255,255,255,0.1)'), height=320, showlegend=False,
+                      uirevision=title)
+    return fig
+
+
+@perf.section
+def render_live_charts(worker):
+    if worker.error is not None:
+        st.error(f"数据源异常：{worker.error}")
+        return
+    snap = worker.state.snapshot()
+    if snap is None:
+        st.info("等待数据…")
+        return
+    m1, m2, m3 = st.columns(3)
+    m1.metric("已接收行数", f"{snap['rows']:,}")
+    m2.metric("子组数", f"{snap['subgroups']:,}")
+    m3.metric("累计不良率", f"{snap['p_overall']:.2%}")
+    st.caption(f"控制限基于前 {snap['baseline']} 个子组" + ("（基准期已满，控制限固定）" if snap['frozen'] else "（试行控制限，基准期未满）")
+               + f"；图中显示最近 {len(snap['index'])} 个子组")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        perf.plotly_chart(live_chart("X-bar 图（实时）", snap['index'], snap['xbar'], snap['xbar_limits'], ".3f"),
+                          "live_xbar", use_container_width=True)
+    with c2:
+        perf.plotly_chart(live_chart("R 图（实时）", snap['index'], snap['r'], snap['r_limits'], ".3f"),
+                          "live_r", use_container_width=True)
+    with c3:
+        perf.plotly_chart(live_chart("p 图（实时）", snap['index'], snap['p'], snap['p_limits'], ".3f"),
+                          "live_p", use_container_width=True)
+
 
 # ─────────────────────────────────────────────
 # PAGES
 # ─────────────────────────────────────────────
+# 页面与交互区块都是函数：带控件的区块用 st.fragment 包装，
+# 控件变化时只重跑所在区块，不再重新执行整个脚本。
+def rerun_fragment():
+    # 整页运行（如切换页面后的首次渲染）时不存在片段重跑，退回整页重跑
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
 
 # ─── 首页 ───
-if menu == "🏠 首页总览":
+@perf.section
+def page_home():
     st.markdown("""
     <div class='hero'>
         <h1>🎯 质量工程师学习平台</h1>
@@ -627,28 +343,34 @@ if menu == "🏠 首页总览":
         "持续改进": 85
     }
     
-    fig = go.Figure(go.Scatterpolar(
-        r=list(skills.values()),
-        theta=list(skills.keys()),
-        fill='toself',
-        fillcolor='rgba(99,179,237,0.2)',
-        line=dict(color='#63b3ed', width=2),
-    ))
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(visible=True, range=[0, 100], gridcolor='rgba(255,255,255,0.1)', tickfont=dict(color='#a0aec0')),
-            angularaxis=dict(gridcolor='rgba(255,255,255,0.1)', tickfont=dict(color='#e0e0e0'))
-        ),
-        showlegend=False,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=350,
-        margin=dict(l=50, r=50, t=30, b=30)
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    def build():
+        fig = go.Figure(go.Scatterpolar(
+            r=list(skills.values()),
+            theta=list(skills.keys()),
+            fill='toself',
+            fillcolor='rgba(99,179,237,0.2)',
+            line=dict(color='#63b3ed', width=2),
+        ))
+        fig.update_layout(
+            polar=dict(
+                radialaxis=dict(visible=True, range=[0, 100], gridcolor='rgba(255,255,255,0.1)', tickfont=dict(color='#a0aec0')),
+                angularaxis=dict(gridcolor='rgba(255,255,255,0.1)', tickfont=dict(color='#e0e0e0'))
+            ),
+            showlegend=False,
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            height=350,
+            margin=dict(l=50, r=50, t=30, b=30)
+        )
+        return fig
+    
+    perf.cached_chart("home_overview", build, skills, use_container_width=True)
+
 
 # ─── 质量体系 ───
-elif menu == "📋 质量体系":
+@st.fragment
+@perf.section
+def page_systems():
     st.markdown("<div class='hero'><h1>📋 质量管理体系</h1><p>ISO 9001 · IATF 16949 · ISO 14001 · ISO 45001</p></div>", unsafe_allow_html=True)
     
     selected = st.selectbox("选择体系标准", list(QUALITY_SYSTEMS.keys()), format_func=lambda x: f"{QUALITY_SYSTEMS[x]['icon']} {x} - {QUALITY_SYSTEMS[x]['full_name']}")
@@ -684,31 +406,275 @@ elif menu == "📋 质量体系":
     # PDCA Diagram
     st.markdown("<div class='section-title'>PDCA 循环</div>", unsafe_allow_html=True)
     
-    fig = go.Figure()
-    pdca_data = [
-        ('Plan<br>计划',  '#63b3ed', 'rgba(99,179,237,0.27)',  0.25, 0.75),
-        ('Do<br>执行',   '#48bb78', 'rgba(72,187,120,0.27)',  0.75, 0.75),
-        ('Check<br>检查','#ed8936', 'rgba(237,137,54,0.27)',  0.75, 0.25),
-        ('Act<br>行动',  '#a855f7', 'rgba(168,85,247,0.27)',  0.25, 0.25),
-    ]
-    for label, color, fillc, x, y in pdca_data:
-        fig.add_shape(type='circle', x0=x-0.18, y0=y-0.18, x1=x+0.18, y1=y+0.18,
-                      fillcolor=fillc, line=dict(color=color, width=2))
-        fig.add_annotation(x=x, y=y, text=f"<b>{label}</b>", showarrow=False,
-                           font=dict(color='white', size=14), align='center')
-    
-    arrows = [(0.43, 0.75, 0.57, 0.75), (0.75, 0.57, 0.75, 0.43), (0.57, 0.25, 0.43, 0.25), (0.25, 0.43, 0.25, 0.57)]
-    for x0, y0, x1, y1 in arrows:
-        fig.add_annotation(x=x1, y=y1, ax=x0, ay=y0, xref='x', yref='y', axref='x', ayref='y',
-                           arrowhead=2, arrowwidth=2, arrowcolor='#a0aec0')
-    
-    fig.update_layout(xaxis=dict(range=[0,1], visible=False), yaxis=dict(range=[0,1], visible=False),
-                      paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=250,
-                      margin=dict(l=20,r=20,t=20,b=20))
-    st.plotly_chart(fig, use_container_width=True)
+    # 静态图：各会话共用同一份缓存规格
+    def build():
+        fig = go.Figure()
+        pdca_data = [
+            ('Plan<br>计划',  '#63b3ed', 'rgba(99,179,237,0.27)',  0.25, 0.75),
+            ('Do<br>执行',   '#48bb78', 'rgba(72,187,120,0.27)',  0.75, 0.75),
+            ('Check<br>检查','#ed8936', 'rgba(237,137,54,0.27)',  0.75, 0.25),
+            ('Act<br>行动',  '#a855f7', 'rgba(168,85,247,0.27)',  0.25, 0.25),
+        ]
+        for label, color, fillc, x, y in pdca_data:
+            fig.add_shape(type='circle', x0=x-0.18, y0=y-0.18, x1=x+0.18, y1=y+0.18,
+                          fillcolor=fillc, line=dict(color=color, width=2))
+            fig.add_annotation(x=x, y=y, text=f"<b>{label}</b>", showarrow=False,
+                               font=dict(color='white', size=14), align='center')
+        
+        arrows = [(0.43, 0.75, 0.57, 0.75), (0.75, 0.57, 0.75, 0.43), (0.57, 0.25, 0.43, 0.25), (0.25, 0.43, 0.25, 0.57)]
+        for x0, y0, x1, y1 in arrows:
+            fig.add_annotation(x=x1, y=y1, ax=x0, ay=y0, xref='x', yref='y', axref='x', ayref='y',
+                               arrowhead=2, arrowwidth=2, arrowcolor='#a0aec0')
+        
+        fig.update_layout(xaxis=dict(range=[0,1], visible=False), yaxis=dict(range=[0,1], visible=False),
+                          paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=250,
+                          margin=dict(l=20,r=20,t=20,b=20))
+        return fig
+    
+    perf.cached_chart("pdca", build, use_container_width=True)
+
+
+# MSA 测量系统分析
+@st.fragment
+@perf.section
+def msa_section():
+    st.markdown("<div class='section-title'>📏 MSA 测量系统分析</div>", unsafe_allow_html=True)
+    
+    grr_tab, bias_tab, lin_tab, stab_tab = st.tabs(["Gage R&R", "偏倚 Bias", "线性 Linearity", "稳定性 Stability"])
+    
+    with grr_tab:
+        st.markdown("<div class='info-box'>上传长表 CSV，列为 <b>part, operator, trial, value</b>（平衡设计）；未上传时使用 10零件×3操作员×3次 的演示数据。</div>", unsafe_allow_html=True)
+        c1, c2, c3 = st.columns([2, 1, 1])
+        upload = c1.file_uploader("Gage R&R 数据", type="csv", key="msa_grr_csv")
+        method = c2.radio("计算方法", ["ANOVA法", "均值极差法"], key="msa_method")
+        tolerance = c3.number_input("公差 (USL-LSL)，0=不计算", 0.0, value=6.0, step=0.5, key="msa_tol")
+        
+        result = None
+        try:
+            if upload is not None:
+                y, parts, operators = msa_array_cached(upload.getvalue())
+            else:
+                y = msa.demo_study()
+                parts, operators = list(range(1, y.shape[0] + 1)), ["A", "B", "C"]
+            result = gage_rr_cached(y, tolerance or None, method)
+        except (ValueError, KeyError) as e:
+            st.error(f"数据格式错误：{e}")
+        
+        if result is not None:
+            pct_grr = float(result["pct_study_var"]["Gage R&R"])
+            verdict, v_color = msa.grr_verdict(pct_grr)
+            ndc = float(result["ndc"])
+            
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("零件×操作员×试验", "×".join(str(n) for n in y.shape))
+            m2.metric("%R&R（研究变差）", f"{pct_grr:.1f}%")
+            m3.metric("区分类别数 ndc", f"{int(ndc)}" if np.isfinite(ndc) else "—", "≥5 为合格")
+            m4.markdown(f"<div class='metric-box'><div class='metric-num' style='color:{v_color}; font-size:1.8em;'>{verdict}</div><div class='metric-label'>&lt;10% 优秀 · 10-30% 可接受</div></div>", unsafe_allow_html=True)
+            
+            if "anova" in result:
+                st.markdown("**方差分析表**" + ("（交互项不显著，已合并入重复性）" if result["interaction_pooled"] else ""))
+                anova = pd.DataFrame({k: [float(v) for v in vals] if k != "来源" else vals for k, vals in result["anova"].items()})
+                st.dataframe(anova.round(4), use_container_width=True, hide_index=True)
+            
+            st.markdown("**方差分量**")
+            st.dataframe(msa.components_table(result).round(3), use_container_width=True)
+            
+            bars = ["Gage R&R", "重复性 EV", "再现性 AV", "零件间 PV"]
+            fig = perf.figure()
+            fig.add_trace(go.Bar(x=bars, y=[float(result["pct_contribution"][k]) for k in bars], name='贡献率%', marker_color='#63b3ed'))
+            fig.add_trace(go.Bar(x=bars, y=[float(result["pct_study_var"][k]) for k in bars], name='%研究变差', marker_color='#a855f7'))
+            if "pct_tolerance" in result:
+                fig.add_trace(go.Bar(x=bars, y=[float(result["pct_tolerance"][k]) for k in bars], name='%公差', marker_color='#ed8936'))
+            fig.add_hline(y=10, line=dict(color='#48bb78', dash='dot'), annotation_text="10%")
+            fig.add_hline(y=30, line=dict(color='#fc8181', dash='dot'), annotation_text="30%")
+            fig.update_layout(title="变差分量", barmode='group',
+                              paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
+                              font=dict(color='#e0e0e0'), legend=dict(bgcolor='rgba(0,0,0,0)'),
+                              yaxis=dict(gridcolor='rgba(255,255,255,0.1)'), height=350)
+            perf.plotly_chart(fig, "grr_components", use_container_width=True)
+            
+            # 操作员×零件交互图
+            cell = y.mean(axis=2)
+            fig = perf.figure()
+            for j, op in enumerate(operators):
+                fig.add_trace(go.Scatter(x=[str(p) for p in parts], y=cell[:, j].tolist(), mode='lines+markers', name=f'操作员 {op}'))
+            fig.update_layout(title="操作员×零件 交互图", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
+                              font=dict(color='#e0e0e0'), legend=dict(bgcolor='rgba(0,0,0,0)'),
+                              xaxis=dict(gridcolor='rgba(255,255,255,0.1)'), yaxis=dict(gridcolor='rgba(255,255,255,0.1)'), height=350)
+            perf.plotly_chart(fig, "grr_interaction", use_container_width=True)
+    
+    with bias_tab:
+        c1, c2 = st.columns([2, 1])
+        upload = c1.file_uploader("偏倚数据（列 value，同一标准件重复测量）", type="csv", key="msa_bias_csv")
+        reference = c2.number_input("参考值", value=5.0, step=0.01, key="msa_bias_ref")
+        bias = None
+        try:
+            if upload is not None:
+                values = read_csv_cached(upload.getvalue())["value"].to_numpy(dtype=float)
+            else:
+                values = np.random.default_rng(7).normal(5.02, 0.03, 15)
+            bias = msa.bias_study(values, reference)
+        except (KeyError, ValueError) as e:
+            st.error(f"数据格式错误：{e}")
+        if bias is not None:
+            b1, b2, b3 = st.columns(3)
+            b1.metric("偏倚", f"{bias['bias']:.4f}")
+            b2.metric("t 统计量", f"{bias['t']:.3f}")
+            b3.metric("P 值", f"{bias['p']:.4f}", "≥0.05 偏倚可接受")
+            st.markdown(f"<div class='formula'>95% 置信区间：[{bias['ci'][0]:.4f}, {bias['ci'][1]:.4f}]（包含0则偏倚不显著）</div>", unsafe_allow_html=True)
+    
+    with lin_tab:
+        c1, c2 = st.columns([2, 1])
+        upload = c1.file_uploader("线性数据（列 reference, value）", type="csv", key="msa_lin_csv")
+        proc_var = c2.number_input("过程变差 (6σ)", 0.0, value=6.0, step=0.5, key="msa_lin_pv")
+        lin = None
+        try:
+            if upload is not None:
+                df_lin = read_csv_cached(upload.getvalue())
+                refs = np.sort(df_lin["reference"].unique()).astype(float)
+                groups = [df_lin.loc[df_lin["reference"] == r, "value"].to_numpy(dtype=float) for r in refs]
+                if len({len(g) for g in groups}) != 1:
+                    raise ValueError("每个参考值的测量次数必须相同")
+                lin_y = np.vstack(groups)
+            else:
+                refs = np.array([2.0, 4.0, 6.0, 8.0, 10.0])
+                lin_y = refs[:, None] * 1.004 + np.random.default_rng(11).normal(0, 0.02, (5, 12))
+            lin = msa.linearity_study(refs, lin_y, proc_var or None)
+        except (KeyError, ValueError) as e:
+            st.error(f"数据格式错误：{e}")
+        
+        if lin is not None:
+            l1, l2, l3 = st.columns(3)
+            l1.metric("斜率", f"{lin['slope']:.5f}", f"P={lin['p_slope']:.4f}")
+            l2.metric("截距", f"{lin['intercept']:.5f}", f"P={lin['p_intercept']:.4f}")
+            l3.metric("R²", f"{lin['r2']:.3f}")
+            
+            xs = np.linspace(refs.min(), refs.max(), 50)
+            fig = perf.figure()
+            fig.add_trace(go.Scatter(x=np.repeat(refs, lin_y.shape[1]).tolist(), y=(lin_y - refs[:, None]).ravel().tolist(),
+                                     mode='markers', name='偏倚', marker=dict(color='#63b3ed', size=6, opacity=0.6)))
+            fig.add_trace(go.Scatter(x=refs.tolist(), y=lin['mean_bias'].tolist(), mode='markers', name='平均偏倚',
+                                     marker=dict(color='#ed8936', size=10)))
+            fig.add_trace(go.Scatter(x=xs.tolist(), y=(lin['intercept'] + lin['slope'] * xs).tolist(), mode='lines',
+                                     name='回归线', line=dict(color='#fc8181', width=2)))
+            fig.add_hline(y=0, line=dict(color='rgba(255,255,255,0.3)', dash='dot'))
+            fig.update_layout(title="线性研究：偏倚 vs 参考值", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
+                              font=dict(color='#e0e0e0'), legend=dict(bgcolor='rgba(0,0,0,0)'),
+                              xaxis=dict(gridcolor='rgba(255,255,255,0.1)'), yaxis=dict(gridcolor='rgba(255,255,255,0.1)'), height=350)
+            perf.plotly_chart(fig, "linearity", use_container_width=True)
+    
+    with stab_tab:
+        upload = st.file_uploader("稳定性数据（列 subgroup, value，每个子组容量相同）", type="csv", key="msa_stab_csv")
+        stab = None
+        try:
+            if upload is not None:
+                df_stab = read_csv_cached(upload.getvalue())
+                sizes = df_stab.groupby("subgroup")["value"].size()
+                if sizes.nunique() != 1:
+                    raise ValueError("每个子组的测量次数必须相同")
+                subgroups = df_stab.sort_values("subgroup", kind="stable")["value"].to_numpy(dtype=float).reshape(len(sizes), -1)
+            else:
+                subgroups = np.random.default_rng(3).normal(5.0, 0.02, (25, 5))
+            stab = msa.stability_study(subgroups)
+        except (KeyError, ValueError) as e:
+            st.error(f"数据格式错误：{e}")
+        
+        if stab is not None:
+            fig = perf.figure()
+            idx = list(range(1, len(stab['xbar']) + 1))
+            colors = ['#fc8181' if o else '#63b3ed' for o in stab['xbar_ooc']]
+            fig.add_trace(go.Scatter(x=idx, y=stab['xbar'].tolist(), mode='lines+markers', name='子组均值',
+                                     line=dict(color='#63b3ed', width=1.5), marker=dict(color=colors, size=8)))
+            lcl, cl, ucl = stab['limits']['xbar']
+            fig.add_hline(y=ucl, line=dict(color='#fc8181', dash='dash', width=2), annotation_text=f"UCL={ucl:.4f}")
+            fig.add_hline(y=cl, line=dict(color='#48bb78', width=2), annotation_text=f"CL={cl:.4f}")
+            fig.add_hline(y=lcl, line=dict(color='#fc8181', dash='dash', width=2), annotation_text=f"LCL={lcl:.4f}")
+            fig.update_layout(title=f"稳定性 X-bar 图（失控点 {int(stab['xbar_ooc'].sum())} 个，R图失控 {int(stab['r_ooc'].sum())} 个）",
+                              paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
+                              font=dict(color='#e0e0e0'), xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
+                              yaxis=dict(gridcolor='rgba(255,255,255,0.1)'), height=350)
+            perf.plotly_chart(fig, "stability", use_container_width=True)
+
+
+# FMEA 工作表
+@st.fragment
+@perf.section
+def fmea_section():
+    st.markdown("<div class='section-title'>📝 FMEA 工作表</div>", unsafe_allow_html=True)
+    st.markdown("<div class='info-box'>上传 CSV，列为 <b>product, process, failure_mode, effect, cause, severity, occurrence, detection</b>；未上传时使用 20,000 行演示数据。RPN = S×O×D，AP 按 AIAG-VDA 行动优先级表判定。</div>", unsafe_allow_html=True)
+    
+    upload = st.file_uploader("FMEA 数据", type="csv", key="fmea_csv")
+    raw = upload.getvalue() if upload is not None else None
+    source = hashlib.md5(raw).hexdigest() if raw else "demo"
+    if st.session_state.get("fmea_source") != source:
+        try:
+            st.session_state.fmea = fmea.FMEAWorksheet(read_csv_cached(raw) if raw else fmea_demo_cached(20000))
+            st.session_state.fmea_source = source
+        except (ValueError, KeyError) as e:
+            st.error(f"数据格式错误：{e}")
+    
+    if "fmea" in st.session_state:
+        ws = st.session_state.fmea
+        ap_total = np.bincount(ws.ap, minlength=3)
+        f1, f2, f3, f4 = st.columns(4)
+        f1.metric("失效模式行数", f"{len(ws):,}")
+        f2.metric("AP = 高 H", f"{ap_total[2]:,}")
+        f3.metric("AP = 中 M", f"{ap_total[1]:,}")
+        f4.metric("最高 RPN", f"{int(ws.rpn.max()) if len(ws) else 0}")
+        
+        c1, c2, c3, c4 = st.columns(4)
+        by = c1.radio("分组维度", fmea.GROUP_COLUMNS, format_func=fmea.COLUMN_NAMES.get, key="fmea_by", horizontal=True)
+        group = c2.selectbox(f"选择{fmea.COLUMN_NAMES[by]}", ws.groups(by), key=f"fmea_group_{by}")
+        rank_by = c3.radio("排序依据", ["ap", "rpn"], format_func=fmea.COLUMN_NAMES.get, key="fmea_rank", horizontal=True)
+        top_k = c4.slider("Top N", 5, 100, 20, 5, key="fmea_k")
+        
+        rows = ws.top_risks(by, group, top_k, rank_by)
+        view = ws.to_frame(rows)
+        edited = st.data_editor(
+            view,
+            column_config={
+                **{c: st.column_config.TextColumn(fmea.COLUMN_NAMES[c]) for c in fmea.TEXT_COLUMNS},
+                **{c: st.column_config.NumberColumn(fmea.COLUMN_NAMES[c], min_value=1, max_value=10, step=1) for c in fmea.RATING_COLUMNS},
+                "rpn": st.column_config.NumberColumn("RPN"),
+                "ap": st.column_config.TextColumn("AP"),
+            },
+            disabled=["rpn", "ap"],
+            use_container_width=True,
+            key=f"fmea_editor_{by}_{group}_{rank_by}_{top_k}",
+        )
+        
+        # 只对改动的行做增量重算
+        editable = fmea.TEXT_COLUMNS + fmea.RATING_COLUMNS
+        diff = (edited[editable].astype(str) != view[editable].astype(str))
+        if diff.to_numpy().any():
+            for row_id, changed in diff.iterrows():
+                cols = changed[changed].index
+                if len(cols):
+                    try:
+                        ws.update_row(row_id, **{c: edited.at[row_id, c] for c in cols})
+                    except ValueError as e:
+                        st.error(f"第 {row_id} 行：{e}")
+                        break
+            else:
+                del st.session_state[f"fmea_editor_{by}_{group}_{rank_by}_{top_k}"]
+                rerun_fragment()
+        
+        counts = ws.ap_counts(by)
+        labels = ws.groups(by)
+        fig = perf.figure()
+        for level, color in [(2, '#fc8181'), (1, '#ed8936'), (0, '#48bb78')]:
+            name = fmea.AP_NAMES[fmea.AP_LABELS[level]]
+            fig.add_trace(go.Bar(x=labels, y=counts[:, level].tolist(), name=name, marker_color=color))
+        fig.update_layout(title=f"各{fmea.COLUMN_NAMES[by]} 行动优先级分布", barmode='stack',
+                          paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
+                          font=dict(color='#e0e0e0'), legend=dict(bgcolor='rgba(0,0,0,0)'),
+                          yaxis=dict(gridcolor='rgba(255,255,255,0.1)'), height=350)
+        perf.plotly_chart(fig, "fmea_ap", use_container_width=True)
+
 
 # ─── 质量工具 ───
-elif menu == "🔧 质量工具":
+@perf.section
+def page_tools():
     st.markdown("<div class='hero'><h1>🔧 质量工具大全</h1><p>QC七大工具 · 新七大工具 · 核心质量工具</p></div>", unsafe_allow_html=True)
     
     tool_cat = st.selectbox("选择工具类别", list(QUALITY_TOOLS.keys()))
@@ -733,13 +699,10 @@ elif menu == "🔧 质量工具":
         data[12] = 11.8  # special cause
         data[22] = 8.5   # special cause
         
-        mean = np.mean(data)
-        std = np.std(data)
-        ucl = mean + 3 * std
-        lcl = mean - 3 * std
+        lcl, mean, ucl = spc.sigma_limits(data)
         
-        fig = go.Figure()
-        colors = ['#fc8181' if (v > ucl or v < lcl) else '#63b3ed' for v in data]
+        fig = perf.figure()
+        colors = np.where(spc.out_of_control(data, (lcl, mean, ucl)), '#fc8181', '#63b3ed').tolist()
         
         fig.add_trace(go.Scatter(x=list(range(1, n_points+1)), y=data.tolist(), mode='lines+markers',
                                  name='测量值', line=dict(color='#63b3ed', width=1.5),
@@ -754,18 +717,48 @@ elif menu == "🔧 质量工具":
             font=dict(color='#e0e0e0'), xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
             yaxis=dict(gridcolor='rgba(255,255,255,0.1)'), height=350
         )
-        st.plotly_chart(fig, use_container_width=True)
+        perf.plotly_chart(fig, "xbar_demo", use_container_width=True)
+    
+    # 实时控制图
+    if tool_cat == "7大质量工具（QC七大工具）":
+        st.markdown("<div class='section-title'>📡 实时控制图</div>", unsafe_allow_html=True)
+        c1, c2, c3, c4 = st.columns([1, 2, 1, 1])
+        # 文件与网络数据源由服务进程直接打开，只对管理员开放
+        live_kinds = ["模拟数据", "SQLite", "CSV", "Socket"] if is_admin else ["模拟数据"]
+        live_kind = c1.selectbox("数据源", live_kinds, key="live_kind")
+        placeholder = {"模拟数据": "", "SQLite": "plant.db（表 measurements: value, defective）",
+                       "CSV": "feed.csv（列 value, defective，追加写入）", "Socket": "127.0.0.1:9999"}[live_kind]
+        live_target = c2.text_input("连接", "", placeholder=placeholder, key="live_target", disabled=live_kind == "模拟数据")
+        live_n = c3.number_input("子组容量", 2, 10, 5, key="live_n")
+        live_every = c4.number_input("刷新间隔(秒)", 0.5, 10.0, 1.0, 0.5, key="live_every")
+        
+        if not st.toggle("开启实时采集", key="live_on"):
+            live_lease.clear()
+        elif live_kind != "模拟数据" and not live_target:
+            st.warning("请填写连接信息")
+        else:
+            try:
+                if live_kind == "Socket":
+                    live_feed.parse_address(live_target)
+                *_, worker = live_lease(live_kind, live_target, int(live_n))
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                if not worker.running and st.button("🔄 重新连接", key="live_reconnect"):
+                    live_lease.clear()
+                    live_worker.clear(live_kind, live_target, int(live_n))
+                    st.rerun()
+                # 只有该片段按间隔重跑，页面其余部分不会重新执行
+                st.fragment(run_every=live_every)(render_live_charts)(worker)
     
     # 柏拉图演示
     st.markdown("<div class='section-title'>📊 柏拉图演示</div>", unsafe_allow_html=True)
     
     defects = {"焊接缺陷": 45, "尺寸超差": 28, "外观不良": 15, "标签错误": 7, "包装破损": 3, "其他": 2}
-    names = list(defects.keys())
-    values = list(defects.values())
-    total = sum(values)
-    cumulative = [sum(values[:i+1])/total*100 for i in range(len(values))]
+    names, values, cumulative = spc.pareto(list(defects.keys()), list(defects.values()))
+    names, values, cumulative = names.tolist(), values.tolist(), cumulative.tolist()
     
-    fig = go.Figure()
+    fig = perf.figure()
     fig.add_trace(go.Bar(x=names, y=values, name='缺陷数量', marker_color='#63b3ed'))
     fig.add_trace(go.Scatter(x=names, y=cumulative, name='累计百分比%', yaxis='y2',
                              mode='lines+markers', line=dict(color='#fc8181', width=2)))
@@ -778,52 +771,532 @@ elif menu == "🔧 质量工具":
         paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
         font=dict(color='#e0e0e0'), legend=dict(bgcolor='rgba(0,0,0,0)'), height=350
     )
-    st.plotly_chart(fig, use_container_width=True)
+    perf.plotly_chart(fig, "pareto", use_container_width=True)
+
+    # 核心质量工具：MSA 与 FMEA 工作表
+    if tool_cat == "核心质量工具":
+        msa_section()
+        fmea_section()
+
+
+# 过程能力分析演示
+@st.fragment
+@perf.section
+def capability_demo():
+    st.markdown("<div class='section-title'>过程能力分析演示</div>", unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    mean_val = col1.slider("过程均值 μ", 9.0, 11.0, 10.0, 0.1)
+    std_val = col2.slider("过程标准差 σ", 0.1, 1.0, 0.3, 0.05)
+    lsl = col3.slider("下规格限 LSL", 8.0, 9.5, 9.0, 0.1)
+    usl = 11.0
+    
+    cp = (usl - lsl) / (6 * std_val)
+    cpk = min((usl - mean_val) / (3 * std_val), (mean_val - lsl) / (3 * std_val))
+    
+    x = np.linspace(lsl - 1, usl + 1, 500)
+    y = (1/(std_val * np.sqrt(2*np.pi))) * np.exp(-0.5*((x-mean_val)/std_val)**2)
+    
+    fig = perf.figure()
+    fig.add_trace(go.Scatter(x=x.tolist(), y=y.tolist(), fill='tozeroy', fillcolor='rgba(99,179,237,0.2)',
+                             line=dict(color='#63b3ed', width=2), name='过程分布'))
+    fig.add_vline(x=lsl, line=dict(color='#fc8181', width=2), annotation_text=f"LSL={lsl}")
+    fig.add_vline(x=usl, line=dict(color='#fc8181', width=2), annotation_text=f"USL={usl}")
+    fig.add_vline(x=mean_val, line=dict(color='#48bb78', dash='dash'), annotation_text=f"μ={mean_val}")
+    
+    status_color = '#48bb78' if cpk >= 1.33 else '#ed8936' if cpk >= 1.0 else '#fc8181'
+    
+    fig.update_layout(title=f"过程能力分布  |  Cp={cp:.2f}  Cpk={cpk:.2f}",
+                      paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
+                      font=dict(color='#e0e0e0'), height=300)
+    perf.plotly_chart(fig, "capability_demo", use_container_width=True)
+    
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Cp", f"{cp:.3f}", "≥1.33 为良好")
+    m2.metric("Cpk", f"{cpk:.3f}", "≥1.33 为良好")
+    m3.metric("状态", "良好✅" if cpk >= 1.33 else "边界⚠️" if cpk >= 1.0 else "不合格❌")
+
+
+# 非正态过程能力分析
+@st.fragment
+@perf.section
+def nonnormal_capability_section():
+    st.markdown("<div class='section-title'>非正态过程能力分析</div>", unsafe_allow_html=True)
+    st.markdown("<div class='info-box'>平面度、跳动等单边特性通常呈偏态分布，按正态假设计算的Cpk会失真。这里对每个特性同时拟合 正态/对数正态/Weibull/Gamma 及 Box-Cox、Johnson 变换，按 AD 统计量自动选择最优分布，用百分位法计算 Ppk。</div>", unsafe_allow_html=True)
+    
+    upload = st.file_uploader("特性数据 CSV（每列一个特性）；未上传时使用演示数据", type="csv", key="cap_csv")
+    # 矩阵与指纹按上传文件 ID 保存在会话中：片段重跑时既不重新解析，也不重新哈希整个矩阵
+    source = upload.file_id if upload is not None else "demo"
+    if st.session_state.get("cap_source") != source:
+        try:
+            cap_df = read_csv_cached(upload.getvalue()).select_dtypes("number").dropna() if upload is not None else capability.demo_data()
+        except ValueError as e:
+            st.error(f"数据格式错误：{e}")
+            return
+        X = cap_df.to_numpy(dtype=float)
+        st.session_state.cap_data = list(cap_df.columns), X, capability.fingerprint(X)
+        st.session_state.cap_source = source
+    chars, X, fp = st.session_state.cap_data
+    
+    if X.shape[1] == 0 or len(X) < 10:
+        st.error("至少需要一个数值列且样本数不少于 10")
+    else:
+        fits, best = fit_capability_cached(fp, X)
+        constant = capability.constant_columns(X)
+        if constant.any():
+            st.warning("以下特性的数据全部相同（标准差为 0），无法拟合分布，能力指数显示为空："
+                       + "、".join(c for c, flat in zip(chars, constant) if flat))
+        
+        specs = pd.DataFrame(
+            [capability.DEMO_SPECS.get(c, (np.nan, np.nan)) for c in chars] if upload is None else [(np.nan, np.nan)] * len(chars),
+            columns=["LSL", "USL"], index=chars)
+        specs = st.data_editor(specs, use_container_width=True, key=f"cap_specs_{fp}")
+        lsl, usl = specs["LSL"].to_numpy(dtype=float), specs["USL"].to_numpy(dtype=float)
+        
+        caps = {f: capability.capability(f, fits[f]["params"], lsl, usl) for f in capability.FAMILIES}
+        cols = np.arange(len(chars))
+        pick = lambda key: np.vstack([caps[f][key] for f in capability.FAMILIES])[best, cols]
+        summary = pd.DataFrame({
+            "特性": chars,
+            "最优分布": ["—" if flat else capability.FAMILIES[b] for b, flat in zip(best, constant)],
+            "AD": np.vstack([fits[f]["ad"] for f in capability.FAMILIES])[best, cols],
+            "Ppk（最优分布）": pick("ppk"),
+            "Ppk（假设正态）": caps["正态"]["ppk"],
+            "预期PPM": pick("ppm"),
+        })
+        st.dataframe(summary.round(3), use_container_width=True, hide_index=True)
+        
+        char = st.selectbox("查看特性", chars, key=f"cap_char_{fp}")
+        j = chars.index(char)
+        x = X[:, j]
+        spread = x.max() - x.min()
+        grid = np.linspace(x.min() - 0.1 * spread, x.max() + 0.1 * spread, 300)
+        
+        fig = perf.figure()
+        fig.add_trace(go.Histogram(x=x.tolist(), histnorm='probability density', name='数据',
+                                   marker_color='rgba(99,179,237,0.35)', nbinsx=30))
+        palette = ['#a0aec0', '#48bb78', '#ed8936', '#a855f7', '#f6e05e', '#fc8181']
+        for f, color in zip(capability.FAMILIES, palette):
+            ad = fits[f]["ad"][j]
+            if np.isnan(ad):
+                continue
+            dens = capability.pdf(f, grid, capability.param_slice(fits[f]["params"], j))
+            fig.add_trace(go.Scatter(x=grid.tolist(), y=np.nan_to_num(dens).tolist(), mode='lines',
+                                     name=f"{f} (AD={ad:.3f})", line=dict(color=color, width=3 if f == capability.FAMILIES[best[j]] else 1.2)))
+        for v, label in [(lsl[j], "LSL"), (usl[j], "USL")]:
+            if not np.isnan(v):
+                fig.add_vline(x=v, line=dict(color='#fc8181', width=2), annotation_text=f"{label}={v:g}")
+        fig.update_layout(title=f"{char}：最优分布 {summary['最优分布'][j]}，Ppk={summary['Ppk（最优分布）'][j]:.2f}",
+                          paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
+                          font=dict(color='#e0e0e0'), legend=dict(bgcolor='rgba(0,0,0,0)'), height=380,
+                          xaxis=dict(gridcolor='rgba(255,255,255,0.1)'), yaxis=dict(gridcolor='rgba(255,255,255,0.1)'))
+        perf.plotly_chart(fig, "nonnormal_fit", use_container_width=True)
+        
+        # PPAP 报告包：后台进程池渲染，页面只轮询进度
+        with st.expander("📦 导出 PPAP 报告包（单值控制图 + 能力图 + 汇总表）"):
+            formats = report.available_formats()
+            if not formats:
+                st.info("导出需要安装 kaleido>=1.0 与 plotly>=6.1（PNG/PDF，需 Chrome）或 openpyxl（XLSX）")
+            else:
+                c1, c2, c3 = st.columns([2, 1, 1])
+                chosen = c1.multiselect("格式", formats, default=formats, key="rep_formats")
+                max_workers = procpool.default_workers()
+                rep_workers = c2.number_input("渲染进程数", 1, max_workers, max_workers, key="rep_workers")
+                job = st.session_state.get("rep_job")
+                busy = job is not None and job.running
+                if c3.button("开始导出", key="rep_start", disabled=not chosen or busy, use_container_width=True):
+                    rep_summary, rep_specs = report_cached(fp, X, tuple(chars), tuple(lsl), tuple(usl))
+                    job = st.session_state.rep_job = report.ExportJob(
+                        rep_specs, rep_summary, X, chars, chosen, int(rep_workers)).start()
+                    busy = True
+                if job is not None:
+                    st.fragment(run_every=1.0 if busy else None)(export_status)(job, busy)
+
+
+@perf.section
+def export_status(job, polling):
+    if job.running:
+        st.progress(job.done / max(job.total, 1), text=f"渲染中… {job.done}/{job.total}（{job.elapsed:.0f} s）")
+        st.button("取消导出", key="rep_cancel", on_click=job.cancel)
+    elif polling:
+        st.rerun()  # 结束后整页重跑一次，停止轮询
+    elif job.error is not None:
+        st.error(f"导出失败：{job.error}")
+    elif job.result is not None:
+        st.success(f"已导出 {job.done} 个文件，用时 {job.elapsed:.1f} s")
+        st.download_button("⬇️ 下载报告包 ZIP", job.result, "PPAP_报告包.zip", "application/zip", key="rep_download")
+    else:
+        st.info("导出已取消")
+
+
+# σ 水平换算与滚动合格率
+SIGMA_EXAMPLES = {"σ水平": "3\n4\n4.5\n6", "DPMO": "66807\n6210\n1350\n3.4",
+                  "PPM": "66807\n6210\n1350\n3.4", "合格率(%)": "93.32\n99.379\n99.865\n99.99966"}
+
+
+@st.fragment
+@perf.section
+def sigma_calculator():
+    st.markdown("<div class='section-title'>🧮 σ水平换算器</div>", unsafe_allow_html=True)
+    c1, c2, c3, c4 = st.columns(4)
+    kind = c1.selectbox("输入指标", sigma.KINDS, key="sg_kind")
+    shift = sigma.SHIFT if c2.checkbox("含 1.5σ 漂移", value=True, key="sg_shift") else 0.0
+    two_sided = c3.checkbox("双侧规格", value=False, key="sg_two")
+    opportunities = c4.number_input("每单位缺陷机会数", 1, 1_000_000, 1, key="sg_opps")
+    
+    upload = st.file_uploader("整列换算：上传 CSV（可选，选择一个数值列）", type="csv", key="sg_csv")
+    values = None
+    if upload is not None:
+        try:
+            sg_df = read_csv_cached(upload.getvalue())
+        except ValueError as e:
+            st.error(f"数据格式错误：{e}")
+            sg_df = None
+        numeric_cols = list(sg_df.select_dtypes("number").columns) if sg_df is not None else []
+        if numeric_cols:
+            col = st.selectbox("数值列", numeric_cols, key="sg_col")
+            values = sg_df[col].dropna().to_numpy(dtype=float)
+        elif sg_df is not None:
+            st.error("CSV 中没有数值列")
+    if values is None:
+        text = st.text_area(f"{kind}（每行一个，或用逗号分隔）", SIGMA_EXAMPLES[kind], key=f"sg_values_{kind}")
+        tokens = [v for v in re.split(r"[\s,，]+", text.strip()) if v]
+        numeric = [re.fullmatch(r"[-+]?\d*\.?\d+(e[-+]?\d+)?", v, re.I) is not None for v in tokens]
+        values = np.array([float(v) for v, ok in zip(tokens, numeric) if ok])
+        ignored = [v for v, ok in zip(tokens, numeric) if not ok]
+        if ignored:
+            st.warning(f"已忽略 {len(ignored)} 项无法识别的内容：" + "、".join(ignored[:10]) + ("…" if len(ignored) > 10 else ""))
+    if values.size:
+        result = sigma.convert(values, kind, shift, two_sided, opportunities)
+        st.dataframe(result.head(1000), use_container_width=True, hide_index=True,
+                     column_config={c: st.column_config.NumberColumn(format="%.6g") for c in result.columns})
+        if len(result) > 1000:
+            st.caption(f"共 {len(result):,} 行，仅显示前 1000 行；完整结果请下载")
+        st.download_button("下载换算结果 CSV", result.to_csv(index=False).encode("utf-8-sig"), "sigma.csv",
+                           "text/csv", key="sg_download")
+    
+    st.markdown("**滚动合格率 RTY（多工序）**")
+    source = st.radio("工序合格率", ["各工序相同", "上传各工序合格率"], horizontal=True, key="rty_source")
+    yields = None
+    if source == "各工序相同":
+        r1, r2 = st.columns(2)
+        n_steps = r1.number_input("工序数", 1, 1_000_000, 1000, key="rty_steps")
+        step_sigma = r2.number_input("每道工序 σ 水平", 0.0, 10.0, 4.5, 0.1, key="rty_sigma")
+        p = sigma.unit_defect_rate(sigma.defect_rate(step_sigma, shift, two_sided), opportunities)
+        yields = np.full(int(n_steps), 1 - p)
+    else:
+        upload = st.file_uploader("各工序一次合格率 CSV（0~1 或百分数，一行一道工序）", type="csv", key="rty_csv")
+        if upload is not None:
+            try:
+                rty_df = read_csv_cached(upload.getvalue())
+            except ValueError as e:
+                st.error(f"数据格式错误：{e}")
+                rty_df = None
+            numeric_cols = list(rty_df.select_dtypes("number").columns) if rty_df is not None else []
+            if numeric_cols:
+                col = st.selectbox("合格率列", numeric_cols, key="rty_col")
+                yields = rty_df[col].dropna().to_numpy(dtype=float)
+                if yields.size and yields.max() > 1:
+                    yields = yields / 100
+                bad = np.count_nonzero((yields < 0) | (yields > 1))
+                if bad:
+                    st.error(f"有 {bad} 道工序的合格率不在 0~1（或 0~100%）之间，请检查数据")
+                    yields = None
+            elif rty_df is not None:
+                st.error("CSV 中没有数值列")
+    if yields is not None and yields.size:
+        cumulative, rty, log10_rty, normalized = sigma.rolled_throughput_yield(yields)
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("工序数", f"{yields.size:,}")
+        m2.metric("RTY", f"{rty:.4%}" if rty >= 1e-4 else f"10^{log10_rty:.1f}")
+        m3.metric("归一化合格率", f"{normalized:.6%}")
+        m4.metric("等效 σ 水平（归一化）", f"{float(sigma.sigma_level(1 - normalized, shift, two_sided)):.2f}")
+        # 工序很多时抽取不超过 2000 个点作图
+        idx = np.unique(np.linspace(0, yields.size - 1, min(yields.size, 2000)).astype(int))
+        fig = perf.figure(go.Scatter(x=(idx + 1).tolist(), y=(cumulative[idx] * 100).tolist(), mode='lines',
+                                     line=dict(color='#63b3ed', width=2), name='累计 RTY'))
+        fig.update_layout(title="累计滚动合格率", paper_bgcolor='rgba(0,0,0,0)',
+                          plot_bgcolor='rgba(255,255,255,0.03)', font=dict(color='#e0e0e0'),
+                          xaxis=dict(title='工序', gridcolor='rgba(255,255,255,0.1)'),
+                          yaxis=dict(title='RTY (%)', gridcolor='rgba(255,255,255,0.1)'), height=300)
+        perf.plotly_chart(fig, "rty", use_container_width=True)
+
+
+# DOE 实验设计
+@st.fragment
+@perf.section
+def doe_section():
+    st.markdown("<div class='section-title'>二水平因子设计</div>", unsafe_allow_html=True)
+    
+    c1, c2, c3 = st.columns([1, 1, 2])
+    k = c1.slider("因子数 k", 2, doe.MAX_FACTORS, 5, key="doe_k")
+    fractions = [p for p in range(0, k - 1) if (1 << (k - p)) - 1 - (k - p) >= p]
+    p = c2.selectbox("设计类型", fractions, key=f"doe_p_{k}",
+                     format_func=lambda p: f"2^{k}" + (f"-{p}" if p else "") + f"（{1 << (k - p)} 次试验）")
+    gen_text = c3.text_input("生成元（留空自动选择，如 E=ABCD）", "", key=f"doe_gen_{k}_{p}")
+    
+    try:
+        generators = doe.parse_generators(gen_text, k) if gen_text.strip() else doe.choose_generators(k, p)
+        if len(generators) != p:
+            raise ValueError(f"设计类型 2^{k}-{p} 需要 {p} 个生成元，实际输入 {len(generators)} 个")
+    except ValueError as e:
+        st.error(f"生成元错误：{e}")
+        generators = doe.choose_generators(k, p)
+    
+    base = k - len(generators)
+    n_runs = 1 << base
+    res = doe.resolution(k, generators)
+    roman = {3: "III", 4: "IV", 5: "V", 6: "VI", 7: "VII"}
+    d1, d2, d3 = st.columns(3)
+    d1.metric("试验次数", f"{n_runs:,}")
+    d2.metric("分辨度", "全因子" if res is None else roman.get(res, str(res)))
+    d3.metric("生成元", " , ".join(f"{doe.FACTOR_NAMES[base + j]}={doe.term_name(g)}" for j, g in enumerate(generators)) or "—")
+    
+    if generators:
+        with st.expander("🔗 别名结构（主效应与二阶交互）"):
+            aliases = [(t, a) for t, a in doe.alias_table(k, generators) if a]
+            st.dataframe(pd.DataFrame(aliases or [("—", "无低阶混杂")], columns=["项", "别名"]),
+                         use_container_width=True, hide_index=True)
+    
+    # 预览只取前 32 行，惰性生成
+    preview = pd.DataFrame(list(itertools.islice(doe.iter_runs(k, generators), 32)),
+                           columns=list(doe.FACTOR_NAMES[:k]))
+    preview.index = preview.index + 1
+    with st.expander(f"📋 设计矩阵（标准顺序，预览前 {len(preview)} 行）"):
+        st.dataframe(preview, use_container_width=True)
+    
+    levels = doe_design_cached(k, tuple(generators))
+    st.download_button("⬇️ 下载完整设计矩阵 CSV", doe_csv_cached(k, tuple(generators)),
+                       file_name=f"doe_2^{k}-{p}.csv", mime="text/csv")
+    
+    st.markdown("<div class='section-title'>效应估计</div>", unsafe_allow_html=True)
+    upload = st.file_uploader("响应数据（列 y，按标准顺序；行数为试验次数的整数倍表示重复）", type="csv", key="doe_y_csv")
+    if upload is not None:
+        try:
+            y = read_csv_cached(upload.getvalue())["y"].to_numpy(dtype=float)
+        except (KeyError, ValueError) as e:
+            st.error(f"数据格式错误：{e}")
+            y = None
+        if y is not None and len(y) % n_runs:
+            st.error(f"响应行数 {len(y)} 不是试验次数 {n_runs} 的整数倍")
+            y = None
+    else:
+        y = doe.simulate_response(levels)
+        st.markdown("<div class='info-box'>未上传数据：使用模拟响应（A、B、C、D 及 AB 交互有真实效应）。</div>", unsafe_allow_html=True)
+    
+    if y is not None:
+        n_rep = len(y) // n_runs
+        terms = doe.estimable_terms(k, generators)
+        if not generators and n_rep == 1:
+            fit = doe.estimate_effects_yates(y, terms)
+        else:
+            fit = doe.estimate_effects(doe.replicate_levels(levels, n_rep), y, terms)
+        effects = fit["effects"]
+        names = [doe.term_name(t) for t in terms]
+        margin = doe.lenth_margin(effects)
+        significant = np.abs(effects) > margin
+        
+        order = np.argsort(-np.abs(effects))[:25]
+        fig = perf.figure()
+        fig.add_trace(go.Bar(x=np.abs(effects[order]).tolist(), y=[names[i] for i in order], orientation='h',
+                             marker_color=['#fc8181' if significant[i] else '#63b3ed' for i in order], name='|效应|'))
+        fig.add_vline(x=margin, line=dict(color='#f6e05e', dash='dash'), annotation_text=f"ME={margin:.2f}")
+        fig.update_layout(title="效应柏拉图（Lenth 法，α=0.05）", paper_bgcolor='rgba(0,0,0,0)',
+                          plot_bgcolor='rgba(255,255,255,0.03)', font=dict(color='#e0e0e0'),
+                          yaxis=dict(autorange='reversed'), xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
+                          height=max(300, 22 * len(order) + 100))
+        perf.plotly_chart(fig, "doe_effects", use_container_width=True)
+        
+        idx, q = doe.normal_scores(effects)
+        fig = perf.figure()
+        fig.add_trace(go.Scatter(x=effects[idx].tolist(), y=q.tolist(), mode='markers+text',
+                                 text=[names[i] if significant[i] else "" for i in idx], textposition='top center',
+                                 marker=dict(color=['#fc8181' if significant[i] else '#63b3ed' for i in idx], size=8),
+                                 name='效应'))
+        slope = np.std(effects) or 1.0
+        line_x = np.array([q.min(), q.max()]) * slope
+        fig.add_trace(go.Scatter(x=line_x.tolist(), y=[q.min(), q.max()], mode='lines',
+                                 line=dict(color='rgba(255,255,255,0.3)', dash='dot'), name='参考线'))
+        fig.update_layout(title="效应正态概率图（偏离直线者为显著效应）", paper_bgcolor='rgba(0,0,0,0)',
+                          plot_bgcolor='rgba(255,255,255,0.03)', font=dict(color='#e0e0e0'),
+                          xaxis=dict(title="效应", gridcolor='rgba(255,255,255,0.1)'),
+                          yaxis=dict(title="正态分位数", gridcolor='rgba(255,255,255,0.1)'), height=350)
+        perf.plotly_chart(fig, "doe_normal_plot", use_container_width=True)
+        
+        st.markdown(f"<div class='formula'>ŷ = {fit['intercept']:.3f} + " +
+                    " + ".join(f"{effects[i] / 2:.3f}·{names[i]}" for i in np.flatnonzero(significant)) +
+                    f"（显著项，共 {int(significant.sum())} 个；重复 {n_rep} 次）</div>", unsafe_allow_html=True)
+
+
+# 假设检验工作台
+@st.fragment
+@perf.section
+def hypothesis_section():
+    st.markdown("<div class='section-title'>假设检验工作台</div>", unsafe_allow_html=True)
+    upload = st.file_uploader("数据 CSV（长表：数值列 + 分组列）；未上传时使用三条产线的演示数据", type="csv", key="ht_csv")
+    try:
+        ht_df = read_csv_cached(upload.getvalue()) if upload is not None else stat_tests.demo_frame()
+    except ValueError as e:
+        st.error(f"数据格式错误：{e}")
+        return
+    
+    numeric_cols = list(ht_df.select_dtypes("number").columns)
+    cat_cols = [c for c in ht_df.columns if c not in numeric_cols]
+    if not numeric_cols or not cat_cols:
+        st.error("数据需至少包含一个数值列和一个分组列")
+    else:
+        c1, c2, c3 = st.columns(3)
+        value_col = c1.selectbox("数值列", numeric_cols, key="ht_value")
+        group_col = c2.selectbox("分组列", cat_cols, key="ht_group")
+        test = c3.selectbox("检验方法", ["单样本 t", "双样本 t (Welch)", "配对 t", "单因子 ANOVA",
+                                         "Mann-Whitney U", "Wilcoxon 符号秩", "Kruskal-Wallis", "卡方独立性"], key="ht_test")
+        
+        group_names = list(pd.unique(ht_df[group_col].dropna()))
+        samples = {g: ht_df.loc[ht_df[group_col] == g, value_col].dropna().to_numpy(dtype=float) for g in group_names}
+        two_group_tests = ["双样本 t (Welch)", "配对 t", "Mann-Whitney U", "Wilcoxon 符号秩"]
+        
+        result = None
+        if test == "单样本 t":
+            g1, g2 = st.columns(2)
+            g = g1.selectbox("样本", group_names, key=f"ht_g1_{group_col}")
+            mu0 = g2.number_input("假设均值 μ₀", value=float(np.round(samples[g].mean(), 2)) if len(samples[g]) else 0.0, key="ht_mu0")
+            result = stat_tests.one_sample_t(samples[g], mu0)
+        elif test in two_group_tests:
+            g1, g2 = st.columns(2)
+            a = g1.selectbox("样本 1", group_names, key=f"ht_g1_{group_col}")
+            b = g2.selectbox("样本 2", group_names, index=min(1, len(group_names) - 1), key=f"ht_g2_{group_col}")
+            if test in ("配对 t", "Wilcoxon 符号秩") and len(samples[a]) != len(samples[b]):
+                st.error("配对检验要求两组样本量相同")
+            else:
+                fn = {"双样本 t (Welch)": stat_tests.two_sample_t, "配对 t": stat_tests.paired_t,
+                      "Mann-Whitney U": stat_tests.mann_whitney, "Wilcoxon 符号秩": stat_tests.wilcoxon_signed_rank}[test]
+                result = fn(samples[a], samples[b])
+        elif test in ("单因子 ANOVA", "Kruskal-Wallis"):
+            fn = stat_tests.one_way_anova if test == "单因子 ANOVA" else stat_tests.kruskal_wallis
+            result = fn([v for v in samples.values() if len(v)])
+        else:
+            other = st.selectbox("第二个分类列", [c for c in cat_cols if c != group_col] or cat_cols, key="ht_cat2")
+            table = pd.crosstab(ht_df[group_col], ht_df[other])
+            st.dataframe(table, use_container_width=True)
+            result = stat_tests.chi_square(table.to_numpy())
+        
+        if result is not None:
+            significant = result["P值"] < 0.05
+            st.markdown(f"""
+            <div class='{"wrong" if significant else "correct"}'>
+                <b>{result["检验"]}</b>　H₀：{result["H₀"]}<br>
+                统计量 = {result["统计量"]:.4f}　P值 = {result["P值"]:.4g}　→ {"拒绝 H₀（α=0.05）" if significant else "不能拒绝 H₀（α=0.05）"}
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # 重抽样（Bootstrap / 置换检验）
+        st.markdown("<div class='section-title'>重抽样推断</div>", unsafe_allow_html=True)
+        r1, r2, r3, r4 = st.columns(4)
+        method = r1.radio("方法", ["Bootstrap 置信区间", "置换检验"], key="rs_method")
+        stat = r2.selectbox("统计量", list(stat_tests.STATISTICS), format_func=stat_tests.STAT_NAMES.get, key="rs_stat")
+        n_resamples = r3.select_slider("重抽样次数", [1_000, 10_000, 50_000, 100_000, 200_000], 100_000, key="rs_n")
+        max_workers = procpool.default_workers()
+        workers = int(r4.number_input("进程数", 1, max_workers, max_workers, key="rs_workers"))
+        g1, g2 = st.columns(2)
+        a = g1.selectbox("样本", group_names, key=f"rs_a_{group_col}")
+        b = g2.selectbox("对比样本", group_names, index=min(1, len(group_names) - 1), key=f"rs_b_{group_col}") if method == "置换检验" else None
+        
+        # 运行中点击“取消”会触发重跑，进度回调处抛出的中断异常结束本次计算，未完成的块随之丢弃
+        b1, b2 = st.columns(2)
+        start = b1.button("▶️ 开始重抽样", use_container_width=True, key="rs_start")
+        if b2.button("⏹ 取消", use_container_width=True, key="rs_cancel") and st.session_state.get("rs_running"):
+            st.warning("上一次重抽样已取消")
+        
+        rs = None
+        if start:
+            bar = st.progress(0.0, text="重抽样中…")
+            progress = lambda done, total: bar.progress(done / total, text=f"重抽样中… {done:,}/{total:,}")
+            interrupted = True
+            try:
+                if method == "Bootstrap 置信区间":
+                    rs = stat_tests.bootstrap_ci(samples[a], stat, n_resamples, workers=workers, progress=progress)
+                    observed = rs["estimate"]
+                else:
+                    rs = stat_tests.permutation_test(samples[a], samples[b], stat, n_resamples, workers=workers, progress=progress)
+                    observed = rs["observed"]
+                interrupted = False
+            except ValueError as e:
+                interrupted = False
+                st.error(f"无法重抽样：{e}")
+            finally:
+                # 正常结束、出错、被中断都会在这里更新标记；只有被中断时下一轮才提示“已取消”
+                st.session_state.rs_running = interrupted
+            bar.empty()
+        else:
+            st.session_state.rs_running = False
+        
+        if rs is not None:
+            if method == "Bootstrap 置信区间":
+                st.markdown(f"<div class='formula'>{stat_tests.STAT_NAMES[stat]} = {observed:.4f}　95% CI = [{rs['ci'][0]:.4f}, {rs['ci'][1]:.4f}]　Bootstrap SE = {rs['se']:.4f}</div>", unsafe_allow_html=True)
+            else:
+                st.markdown(f"<div class='formula'>观测差值 = {observed:.4f}　置换 P值 = {rs['p']:.4g}（{n_resamples:,} 次置换）</div>", unsafe_allow_html=True)
+            
+            counts, edges = np.histogram(rs["distribution"], bins=60)
+            fig = perf.figure(go.Bar(x=((edges[:-1] + edges[1:]) / 2).tolist(), y=counts.tolist(), marker_color='#63b3ed', name='重抽样分布'))
+            fig.add_vline(x=observed, line=dict(color='#fc8181', width=2), annotation_text="观测值")
+            if method == "Bootstrap 置信区间":
+                for v in rs["ci"]:
+                    fig.add_vline(x=v, line=dict(color='#f6e05e', dash='dash'))
+            fig.update_layout(title="重抽样分布", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
+                              font=dict(color='#e0e0e0'), bargap=0, height=300,
+                              xaxis=dict(gridcolor='rgba(255,255,255,0.1)'), yaxis=dict(gridcolor='rgba(255,255,255,0.1)'))
+            perf.plotly_chart(fig, "resampling", use_container_width=True)
+
 
 # ─── 六西格玛 ───
-elif menu == "📐 六西格玛":
+@perf.section
+def page_six_sigma():
     st.markdown("<div class='hero'><h1>📐 六西格玛</h1><p>DMAIC方法论 · 统计工具 · 过程能力分析</p></div>", unsafe_allow_html=True)
     
-    tab1, tab2, tab3, tab4 = st.tabs(["📌 基础概念", "🔄 DMAIC详解", "📊 统计工具", "🎓 认证等级"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📌 基础概念", "🔄 DMAIC详解", "📊 统计工具", "🎓 认证等级", "🧪 DOE实验设计", "🧮 假设检验"])
     
     with tab1:
         basics = SIX_SIGMA["基础概念"]["content"]
         st.markdown(f"<div class='info-box'>{basics['什么是六西格玛']}</div>", unsafe_allow_html=True)
         
-        st.markdown("**σ水平对照表**")
-        sigma_data = pd.DataFrame([
-            {"σ水平": k, "说明": v} for k, v in basics["西格玛水平对照"].items()
-        ])
-        st.dataframe(sigma_data, use_container_width=True, hide_index=True)
+        st.markdown("**σ水平对照表**（单侧规格，与常用的 6σ = 3.4 DPMO 口径一致）")
+        sigma_data = sigma.level_table(two_sided=False)
+        st.dataframe(sigma_data, use_container_width=True, hide_index=True,
+                     column_config={c: st.column_config.NumberColumn(format="%.6g") for c in sigma_data.columns[1:]})
         
         # 正态分布可视化
-        x = np.linspace(-4, 4, 500)
-        y = (1/(np.sqrt(2*np.pi))) * np.exp(-0.5*x**2)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=x.tolist(), y=y.tolist(), fill='tozeroy', fillcolor='rgba(99,179,237,0.1)',
-                                 line=dict(color='#63b3ed', width=2), name='正态分布'))
-        
-        sigma_regions = [(3, '#fc8181', 'rgba(252,129,129,0.2)'), (2, '#ed8936', 'rgba(237,137,54,0.2)'), (1, '#48bb78', 'rgba(72,187,120,0.2)')]
-        for s, c, fc in sigma_regions:
-            mask = (x >= -s) & (x <= s)
-            x_masked = x[mask].tolist()
-            y_masked = y[mask].tolist()
-            fig.add_trace(go.Scatter(x=x_masked, y=y_masked, fill='tozeroy',
-                                     fillcolor=fc, line=dict(width=0), name=f'±{s}σ', showlegend=True))
-        
-        for s in [-3, -2, -1, 1, 2, 3]:
-            fig.add_vline(x=s, line=dict(color='rgba(255,255,255,0.3)', dash='dot'), annotation_text=f"{s}σ")
+        def build():
+            x = np.linspace(-4, 4, 500)
+            y = (1/(np.sqrt(2*np.pi))) * np.exp(-0.5*x**2)
+            
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=x.tolist(), y=y.tolist(), fill='tozeroy', fillcolor='rgba(99,179,237,0.1)',
+                                     line=dict(color='#63b3ed', width=2), name='正态分布'))
+            
+            sigma_regions = [(3, '#fc8181', 'rgba(252,129,129,0.2)'), (2, '#ed8936', 'rgba(237,137,54,0.2)'), (1, '#48bb78', 'rgba(72,187,120,0.2)')]
+            for s, c, fc in sigma_regions:
+                mask = (x >= -s) & (x <= s)
+                x_masked = x[mask].tolist()
+                y_masked = y[mask].tolist()
+                fig.add_trace(go.Scatter(x=x_masked, y=y_masked, fill='tozeroy',
+                                         fillcolor=fc, line=dict(width=0), name=f'±{s}σ', showlegend=True))
+            
+            for s in [-3, -2, -1, 1, 2, 3]:
+                fig.add_vline(x=s, line=dict(color='rgba(255,255,255,0.3)', dash='dot'), annotation_text=f"{s}σ")
+            
+            fig.update_layout(title="正态分布与西格玛水平", paper_bgcolor='rgba(0,0,0,0)',
+                              plot_bgcolor='rgba(255,255,255,0.03)', font=dict(color='#e0e0e0'),
+                              xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
+                              yaxis=dict(gridcolor='rgba(255,255,255,0.1)'), height=300)
+            return fig
         
-        fig.update_layout(title="正态分布与西格玛水平", paper_bgcolor='rgba(0,0,0,0)',
-                          plot_bgcolor='rgba(255,255,255,0.03)', font=dict(color='#e0e0e0'),
-                          xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-                          yaxis=dict(gridcolor='rgba(255,255,255,0.1)'), height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        perf.cached_chart("sigma_levels", build, use_container_width=True)
         
         st.markdown("**关键指标公式**")
         for k, v in basics["关键指标"].items():
             st.markdown(f"<div class='formula'>📐 <b>{k}：</b>{v}</div>", unsafe_allow_html=True)
+        
+        sigma_calculator()
     
     with tab2:
         phases = SIX_SIGMA["DMAIC方法论"]["phases"]
@@ -832,22 +1305,25 @@ elif menu == "📐 六西格玛":
         phase_names = list(phases.keys())
         colors_hex = [phases[p]['color'] for p in phase_names]
         
-        fig = go.Figure()
-        dmaic_fillcolors = ["rgba(99,179,237,0.27)", "rgba(72,187,120,0.27)", "rgba(237,137,54,0.27)", "rgba(168,85,247,0.27)", "rgba(246,224,94,0.27)"]
-        for i, (phase, color) in enumerate(zip(phase_names, colors_hex)):
-            fig.add_shape(type="rect", x0=i*1.2, y0=0, x1=i*1.2+1, y1=0.8,
-                          fillcolor=dmaic_fillcolors[i], line=dict(color=color, width=2))
-            fig.add_annotation(x=i*1.2+0.5, y=0.4, text=f"<b>{phase[0]}</b><br>{phase[4:]}",
-                                showarrow=False, font=dict(color='white', size=13), align='center')
-            if i < 4:
-                fig.add_annotation(x=i*1.2+1.1, y=0.4, text="→", showarrow=False,
-                                   font=dict(color='#a0aec0', size=20))
+        def build():
+            fig = go.Figure()
+            dmaic_fillcolors = ["rgba(99,179,237,0.27)", "rgba(72,187,120,0.27)", "rgba(237,137,54,0.27)", "rgba(168,85,247,0.27)", "rgba(246,224,94,0.27)"]
+            for i, (phase, color) in enumerate(zip(phase_names, colors_hex)):
+                fig.add_shape(type="rect", x0=i*1.2, y0=0, x1=i*1.2+1, y1=0.8,
+                              fillcolor=dmaic_fillcolors[i], line=dict(color=color, width=2))
+                fig.add_annotation(x=i*1.2+0.5, y=0.4, text=f"<b>{phase[0]}</b><br>{phase[4:]}",
+                                    showarrow=False, font=dict(color='white', size=13), align='center')
+                if i < 4:
+                    fig.add_annotation(x=i*1.2+1.1, y=0.4, text="→", showarrow=False,
+                                       font=dict(color='#a0aec0', size=20))
+            
+            fig.update_layout(xaxis=dict(range=[-0.1, 6.1], visible=False),
+                              yaxis=dict(range=[-0.1, 1], visible=False),
+                              paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                              height=130, margin=dict(l=10,r=10,t=10,b=10))
+            return fig
         
-        fig.update_layout(xaxis=dict(range=[-0.1, 6.1], visible=False),
-                          yaxis=dict(range=[-0.1, 1], visible=False),
-                          paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-                          height=130, margin=dict(l=10,r=10,t=10,b=10))
-        st.plotly_chart(fig, use_container_width=True)
+        perf.cached_chart("dmaic", build, phase_names, colors_hex, use_container_width=True)
         
         for phase_name, phase_data in phases.items():
             with st.expander(f"📋 {phase_name} — {phase_data['goal']}"):
@@ -868,39 +1344,9 @@ elif menu == "📐 六西格玛":
                 st.markdown(f"**说明：** {tool['desc']}")
                 st.markdown(f"<div class='formula'>{tool['formula']}</div>", unsafe_allow_html=True)
         
-        # 过程能力分析演示
-        st.markdown("<div class='section-title'>过程能力分析演示</div>", unsafe_allow_html=True)
-        
-        col1, col2, col3 = st.columns(3)
-        mean_val = col1.slider("过程均值 μ", 9.0, 11.0, 10.0, 0.1)
-        std_val = col2.slider("过程标准差 σ", 0.1, 1.0, 0.3, 0.05)
-        lsl = col3.slider("下规格限 LSL", 8.0, 9.5, 9.0, 0.1)
-        usl = 11.0
+        capability_demo()
         
-        cp = (usl - lsl) / (6 * std_val)
-        cpk = min((usl - mean_val) / (3 * std_val), (mean_val - lsl) / (3 * std_val))
-        
-        x = np.linspace(lsl - 1, usl + 1, 500)
-        y = (1/(std_val * np.sqrt(2*np.pi))) * np.exp(-0.5*((x-mean_val)/std_val)**2)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=x.tolist(), y=y.tolist(), fill='tozeroy', fillcolor='rgba(99,179,237,0.2)',
-                                 line=dict(color='#63b3ed', width=2), name='过程分布'))
-        fig.add_vline(x=lsl, line=dict(color='#fc8181', width=2), annotation_text=f"LSL={lsl}")
-        fig.add_vline(x=usl, line=dict(color='#fc8181', width=2), annotation_text=f"USL={usl}")
-        fig.add_vline(x=mean_val, line=dict(color='#48bb78', dash='dash'), annotation_text=f"μ={mean_val}")
-        
-        status_color = '#48bb78' if cpk >= 1.33 else '#ed8936' if cpk >= 1.0 else '#fc8181'
-        
-        fig.update_layout(title=f"过程能力分布  |  Cp={cp:.2f}  Cpk={cpk:.2f}",
-                          paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(255,255,255,0.03)',
-                          font=dict(color='#e0e0e0'), height=300)
-        st.plotly_chart(fig, use_container_width=True)
-        
-        m1, m2, m3 = st.columns(3)
-        m1.metric("Cp", f"{cp:.3f}", "≥1.33 为良好")
-        m2.metric("Cpk", f"{cpk:.3f}", "≥1.33 为良好")
-        m3.metric("状态", "良好✅" if cpk >= 1.33 else "边界⚠️" if cpk >= 1.0 else "不合格❌")
+        nonnormal_capability_section()
     
     with tab4:
         roles = SIX_SIGMA["角色与认证"]["roles"]
@@ -916,8 +1362,17 @@ elif menu == "📐 六西格玛":
             </div>
             """, unsafe_allow_html=True)
 
+    with tab5:
+        doe_section()
+    
+    with tab6:
+        hypothesis_section()
+
+
 # ─── 面试题库 ───
-elif menu == "💼 面试题库":
+@st.fragment
+@perf.section
+def page_interview():
     st.markdown("<div class='hero'><h1>💼 面试题库</h1><p>高频面试题 · 标准答案 · 分级训练</p></div>", unsafe_allow_html=True)
     
     categories = ["全部"] + list(set(q['category'] for q in INTERVIEW_QA))
@@ -945,11 +1400,15 @@ elif menu == "💼 面试题库":
             st.markdown(f"**💡 参考答案：**")
             st.markdown(f"<div class='info-box'>{qa['a']}</div>", unsafe_allow_html=True)
 
+
 # ─── 随机测验 ───
-elif menu == "🧠 随机测验":
+@st.fragment
+@perf.section
+def page_quiz():
     st.markdown("<div class='hero'><h1>🧠 随机测验</h1><p>即时检验学习效果</p></div>", unsafe_allow_html=True)
     
-    total_q = len(st.session_state.shuffled_quiz)
+    order = permutation.Permutation(len(QUIZ_QUESTIONS), st.session_state.quiz_seed)
+    total_q = len(order)
     
     if st.session_state.quiz_idx >= total_q:
         # 结束页面
@@ -969,17 +1428,17 @@ elif menu == "🧠 随机测验":
         """, unsafe_allow_html=True)
         
         if st.button("🔄 重新开始测验", use_container_width=True):
-            shuffled = QUIZ_QUESTIONS.copy()
-            random.shuffle(shuffled)
-            st.session_state.shuffled_quiz = shuffled
+            st.session_state.quiz_seed = secrets.randbits(63)
             st.session_state.quiz_idx = 0
             st.session_state.quiz_score = 0
             st.session_state.quiz_answered = False
             st.session_state.quiz_selected = None
-            st.session_state.quiz_history = []
+            st.session_state.quiz_stats = new_quiz_stats()
             st.rerun()
     else:
-        q = st.session_state.shuffled_quiz[st.session_state.quiz_idx]
+        q = QUIZ_QUESTIONS[order[st.session_state.quiz_idx]]
+        if is_admin:
+            st.caption(f"出题种子 {st.session_state.quiz_seed}（?quiz_seed= 可复现）")
         
         # Progress
         progress = st.session_state.quiz_idx / total_q
@@ -1001,7 +1460,7 @@ elif menu == "🧠 随机测验":
                     st.session_state.quiz_answered = True
                     if i == q['correct']:
                         st.session_state.quiz_score += 1
-                    st.session_state.quiz_history.append(1 if i == q['correct'] else 0)
+                    record_answer(st.session_state.quiz_stats, q['category'], int(i == q['correct']))
                     st.rerun()
         else:
             for i, option in enumerate(q['options']):
@@ -1018,42 +1477,28 @@ elif menu == "🧠 随机测验":
                 st.session_state.quiz_idx += 1
                 st.session_state.quiz_answered = False
                 st.session_state.quiz_selected = None
-                st.rerun()
+                rerun_fragment()
+
 
 # ─── 能力图谱 ───
-elif menu == "📊 能力图谱":
+@st.fragment
+@perf.section
+def page_skill_map():
     st.markdown("<div class='hero'><h1>📊 自测能力图谱</h1><p>评估你的质量知识掌握程度</p></div>", unsafe_allow_html=True)
     
     st.markdown("请对以下各领域的掌握程度进行自评（1=不了解，5=精通）")
     
-    areas = {
-        "ISO 9001 七大原则": 3,
-        "IATF 16949 核心工具": 3,
-        "FMEA 应用": 3,
-        "SPC 控制图分析": 3,
-        "MSA 测量系统分析": 3,
-        "8D 问题解决": 3,
-        "DMAIC 方法论": 3,
-        "统计假设检验": 3,
-        "过程能力分析(Cpk)": 3,
-        "DOE 实验设计": 3,
-        "内部审核技能": 3,
-        "柏拉图与根因分析": 3,
-    }
-    
     scores = {}
     col1, col2 = st.columns(2)
-    area_list = list(areas.items())
-    
-    for i, (area, default) in enumerate(area_list):
-        with col1 if i < len(area_list)//2 else col2:
-            scores[area] = st.slider(area, 1, 5, default, key=f"skill_{i}")
+    for i, area in enumerate(skills.AREAS):
+        with col1 if i < skills.N_AREAS // 2 else col2:
+            scores[area] = st.slider(area, 1, 5, 3, key=f"skill_{i}")
     
     if st.button("📊 生成我的能力图谱", use_container_width=True):
         labels = list(scores.keys())
         values = list(scores.values())
         
-        fig = go.Figure()
+        fig = perf.figure()
         fig.add_trace(go.Scatterpolar(
             r=values + [values[0]],
             theta=labels + [labels[0]],
@@ -1084,7 +1529,7 @@ elif menu == "📊 能力图谱":
             height=500,
             title=dict(text="质量工程师能力图谱", font=dict(color='#63b3ed', size=16))
         )
-        st.plotly_chart(fig, use_container_width=True)
+        perf.plotly_chart(fig, "skill_radar", use_container_width=True)
         
         avg = sum(values) / len(values)
         weak = [area for area, score in scores.items() if score <= 2]
@@ -1095,3 +1540,131 @@ elif menu == "📊 能力图谱":
             st.markdown(f"<div class='wrong'>📌 需要加强的领域：{' · '.join(weak)}</div>", unsafe_allow_html=True)
         if strong:
             st.markdown(f"<div class='correct'>✅ 掌握较好的领域：{' · '.join(strong)}</div>", unsafe_allow_html=True)
+        if weak:
+            st.markdown("#### 📚 推荐学习内容")
+            for area, items in recommend_index().recommend(weak, k=5).items():
+                with st.expander(f"📌 {area}", expanded=len(weak) == 1):
+                    if not items:
+                        st.caption("暂无相关内容")
+                    for doc, score in items:
+                        st.markdown(f"- **[{doc['kind']}]** {doc['title']}　<span style='color:#718096'>"
+                                    f"（{doc['page']}）</span>", unsafe_allow_html=True)
+
+    store = skill_store()
+    with st.expander("💾 保存本次自评（记入团队统计）"):
+        c1, c2, c3 = st.columns(3)
+        name = c1.text_input("姓名 / 工号", key="skill_name")
+        known = store.engineer(name.strip()) if name.strip() else None
+        team = c2.text_input("团队", value=known[0] if known else "", key=f"skill_team_{name}")
+        department = c3.text_input("部门", value=known[1] if known else "", key=f"skill_dept_{name}")
+        if st.button("💾 保存", key="skill_save", use_container_width=True):
+            if not (name.strip() and team.strip() and department.strip()):
+                st.warning("请填写姓名、团队和部门")
+            else:
+                store.record(name.strip(), team.strip(), department.strip(), list(scores.values()))
+                st.success("已保存，团队与部门统计已更新")
+        if known:
+            ts, history = store.history(name.strip())
+            if len(ts) > 1:
+                st.line_chart(pd.DataFrame(history, columns=skills.AREAS,
+                                           index=pd.to_datetime(ts, unit="s")).mean(axis=1).rename("个人均分"))
+
+    st.markdown("### 🏢 团队能力热力图")
+    level = st.radio("统计层级", list(skills.LEVELS), format_func=skills.LEVELS.get, horizontal=True, key="skill_level")
+    groups, counts = store.heatmap(level)
+    if not groups:
+        st.info("暂无自评数据")
+        return
+    means = skills.mean_of(counts)
+    fig = perf.figure(go.Heatmap(
+        z=means, x=skills.AREAS, y=groups, zmin=1, zmax=5, colorscale="RdYlGn",
+        customdata=counts.sum(axis=-1),
+        hovertemplate="%{y} · %{x}<br>均分 %{z:.2f}（%{customdata} 人）<extra></extra>"
+    ))
+    fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='#e0e0e0'),
+                      height=max(400, 22 * len(groups) + 160), margin=dict(l=10, r=10, t=40, b=10),
+                      title=dict(text=f"各{skills.LEVELS[level]}最新自评均分（共 {int(counts[:, 0].sum())} 人）",
+                                 font=dict(color='#63b3ed', size=15)))
+    perf.plotly_chart(fig, "skill_heatmap", use_container_width=True)
+
+    grp = st.selectbox(f"查看{skills.LEVELS[level]}", groups, key=f"skill_grp_{level}")
+    c1, c2 = st.columns(2)
+    with c1:
+        dist = counts[groups.index(grp)]
+        fig = perf.figure()
+        for k, color in enumerate(['#e53e3e', '#ed8936', '#ecc94b', '#48bb78', '#3182ce']):
+            fig.add_trace(go.Bar(y=skills.AREAS, x=dist[:, k], name=f"{k + 1} 分", orientation='h', marker_color=color))
+        fig.update_layout(barmode='stack', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                          font=dict(color='#e0e0e0'), height=450, legend=dict(orientation='h', y=-0.1),
+                          yaxis=dict(autorange='reversed'), margin=dict(l=10, r=10, t=40, b=10),
+                          title=dict(text=f"{grp} 分数分布", font=dict(color='#63b3ed', size=14)))
+        perf.plotly_chart(fig, "skill_distribution", use_container_width=True)
+    with c2:
+        periods, trend = store.trend(level, grp)
+        fig = perf.figure()
+        for a, area in enumerate(skills.AREAS):
+            fig.add_trace(go.Scatter(x=periods, y=skills.mean_of(trend[:, a]), mode='lines+markers', name=area))
+        fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='#e0e0e0'),
+                          height=450, yaxis=dict(range=[1, 5], title='月度均分', gridcolor='rgba(255,255,255,0.05)'),
+                          margin=dict(l=10, r=10, t=40, b=10), legend=dict(font=dict(size=9)),
+                          title=dict(text=f"{grp} 能力趋势", font=dict(color='#63b3ed', size=14)))
+        perf.plotly_chart(fig, "skill_trend", use_container_width=True)
+
+
+PAGES = {
+    "🏠 首页总览": page_home,
+    "📋 质量体系": page_systems,
+    "🔧 质量工具": page_tools,
+    "📐 六西格玛": page_six_sigma,
+    "💼 面试题库": page_interview,
+    "🧠 随机测验": page_quiz,
+    "📊 能力图谱": page_skill_map,
+}
+
+
+# ─────────────────────────────────────────────
+# SIDEBAR
+# ─────────────────────────────────────────────
+with st.sidebar:
+    st.markdown("""
+    <div style='text-align:center; padding:15px 0;'>
+        <div style='font-family:Rajdhani,sans-serif; font-size:1.5em; color:#63b3ed;'>🎯 质量工程师</div>
+        <div style='color:#a0aec0; font-size:0.85em;'>学习备考平台</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.divider()
+    
+    menu = st.radio(
+        "导航",
+        list(PAGES),
+        label_visibility="collapsed"
+    )
+    
+    st.divider()
+    
+    stats = st.session_state.quiz_stats
+    if stats["total"]:
+        total, correct = stats["total"], stats["correct"]
+        pct = correct / total * 100
+        st.markdown(f"""
+        <div style='text-align:center;'>
+            <div style='font-size:0.8em; color:#a0aec0;'>测验成绩</div>
+            <div style='font-size:2em; color:{"#48bb78" if pct>=70 else "#ed8936" if pct>=50 else "#fc8181"}; font-family:Rajdhani,sans-serif;'>{pct:.0f}%</div>
+            <div style='font-size:0.75em; color:#718096;'>{correct}/{total} 题正确</div>
+            <div style='font-size:0.75em; color:#a0aec0; margin-top:4px;'>🔥 连对 {stats["streak"]} · 最长 {stats["best_streak"]}</div>
+        </div>
+        """, unsafe_allow_html=True)
+        for category, (cat_correct, cat_total) in sorted(stats["by_category"].items()):
+            st.progress(cat_correct / cat_total, text=f"{category}  {cat_correct}/{cat_total}")
+
+if is_admin and st.session_state.pop("perf_profile", False):
+    with perf.profile() as profile_out:
+        PAGES[menu]()
+    st.session_state.perf_report = profile_out[0]
+else:
+    PAGES[menu]()
+perf.REGISTRY.observe("qla_rerun_seconds", menu, time.perf_counter() - rerun_started)
+
+if is_admin:
+    admin_panel()
@@ -0,0 +1,186 @@
+"""分析核心基准：SPC、过程能力、柏拉图、测验抽题与内容推荐，规模 10³~10⁷ 点。
+
+asv 风格：数据在计时外生成，每个 (核心, 规模) 自动确定每次采样的调用次数，
+取若干次采样的最小值与中位数（单次调用秒数）。基线保存在 benchmarks/baseline.json。
+
+    python -m benchmarks.kernels                  # 运行并打印
+    python -m benchmarks.kernels --compare        # 与基线对比，慢于阈值时退出码为 1
+    python -m benchmarks.kernels --save           # 覆盖基线
+    python -m benchmarks.kernels -k spc --max-exp 6
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import capability
+import live_feed
+import msa
+import permutation
+import recommend
+import skills
+import spc
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFECT_TYPES = np.array(["焊接缺陷", "尺寸超差", "外观不良", "标签错误", "包装破损", "其他"])
+
+
+# 每个核心：setup(n, rng) → 参数元组；run(*参数)；max_exp 为该核心的最大规模指数
+def _normal(n, rng):
+    return (rng.normal(10.0, 0.5, n),)
+
+
+def _column(n, rng):
+    return (rng.normal(10.0, 0.5, n)[:, None],)
+
+
+def _subgroups(n, rng):
+    return (rng.normal(10.0, 0.5, n // 5 * 5).reshape(-1, 5),)
+
+
+def _stream_rows(n, rng):
+    return (list(zip(rng.normal(10.0, 0.5, n).tolist(), (rng.random(n) < 0.04).astype(int).tolist())),)
+
+
+def _skewed(n, rng):
+    return (rng.lognormal(np.log(0.02), 0.45, n)[:, None],)
+
+
+def _records(n, rng):
+    return (DEFECT_TYPES[rng.integers(0, len(DEFECT_TYPES), n)],)
+
+
+def _bank(n, rng):
+    # n 条题目：从能力领域关键词中随机拼出 40 字左右的文本
+    words = "".join(recommend.AREA_KEYWORDS.values()).replace(" ", "")
+    starts = rng.integers(0, len(words) - 40, n)
+    docs = [{"kind": "测验题", "title": "", "page": "", "ref": i, "text": words[s:s + 40]} for i, s in enumerate(starts)]
+    return recommend.Index(docs), skills.AREAS[:3]
+
+
+def _order(n, rng):
+    return permutation.Permutation(n, int(rng.integers(2 ** 63))), n // 2
+
+
+def _sigma_limits(x):
+    spc.out_of_control(x, spc.sigma_limits(x))
+
+
+def _stream(rows):
+    live_feed.ChartState(subgroup_size=5).push(rows)
+
+
+def _cpk(X):
+    # 与页面相同的路径：正态拟合 → 百分位法 Ppk 与预期 PPM
+    return capability.capability("正态", capability.fit_normal(X), 9.2, 10.8)
+
+
+def _pareto(records):
+    spc.pareto(*spc.defect_counts(records))
+
+
+def _question(order, k):
+    # 与页面中的抽题方式相同：只计算当前题号，不复制、不洗牌
+    return order[k]
+
+
+KERNELS = {
+    "spc_sigma_limits": (_normal, _sigma_limits, 7),
+    "spc_xbar_r": (_subgroups, msa.stability_study, 7),
+    "spc_stream_push": (_stream_rows, _stream, 6),
+    "capability_cpk": (_column, _cpk, 7),
+    "capability_fit_all": (_skewed, capability.fit_all, 6),
+    "pareto": (_records, _pareto, 7),
+    "quiz_order": (_order, _question, 7),
+    "recommend": (_bank, recommend.Index.recommend, 6),
+}
+
+
+def measure(fn, args, min_sample=0.05, repeats=5, budget=20.0):
+    """自动确定每次采样的调用次数，使单次采样不短于 min_sample；总耗时超出 budget 时提前结束。"""
+    number, started = 1, time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn(*args)
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_sample:
+            break
+        number *= max(2, int(min_sample / max(elapsed, 1e-9)))
+    samples = [elapsed / number]
+    while len(samples) < repeats and time.perf_counter() - started < budget:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn(*args)
+        samples.append((time.perf_counter() - t0) / number)
+    return {"min": min(samples), "median": statistics.median(samples), "samples": len(samples), "number": number}
+
+
+def run(kernels, min_exp=3, max_exp=7, seed=0):
+    results = {}
+    for name in kernels:
+        setup, fn, kernel_max = KERNELS[name]
+        for exp in range(min_exp, min(max_exp, kernel_max) + 1):
+            args = setup(10 ** exp, np.random.default_rng(seed))
+            res = measure(fn, args)
+            results.setdefault(name, {})[str(10 ** exp)] = res
+            print(f"{name:<22}{10 ** exp:>10,}  min {res['min'] * 1e3:>10.3f} ms  "
+                  f"median {res['median'] * 1e3:>10.3f} ms  ({res['samples']}×{res['number']})", flush=True)
+            del args
+    return results
+
+
+def machine():
+    return {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count()}
+
+
+def compare(results, baseline, threshold):
+    """以中位数对比；比值 > 1 + threshold 记为退化。"""
+    regressions = []
+    for name, sizes in results.items():
+        for size, res in sizes.items():
+            base = baseline.get("results", {}).get(name, {}).get(size)
+            if base is None:
+                continue
+            ratio = res["median"] / base["median"]
+            flag = "退化" if ratio > 1 + threshold else "提升" if ratio < 1 - threshold else ""
+            print(f"{name:<22}{int(size):>10,}  {ratio:>6.2f}×  {flag}")
+            if flag == "退化":
+                regressions.append((name, size, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分析核心基准测试")
+    parser.add_argument("-k", "--kernel", action="append", help="只运行名称包含该字符串的核心（可重复）")
+    parser.add_argument("--min-exp", type=int, default=3)
+    parser.add_argument("--max-exp", type=int, default=7)
+    parser.add_argument("--save", action="store_true", help="把结果写入基线文件")
+    parser.add_argument("--compare", action="store_true", help="与基线对比")
+    parser.add_argument("--threshold", type=float, default=0.2, help="退化判定阈值（相对中位数）")
+    parser.add_argument("--baseline", default=BASELINE)
+    args = parser.parse_args()
+
+    kernels = [k for k in KERNELS if not args.kernel or any(s in k for s in args.kernel)]
+    results = run(kernels, args.min_exp, args.max_exp)
+
+    if args.compare:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != machine():
+            print("注意：基线来自不同的机器/环境，对比仅供参考", file=sys.stderr)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine(), "results": results}, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
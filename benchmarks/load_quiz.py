@@ -0,0 +1,130 @@
+"""多会话负载驱动：用 Streamlit AppTest 无界面模拟 N 名学员同时做 🧠 随机测验。
+
+每个会话：打开应用 → 切到测验页 → 逐题随机作答并点“下一题”。同一进程内的会话交替推进
+（全部会话同时在内存中，与服务器上的并发会话一致）；AppTest 的运行时是进程级单例，
+并发度通过多进程获得。报告每次重跑耗时的 P50/P90/P99、各页面/片段耗时，以及每会话内存：
+tracemalloc 净增量（单独一轮测量，避免追踪开销影响耗时）与 session_state 序列化大小。
+
+    python -m benchmarks.load_quiz --sessions 20 --questions 10 --processes 2
+"""
+import argparse
+import concurrent.futures
+import os
+import pickle
+import random
+import time
+import tracemalloc
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+import perf
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+QUIZ_PAGE = "🧠 随机测验"
+
+
+class Learner:
+    def __init__(self, seed, timeout):
+        self.rng = random.Random(seed)
+        self.at = AppTest.from_file(APP, default_timeout=timeout)
+        self.latencies = []
+
+    def _run(self, element):
+        t0 = time.perf_counter()
+        element.run()
+        self.latencies.append(time.perf_counter() - t0)
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def steps(self, n_questions):
+        """每次重跑后让出控制权，便于多个会话交替推进。"""
+        self._run(self.at)
+        yield
+        self._run(self.at.sidebar.radio[0].set_value(QUIZ_PAGE))
+        yield
+        for _ in range(n_questions):
+            options = [b for b in self.at.button if (b.key or "").startswith("opt_")]
+            if not options:  # 题目已做完
+                return
+            self._run(self.rng.choice(options).click())
+            yield
+            self._run(next(b for b in self.at.button if "下一题" in b.label).click())
+            yield
+
+    def state_bytes(self):
+        return len(pickle.dumps(self.at.session_state.to_dict(), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def interleave(learners, n_questions):
+    active = [learner.steps(n_questions) for learner in learners]
+    while active:
+        for steps in list(active):
+            if next(steps, StopIteration) is StopIteration:
+                active.remove(steps)
+
+
+def worker(seeds, n_questions, timeout):
+    # 预热（模块导入、缓存填充）不计入结果
+    interleave([Learner(-1, timeout)], 1)
+    perf.REGISTRY.reset()
+    learners = [Learner(seed, timeout) for seed in seeds]
+    interleave(learners, n_questions)
+    sections = [r for r in perf.REGISTRY.rows() if r["指标"] == "qla_section_seconds"]
+    return ([t for learner in learners for t in learner.latencies],
+            [learner.state_bytes() for learner in learners], sections)
+
+
+def retained_memory(n_sessions, n_questions, timeout):
+    """n 个会话全部完成并保持存活时，每会话的 Python 堆净增量（字节）。"""
+    interleave([Learner(-1, timeout)], 1)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    learners = [Learner(i, timeout) for i in range(n_sessions)]
+    interleave(learners, n_questions)
+    retained = (tracemalloc.get_traced_memory()[0] - base) / n_sessions
+    tracemalloc.stop()
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="随机测验多会话负载测试")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=10, help="每个会话作答题数")
+    parser.add_argument("--processes", type=int, default=1, help="并行进程数，会话平均分配")
+    parser.add_argument("--memory-sessions", type=int, default=5, help="内存测量轮的会话数（0 跳过）")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    seeds = [args.seed + i for i in range(args.sessions)]
+    shards = [seeds[i::args.processes] for i in range(args.processes)]
+    started = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(args.processes) as pool:
+        results = list(pool.map(worker, shards, [args.questions] * len(shards), [args.timeout] * len(shards)))
+    wall = time.perf_counter() - started
+
+    lat = np.array([t for r in results for t in r[0]]) * 1e3
+    state = np.array([b for r in results for b in r[1]])
+    p50, p90, p99 = np.percentile(lat, [50, 90, 99])
+    print(f"会话 {args.sessions}（{args.processes} 进程），重跑 {lat.size} 次，总耗时 {wall:.1f} s，"
+          f"吞吐 {lat.size / wall:.1f} 次/s")
+    print(f"重跑耗时 ms：P50 {p50:.1f}  P90 {p90:.1f}  P99 {p99:.1f}  最大 {lat.max():.1f}")
+    print(f"session_state 序列化 {state.mean() / 1024:.1f} KiB（最大 {state.max() / 1024:.1f} KiB）")
+
+    sections = {}
+    for r in results:
+        for row in r[2]:
+            sections.setdefault(row["名称"], []).append(row)
+    for name, rows in sorted(sections.items()):
+        count = sum(row["次数"] for row in rows)
+        print(f"  {name:<28} 均值 {sum(row['合计'] for row in rows) / count * 1e3:7.1f} ms  "
+              f"P95 {max(row['P95'] for row in rows) * 1e3:7.1f} ms  ×{count}")
+
+    if args.memory_sessions:
+        retained = retained_memory(args.memory_sessions, args.questions, args.timeout)
+        print(f"每会话常驻内存（tracemalloc 净增量，{args.memory_sessions} 个会话）{retained / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
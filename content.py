@@ -0,0 +1,360 @@
+"""平台学习内容：质量体系、质量工具、六西格玛、面试题库与测验题。
+
+作为模块导入，只在进程内求值一次，不随页面重跑重复构造。
+"""
+QUALITY_SYSTEMS = {
+    "ISO 9001": {
+        "icon": "🏆",
+        "full_name": "质量管理体系",
+        "tag": "体系认证",
+        "tag_color": "tag",
+        "version": "ISO 9001:2015",
+        "description": "全球最广泛采用的质量管理体系标准，基于七大质量管理原则，适用于任何规模和行业的组织。",
+        "principles": [
+            "以顾客为关注焦点",
+            "领导作用",
+            "全员积极参与",
+            "过程方法",
+            "改进",
+            "循证决策",
+            "关系管理"
+        ],
+        "key_clauses": {
+            "第4条": "组织环境（内外部议题、相关方需求）",
+            "第5条": "领导作用（质量方针、职责权限）",
+            "第6条": "策划（风险与机遇、质量目标）",
+            "第7条": "支持（资源、能力、意识、文件化信息）",
+            "第8条": "运行（产品和服务策划、外部供方控制）",
+            "第9条": "绩效评价（监视测量、内审、管理评审）",
+            "第10条": "改进（不合格品控制、纠正措施、持续改进）"
+        },
+        "pdca": "计划(Plan)→执行(Do)→检查(Check)→行动(Act) 是ISO 9001的核心循环"
+    },
+    "IATF 16949": {
+        "icon": "🚗",
+        "full_name": "汽车质量管理体系",
+        "tag": "汽车行业",
+        "tag_color": "tag-orange",
+        "version": "IATF 16949:2016",
+        "description": "汽车行业专用质量管理体系标准，在ISO 9001基础上增加汽车行业特定要求。",
+        "principles": [
+            "以顾客为导向",
+            "APQP产品质量先期策划",
+            "生产件批准程序PPAP",
+            "FMEA失效模式分析",
+            "测量系统分析MSA",
+            "统计过程控制SPC"
+        ],
+        "key_clauses": {
+            "顾客特定要求CSR": "各OEM客户的特殊要求须完全符合",
+            "产品安全": "安全相关零件需额外控制措施",
+            "保修与现场退回": "保修分析及根本原因调查",
+            "零缺陷目标": "以预防为主，向零缺陷迈进",
+            "分层过程审核LPA": "定期对制造过程进行分层审核",
+            "持续改进": "需制定年度改进目标和计划"
+        },
+        "pdca": "IATF 16949强调制造过程的稳健性和持续改进文化"
+    },
+    "ISO 14001": {
+        "icon": "🌱",
+        "full_name": "环境管理体系",
+        "tag": "环境体系",
+        "tag_color": "tag-green",
+        "version": "ISO 14001:2015",
+        "description": "国际环境管理体系标准，帮助组织识别、管理和减少环境影响，实现可持续发展目标。",
+        "principles": [
+            "生命周期视角",
+            "合规义务",
+            "环境绩效改进",
+            "基于风险的思维",
+            "领导力与承诺",
+            "持续改进"
+        ],
+        "key_clauses": {
+            "环境因素识别": "识别活动、产品和服务的环境因素",
+            "合规义务": "法律法规及其他要求的遵守",
+            "环境目标": "制定可测量的环境目标并跟踪",
+            "应急准备": "应对潜在紧急环境事故",
+            "内部审核": "定期评价体系有效性",
+            "管理评审": "最高管理者定期评审环境体系"
+        },
+        "pdca": "环境方针→规划→实施→检查→改进"
+    },
+    "ISO 45001": {
+        "icon": "⛑️",
+        "full_name": "职业健康安全管理",
+        "tag": "安全体系",
+        "tag_color": "tag-orange",
+        "version": "ISO 45001:2018",
+        "description": "职业健康安全管理体系标准，用于控制职业健康安全风险，防止工伤事故和职业病。",
+        "principles": [
+            "工人参与和协商",
+            "危险源识别和风险评估",
+            "法律合规",
+            "领导力与承诺",
+            "持续改进",
+            "应急准备和响应"
+        ],
+        "key_clauses": {
+            "危险源识别": "系统识别工作场所危险源",
+            "风险评估": "评估危险源相关风险和机遇",
+            "变更管理": "管理影响OH&S绩效的变更",
+            "采购控制": "控制供应商和承包商的OH&S",
+            "事件调查": "对事故、事件和不符合的调查",
+            "绩效监测": "监测、测量、分析OH&S绩效"
+        },
+        "pdca": "危险源识别→风险控制→实施→绩效评价→改进"
+    }
+}
+
+QUALITY_TOOLS = {
+    "7大质量工具（QC七大工具）": {
+        "icon": "🔧",
+        "tools": [
+            {"name": "检查表 Check Sheet", "purpose": "数据收集和整理", "when": "数据收集阶段", "desc": "系统性收集和记录数据的表格，便于后续分析"},
+            {"name": "层别法 Stratification", "purpose": "数据分层分析", "when": "数据分析阶段", "desc": "将数据按类别分层，揭示不同类别间的差异"},
+            {"name": "柏拉图 Pareto Chart", "purpose": "识别主要问题", "when": "问题优先排序", "desc": "基于80/20原则，识别影响质量的主要因素"},
+            {"name": "因果图 Cause-Effect", "purpose": "根因分析", "when": "问题分析阶段", "desc": "鱼骨图/石川图，系统识别问题原因"},
+            {"name": "散点图 Scatter Diagram", "purpose": "相关性分析", "when": "关系验证阶段", "desc": "显示两个变量之间的关系和相关性"},
+            {"name": "直方图 Histogram", "purpose": "数据分布分析", "when": "过程能力评估", "desc": "显示数据的频率分布，评估过程稳定性"},
+            {"name": "控制图 Control Chart", "purpose": "过程监控", "when": "持续监控阶段", "desc": "基于统计控制限，实时监控过程变异"}
+        ]
+    },
+    "新7大管理工具": {
+        "icon": "📊",
+        "tools": [
+            {"name": "亲和图 Affinity Diagram", "purpose": "整理创意想法", "when": "头脑风暴后", "desc": "将大量想法归类整理，揭示主题和模式"},
+            {"name": "关联图 Relations Diagram", "purpose": "复杂关系分析", "when": "因果关系复杂时", "desc": "分析多个因素之间的因果关系"},
+            {"name": "系统图 Tree Diagram", "purpose": "目标分解", "when": "策略规划时", "desc": "将目标逐级分解为具体措施"},
+            {"name": "矩阵图 Matrix Diagram", "purpose": "多因素关系", "when": "需求与功能对比", "desc": "显示多组要素之间的关系和权重"},
+            {"name": "矩阵数据分析法", "purpose": "定量矩阵分析", "when": "数据量化分析", "desc": "对矩阵图中关系进行定量分析"},
+            {"name": "过程决策图 PDPC", "purpose": "风险预防", "when": "计划执行前", "desc": "预测可能出现的问题并制定对策"},
+            {"name": "箭线图 Arrow Diagram", "purpose": "项目进度管理", "when": "项目规划时", "desc": "规划和管理复杂项目的时间和资源"}
+        ]
+    },
+    "核心质量工具": {
+        "icon": "⚙️",
+        "tools": [
+            {"name": "FMEA 失效模式分析", "purpose": "预防性风险分析", "when": "设计/过程开发阶段", "desc": "识别潜在失效模式，评估风险优先数RPN，制定预防措施"},
+            {"name": "SPC 统计过程控制", "purpose": "过程实时监控", "when": "生产过程中", "desc": "使用控制图监控过程，区分普通原因和特殊原因变异"},
+            {"name": "MSA 测量系统分析", "purpose": "测量系统评估", "when": "新量具/过程验证时", "desc": "评估测量系统的重复性、再现性，确保测量数据可靠"},
+            {"name": "APQP 产品质量先期策划", "purpose": "产品开发质量策划", "when": "新产品开发阶段", "desc": "系统规划新产品开发过程，降低风险"},
+            {"name": "PPAP 生产件批准程序", "purpose": "供应商件批准", "when": "量产前", "desc": "验证供应商制造过程满足客户要求"},
+            {"name": "8D 问题解决", "purpose": "系统性问题解决", "when": "质量问题发生后", "desc": "8个步骤系统解决质量问题，防止再发"}
+        ]
+    }
+}
+
+SIX_SIGMA = {
+    "基础概念": {
+        "icon": "📐",
+        "content": {
+            "什么是六西格玛": "六西格玛（6σ）是一种以数据为驱动的质量管理方法，目标是将过程缺陷率降低到百万分之3.4（DPMO），即过程能力达到6σ水平。",
+            "西格玛水平对照": {
+                "1σ": "68.27% 合格率，317,300 DPMO",
+                "2σ": "95.45% 合格率，45,500 DPMO",
+                "3σ": "99.73% 合格率，2,700 DPMO",
+                "4σ": "99.9937% 合格率，63 DPMO",
+                "5σ": "99.99994% 合格率，0.57 DPMO",
+                "6σ": "99.9999998% 合格率，0.002 DPMO（含1.5σ漂移后为3.4 DPMO）"
+            },
+            "关键指标": {
+                "DPMO": "每百万机会缺陷数 = (缺陷数 / 机会总数) × 1,000,000",
+                "Cp": "过程能力指数 = (USL - LSL) / 6σ",
+                "Cpk": "过程性能指数 = min[(USL-μ)/3σ, (μ-LSL)/3σ]",
+                "Pp/Ppk": "长期过程性能指数（用总体标准差）"
+            }
+        }
+    },
+    "DMAIC方法论": {
+        "icon": "🔄",
+        "phases": {
+            "D - Define 定义": {
+                "color": "#63b3ed",
+                "goal": "定义项目范围、顾客需求和业务目标",
+                "tools": ["项目章程 Project Charter", "SIPOC图", "顾客之声VOC", "CTQ树（关键质量特性）", "帕累托图"],
+                "outputs": ["项目章程", "SIPOC流程图", "CTQ指标", "项目计划"]
+            },
+            "M - Measure 测量": {
+                "color": "#48bb78",
+                "goal": "建立基准，量化当前过程性能",
+                "tools": ["过程流程图", "数据收集计划", "MSA测量系统分析", "过程能力分析", "基线σ水平"],
+                "outputs": ["过程基准数据", "MSA报告", "过程σ水平"]
+            },
+            "A - Analyze 分析": {
+                "color": "#ed8936",
+                "goal": "识别根本原因，分析影响质量的关键因素",
+                "tools": ["因果图鱼骨图", "假设检验", "回归分析", "方差分析ANOVA", "5Why分析"],
+                "outputs": ["根本原因列表", "关键X因子验证", "数据统计分析报告"]
+            },
+            "I - Improve 改善": {
+                "color": "#a855f7",
+                "goal": "开发和实施解决方案，验证改善效果",
+                "tools": ["头脑风暴", "DOE实验设计", "Poka-Yoke防错法", "FMEA", "试点方案"],
+                "outputs": ["改善方案", "试点结果", "改善后σ水平"]
+            },
+            "C - Control 控制": {
+                "color": "#f6e05e",
+                "goal": "维持改善成果，建立标准化控制机制",
+                "tools": ["控制计划", "SPC统计过程控制", "标准作业程序SOP", "培训计划", "反应计划"],
+                "outputs": ["控制计划", "SPC控制图", "更新的SOP", "项目收益总结"]
+            }
+        }
+    },
+    "统计工具": {
+        "icon": "📊",
+        "content": [
+            {"name": "假设检验", "desc": "检验样本数据是否支持总体假设，包括t检验、F检验、卡方检验等", "formula": "H₀: μ₁ = μ₂（零假设）  H₁: μ₁ ≠ μ₂（备择假设）"},
+            {"name": "方差分析 ANOVA", "desc": "比较多组均值是否存在显著差异，分析因子对结果的影响", "formula": "F = 组间方差(MSB) / 组内方差(MSW)"},
+            {"name": "回归分析", "desc": "建立自变量（X）与因变量（Y）之间的数学关系模型", "formula": "Y = β₀ + β₁X₁ + β₂X₂ + ... + ε"},
+            {"name": "实验设计 DOE", "desc": "系统安排实验，同时研究多个因素对结果的影响", "formula": "全因子设计: 实验次数 = L^k（L=水平数，k=因子数）"},
+            {"name": "过程能力分析", "desc": "量化过程满足规格要求的能力", "formula": "Cp = (USL-LSL)/6σ；Cpk = min[(USL-μ)/3σ, (μ-LSL)/3σ]"}
+        ]
+    },
+    "角色与认证": {
+        "icon": "🎓",
+        "roles": {
+            "白带 White Belt": "了解六西格玛基本概念，参与改善项目",
+            "黄带 Yellow Belt": "掌握基础工具，参与并支持绿带/黑带项目",
+            "绿带 Green Belt": "掌握DMAIC方法论和统计工具，能独立主导中小型改善项目",
+            "黑带 Black Belt": "精通六西格玛所有工具，全职推动改善，辅导绿带",
+            "大黑带 Master Black Belt": "组织内六西格玛专家，制定战略，培训黑带"
+        }
+    }
+}
+
+INTERVIEW_QA = [
+    {
+        "category": "质量体系",
+        "q": "ISO 9001:2015的七大质量管理原则是什么？",
+        "a": "七大原则：①以顾客为关注焦点、②领导作用、③全员积极参与、④过程方法、⑤改进、⑥循证决策、⑦关系管理。记忆法：顾客领导全员，过程改进，循证关系。",
+        "level": "基础"
+    },
+    {
+        "category": "质量体系",
+        "q": "IATF 16949与ISO 9001的主要区别是什么？",
+        "a": "IATF 16949是在ISO 9001基础上增加了汽车行业特定要求：①APQP产品质量先期策划、②PPAP生产件批准程序、③FMEA失效模式分析、④SPC统计过程控制、⑤MSA测量系统分析，以及各OEM的顾客特定要求(CSR)。",
+        "level": "中级"
+    },
+    {
+        "category": "质量工具",
+        "q": "什么是FMEA？RPN如何计算？",
+        "a": "FMEA（失效模式与影响分析）是预防性质量工具，系统识别产品/过程的潜在失效模式。RPN = 严重度(S) × 发生度(O) × 探测度(D)，每项评分1-10分，RPN越高风险越大（一般>100需优先采取措施）。",
+        "level": "中级"
+    },
+    {
+        "category": "六西格玛",
+        "q": "解释Cp和Cpk的区别？",
+        "a": "Cp是过程能力指数，衡量过程固有能力（规格宽度÷过程宽度），不考虑过程均值偏移。Cpk考虑了均值偏移，= min[(USL-μ)/3σ, (μ-LSL)/3σ]。Cp≥Cpk，当Cp=Cpk时表示过程居中。行业一般要求Cpk≥1.33（4σ）",
+        "level": "中级"
+    },
+    {
+        "category": "六西格玛",
+        "q": "DMAIC五个阶段各自的主要目标是什么？",
+        "a": "D(Define定义)：明确项目范围和顾客需求；M(Measure测量)：量化当前过程基准；A(Analyze分析)：找到根本原因；I(Improve改善)：实施和验证解决方案；C(Control控制)：维持改善成果，防止问题复发。",
+        "level": "基础"
+    },
+    {
+        "category": "质量工具",
+        "q": "什么是MSA（测量系统分析），Gage R&R是什么？",
+        "a": "MSA评估测量系统的可靠性。Gage R&R（量规重复性与再现性）是MSA的核心，包括：重复性(Repeatability)=同一操作员用同一量具重复测量的变差；再现性(Reproducibility)=不同操作员之间的变差。判定标准：%R&R<10%优秀，10-30%可接受，>30%不可接受。",
+        "level": "高级"
+    },
+    {
+        "category": "质量工具",
+        "q": "SPC控制图中的8条判异规则是什么？",
+        "a": "①1点超出控制限；②连续9点在中心线同侧；③连续6点递增或递减；④连续14点交替上下；⑤连续3点中有2点在2σ~3σ；⑥连续5点中有4点在1σ~3σ；⑦连续15点在1σ内（过于稳定）；⑧连续8点在1σ~3σ（两侧）。",
+        "level": "高级"
+    },
+    {
+        "category": "质量体系",
+        "q": "内部审核的目的和基本步骤是什么？",
+        "a": "目的：验证质量体系是否有效运行，发现不符合项和改进机会。步骤：①制定审核计划→②编制检查表→③召开首次会议→④现场审核（访谈/观察/查证）→⑤整理审核发现→⑥召开末次会议→⑦发布审核报告→⑧跟踪纠正措施。",
+        "level": "中级"
+    },
+    {
+        "category": "六西格玛",
+        "q": "什么是DOE（实验设计），与传统试验法有什么区别？",
+        "a": "DOE是系统地安排实验、研究多个因素对结果影响的统计方法。与传统OFAT（一次改变一个因素）相比：①效率更高，实验次数少；②能研究因素间的交互作用；③结果更可靠，有统计显著性保证；④可建立因素与响应的数学模型。常用设计：全因子、部分因子、中心复合设计(CCD)、田口方法。",
+        "level": "高级"
+    },
+    {
+        "category": "质量工具",
+        "q": "8D问题解决法的步骤是什么？",
+        "a": "D0:准备（评估是否需要8D）；D1:成立小组；D2:描述问题（5W2H）；D3:实施临时措施（遏制行动）；D4:确定并验证根本原因；D5:选择和验证永久纠正措施；D6:实施和验证永久纠正措施；D7:预防再发（横向展开）；D8:祝贺小组和总结。",
+        "level": "基础"
+    }
+]
+
+QUIZ_QUESTIONS = [
+    {
+        "category": "质量体系",
+        "q": "ISO 9001:2015基于几大质量管理原则？",
+        "options": ["5大原则", "6大原则", "7大原则", "8大原则"],
+        "correct": 2,
+        "explain": "ISO 9001:2015基于7大质量管理原则：顾客焦点、领导作用、全员参与、过程方法、改进、循证决策、关系管理（2015版从8大原则调整为7大）。"
+    },
+    {
+        "category": "六西格玛",
+        "q": "六西格玛水平对应的DPMO（每百万机会缺陷数）约为多少？",
+        "options": ["3.4", "34", "340", "3400"],
+        "correct": 0,
+        "explain": "六西格玛对应3.4 DPMO（含1.5σ的长期漂移）。这意味着每百万次机会中只有3.4次缺陷，即99.99966%的合格率。"
+    },
+    {
+        "category": "质量工具",
+        "q": "FMEA中RPN的计算公式是？",
+        "options": ["S + O + D", "S × O × D", "S × O / D", "(S + O + D) / 3"],
+        "correct": 1,
+        "explain": "RPN（风险优先数）= 严重度(Severity) × 发生度(Occurrence) × 探测度(Detection)，每项1-10分，RPN最大为1000。"
+    },
+    {
+        "category": "六西格玛",
+        "q": "Cpk ≥ 多少通常被认为是过程能力良好的最低要求？",
+        "options": ["1.00", "1.33", "1.50", "1.67"],
+        "correct": 1,
+        "explain": "行业普遍要求Cpk ≥ 1.33（对应4σ水平）。汽车行业关键特性通常要求Cpk ≥ 1.67（5σ水平）。"
+    },
+    {
+        "category": "六西格玛",
+        "q": "在DMAIC方法中，'Analyze（分析）'阶段的主要目标是？",
+        "options": ["收集过程数据", "识别根本原因", "实施解决方案", "定义项目范围"],
+        "correct": 1,
+        "explain": "Analyze阶段的核心是通过数据分析（鱼骨图、假设检验、回归分析等）识别导致问题的根本原因（关键X因子）。"
+    },
+    {
+        "category": "质量工具",
+        "q": "Gage R&R结果中，%R&R小于多少认为测量系统优秀？",
+        "options": ["5%", "10%", "20%", "30%"],
+        "correct": 1,
+        "explain": "%R&R < 10%：优秀可接受；10%-30%：视情况可接受；> 30%：不可接受，需改进测量系统。"
+    },
+    {
+        "category": "质量工具",
+        "q": "柏拉图（Pareto Chart）基于哪个原则？",
+        "options": ["50/50原则", "70/30原则", "80/20原则", "90/10原则"],
+        "correct": 2,
+        "explain": "柏拉图基于80/20原则（帕累托法则）：80%的问题/缺陷来自20%的原因。帮助团队聚焦最重要的少数关键因素。"
+    },
+    {
+        "category": "质量体系",
+        "q": "PPAP（生产件批准程序）中，最完整的提交等级是第几级？",
+        "options": ["1级", "2级", "3级", "5级"],
+        "correct": 2,
+        "explain": "PPAP有5个提交等级，3级是标准提交级别（提交样件和完整文件包），1级只提交合规保证书，5级在客户现场审查。"
+    },
+    {
+        "category": "质量工具",
+        "q": "控制图中，UCL和LCL通常设定在中心线±多少σ？",
+        "options": ["±1σ", "±2σ", "±3σ", "±6σ"],
+        "correct": 2,
+        "explain": "控制限通常设在±3σ（99.73%的正常变异在此范围内），超出控制限的点表示可能存在特殊原因变异，需要调查。"
+    },
+    {
+        "category": "质量工具",
+        "q": "8D问题解决法中，'遏制行动'属于哪个步骤？",
+        "options": ["D1", "D2", "D3", "D4"],
+        "correct": 2,
+        "explain": "D3是实施临时遏制措施（Containment Actions），目的是在找到根本原因之前，立即保护顾客不受问题影响。"
+    }
+]
@@ -0,0 +1,236 @@
+"""DOE 实验设计：二水平全因子/部分因子设计生成、Yates 快速变换与最小二乘效应估计。
+
+设计按标准（Yates）顺序由行号的二进制位直接生成，不构造中间大表；
+因子及交互项用位掩码表示（bit j = 第 j 个因子）。
+"""
+import itertools
+
+import numpy as np
+from scipy import stats
+
+FACTOR_NAMES = "ABCDEFGHJKLMNOP"  # 跳过 I，避免与单位元混淆
+MAX_FACTORS = len(FACTOR_NAMES)
+
+
+def _popcount(a):
+    a = np.asarray(a, dtype=np.int64)
+    count = np.zeros(a.shape, dtype=np.int64)
+    for _ in range(MAX_FACTORS):
+        count += a & 1
+        a = a >> 1
+    return count
+
+
+def term_name(mask):
+    return "".join(FACTOR_NAMES[j] for j in range(MAX_FACTORS) if mask >> j & 1) or "I"
+
+
+def parse_generators(text, k):
+    """'E=ABCD, F=BCD' → 各生成因子的位掩码列表（按因子顺序）。"""
+    gens = {}
+    for part in filter(None, (p.strip() for p in text.replace("；", ",").replace(";", ",").split(","))):
+        left, right = (s.strip().upper() for s in part.split("="))
+        unknown = set(left + right) - set(FACTOR_NAMES)
+        if unknown or len(left) != 1:
+            raise ValueError(f"{part}：格式应为 单个因子=基本因子之积（可用因子 {FACTOR_NAMES}）")
+        mask = 0
+        for c in right:
+            mask ^= 1 << FACTOR_NAMES.index(c)  # 重复字母相互抵消（A·A = I）
+        if _popcount(mask) < 2:
+            raise ValueError(f"{part}：生成元至少由两个基本因子组成，否则与基本因子或 I 混杂")
+        gens[FACTOR_NAMES.index(left)] = mask
+    base = k - len(gens)
+    if sorted(gens) != list(range(base, k)):
+        raise ValueError(f"生成元必须依次定义最后 {len(gens)} 个因子（{FACTOR_NAMES[base:k]}）")
+    if any(m >> base for m in gens.values()):
+        raise ValueError("生成元只能由基本因子组成")
+    return [gens[j] for j in range(base, k)]
+
+
+def defining_relation(k, generators):
+    """定义关系的全部字（位掩码，不含 I）。"""
+    base = k - len(generators)
+    group = np.zeros(1, dtype=np.int64)
+    for j, g in enumerate(generators):
+        group = np.concatenate([group, group ^ (g | 1 << (base + j))])
+    return np.sort(group[1:])
+
+
+def resolution(k, generators):
+    if not generators:
+        return None
+    return int(_popcount(defining_relation(k, generators)).min())
+
+
+def choose_generators(k, p, beam_width=16):
+    """为 2^(k-p) 设计选择生成元：束搜索，最大化分辨度，其次最少的最短字（近似最小低阶混杂）。"""
+    base = k - p
+    if base < 1 or (p and base < 2):
+        raise ValueError("部分因子设计的基本因子数至少为 2")
+    candidates = np.arange(1, 1 << base, dtype=np.int64)
+    candidates = candidates[_popcount(candidates) >= 2]
+    candidates = candidates[np.argsort(-_popcount(candidates), kind="stable")]
+    if len(candidates) < p:
+        raise ValueError(f"{1 << base} 次试验最多安排 {base + len(candidates)} 个因子")
+    # 束中每个状态：(已选候选下标, 定义关系群)；候选下标递增以避免同一集合的重复排列
+    beam = [((), np.zeros(1, dtype=np.int64))]
+    for j in range(p):
+        states, picks, shortest, n_short = [], [], [], []
+        for s, (chosen, group) in enumerate(beam):
+            idx = np.arange(chosen[-1] + 1 if chosen else 0, len(candidates) - (p - j - 1))
+            words = candidates[idx] | (1 << (base + j))
+            coset = _popcount(group[None, :] ^ words[:, None])
+            short = coset.min(axis=1)
+            old = _popcount(group[1:])
+            if old.size:
+                short = np.minimum(short, old.min())
+            count = (coset == short[:, None]).sum(axis=1) + (old[None, :] == short[:, None]).sum(axis=1)
+            states.append(np.full(len(idx), s))
+            picks.append(idx)
+            shortest.append(short)
+            n_short.append(count)
+        states, picks = np.concatenate(states), np.concatenate(picks)
+        best = np.lexsort((np.concatenate(n_short), -np.concatenate(shortest)))[:beam_width]
+        beam = [(beam[states[b]][0] + (int(picks[b]),),
+                 np.concatenate([beam[states[b]][1], beam[states[b]][1] ^ (candidates[picks[b]] | 1 << (base + j))]))
+                for b in best]
+    return [int(candidates[c]) for c in beam[0][0]]
+
+
+def iter_runs(k, generators=()):
+    """逐行惰性生成设计（-1/+1），标准顺序。"""
+    base = k - len(generators)
+    for i in range(1 << base):
+        row = [1 if i >> j & 1 else -1 for j in range(base)]
+        for g in generators:
+            row.append(int(np.prod([row[j] for j in range(base) if g >> j & 1])))
+        yield tuple(row)
+
+
+def design_matrix(k, generators=()):
+    """设计矩阵 (2^(k-p), k)，int8，由行号位运算一次生成。"""
+    base = k - len(generators)
+    runs = np.arange(1 << base, dtype=np.int64)
+    bits = ((runs[:, None] >> np.arange(base)) & 1).astype(np.int8)
+    levels = 2 * bits - 1
+    if generators:
+        # 生成列 = 所含基本因子之积；-1 的个数为奇数时取 -1
+        gen_masks = np.array(generators, dtype=np.int64)
+        odd = _popcount(((runs[:, None] ^ ((1 << base) - 1)) & gen_masks[None, :])) & 1
+        levels = np.hstack([levels, (1 - 2 * odd).astype(np.int8)])
+    return levels
+
+
+def yates(y):
+    """Yates 快速变换：标准顺序响应 → 各项对比（I, A, B, AB, C, ...），O(n log n)。"""
+    y = np.asarray(y, dtype=float)
+    n = y.shape[0]
+    if n & (n - 1):
+        raise ValueError("Yates 变换要求试验次数为 2 的幂")
+    for _ in range(n.bit_length() - 1):
+        pairs = y.reshape(n // 2, 2, *y.shape[1:])
+        y = np.concatenate([pairs[:, 1] + pairs[:, 0], pairs[:, 1] - pairs[:, 0]])
+    return y
+
+
+def yates_effects(y):
+    y = np.asarray(y, dtype=float)
+    contrasts = yates(y)
+    n = y.shape[0]
+    return np.concatenate([contrasts[:1] / n, contrasts[1:] / (n / 2)])
+
+
+def model_terms(k, max_order=2):
+    terms = []
+    for order in range(1, max_order + 1):
+        for combo in itertools.combinations(range(k), order):
+            terms.append(sum(1 << j for j in combo))
+    return terms
+
+
+def estimable_terms(k, generators=(), max_order=2):
+    """每条别名链只保留一个（阶数最低、最先出现的）项，避免设计矩阵列重复。"""
+    words = defining_relation(k, generators) if generators else np.empty(0, dtype=np.int64)
+    kept, seen = [], set()
+    for t in model_terms(k, max_order):
+        if t in seen:
+            continue
+        kept.append(t)
+        seen.update(int(a) for a in words ^ t)
+    n_runs = 1 << (k - len(generators))
+    return kept[:n_runs - 1]
+
+
+def model_matrix(levels, terms):
+    levels = np.asarray(levels, dtype=np.int8)
+    cols = [np.ones(levels.shape[0], dtype=np.int8)]
+    for t in terms:
+        idx = [j for j in range(levels.shape[1]) if t >> j & 1]
+        cols.append(np.prod(levels[:, idx], axis=1, dtype=np.int8))
+    return np.column_stack(cols)
+
+
+def estimate_effects(levels, y, terms):
+    """一次最小二乘求解全部效应；y 可为 (n,) 或 (n, 响应数)，多响应在同一次分解中求解。
+
+    对 ±1 编码，效应 = 2 × 回归系数。别名项（列线性相关）由 lstsq 取最小范数解。
+    """
+    X = model_matrix(levels, terms).astype(float)
+    coef, _, rank, _ = np.linalg.lstsq(X, np.asarray(y, dtype=float), rcond=None)
+    return {"intercept": coef[0], "effects": 2 * coef[1:], "terms": terms, "rank": rank}
+
+
+def estimate_effects_yates(y, terms):
+    """无重复全因子设计的快速路径：Yates 变换 O(n log n)，结果与 estimate_effects 一致。
+
+    对比按位掩码编号（下标 t 即项 t），直接按 terms 取出所需效应。
+    """
+    contrasts = yates_effects(y)
+    return {"intercept": contrasts[0], "effects": contrasts[list(terms)], "terms": terms, "rank": len(terms) + 1}
+
+
+def replicate_levels(levels, n_rep):
+    return np.tile(levels, (n_rep, 1))
+
+
+def lenth_pse(effects):
+    """Lenth 伪标准误差，用于无重复设计的显著性判断。"""
+    abs_e = np.abs(np.asarray(effects, dtype=float))
+    s0 = 1.5 * np.median(abs_e)
+    return 1.5 * np.median(abs_e[abs_e < 2.5 * s0])
+
+
+def lenth_margin(effects, alpha=0.05):
+    m = len(effects)
+    return stats.t.ppf(1 - alpha / 2, m / 3) * lenth_pse(effects)
+
+
+def normal_scores(effects):
+    order = np.argsort(effects)
+    m = len(effects)
+    q = stats.norm.ppf((np.arange(1, m + 1) - 0.5) / m)
+    return order, q
+
+
+def alias_table(k, generators, max_order=2):
+    """主效应与二阶交互项的别名链（仅列出不高于 max_order 阶的别名）。"""
+    words = defining_relation(k, generators)
+    rows = []
+    for t in model_terms(k, max_order):
+        aliases = sorted((int(a) for a in (words ^ t) if _popcount(a) <= max_order),
+                         key=lambda m: (bin(m).count("1"), m))
+        rows.append((term_name(t), " + ".join(term_name(a) for a in aliases)))
+    return rows
+
+
+def simulate_response(levels, seed=0):
+    """演示用响应：前几个因子和 AB 交互有真实效应。"""
+    rng = np.random.default_rng(seed)
+    x = np.asarray(levels, dtype=float)
+    k = x.shape[1]
+    true = np.zeros(k)
+    true[:min(k, 4)] = [6.0, -4.0, 2.5, 1.5][:min(k, 4)]
+    y = 50 + x @ (true / 2)
+    if k >= 2:
+        y += 3.0 / 2 * x[:, 0] * x[:, 1]
+    return y + rng.normal(0, 1.0, len(y))
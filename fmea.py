@@ -0,0 +1,173 @@
+"""FMEA 工作表：列式存储 + 向量化 RPN / AIAG-VDA 行动优先级(AP) + 按产品/过程的高风险索引。"""
+import numpy as np
+import pandas as pd
+
+AP_LABELS = np.array(["L", "M", "H"])
+AP_NAMES = {"H": "高 High", "M": "中 Medium", "L": "低 Low"}
+
+TEXT_COLUMNS = ["product", "process", "failure_mode", "effect", "cause"]
+GROUP_COLUMNS = ["product", "process"]
+RATING_COLUMNS = ["severity", "occurrence", "detection"]
+COLUMN_NAMES = {
+    "product": "产品", "process": "过程", "failure_mode": "失效模式", "effect": "失效影响", "cause": "失效原因",
+    "severity": "S", "occurrence": "O", "detection": "D", "rpn": "RPN", "ap": "AP",
+}
+
+
+def _build_ap_table():
+    # AIAG-VDA FMEA 手册（2019）AP 表；每格 4 个字符对应 D = 7-10 / 5-6 / 2-4 / 1
+    s_bands = [(9, 10), (7, 8), (4, 6), (2, 3), (1, 1)]
+    o_bands = [(8, 10), (6, 7), (4, 5), (2, 3), (1, 1)]
+    d_bands = [(7, 10), (5, 6), (2, 4), (1, 1)]
+    rows = [
+        ["HHHH", "HHHH", "HHHM", "HMLL", "LLLL"],
+        ["HHHH", "HHHM", "HMMM", "MMLL", "LLLL"],
+        ["HHMM", "MMML", "MLLL", "LLLL", "LLLL"],
+        ["MMLL", "LLLL", "LLLL", "LLLL", "LLLL"],
+        ["LLLL", "LLLL", "LLLL", "LLLL", "LLLL"],
+    ]
+    code = {"L": 0, "M": 1, "H": 2}
+    table = np.zeros((11, 11, 11), dtype=np.int8)
+    for (s0, s1), row in zip(s_bands, rows):
+        for (o0, o1), cell in zip(o_bands, row):
+            for (d0, d1), level in zip(d_bands, cell):
+                table[s0:s1 + 1, o0:o1 + 1, d0:d1 + 1] = code[level]
+    return table
+
+
+AP_TABLE = _build_ap_table()
+
+
+def rpn(s, o, d):
+    return s.astype(np.int16) * o * d
+
+
+def action_priority(s, o, d):
+    return AP_TABLE[s, o, d]
+
+
+def _validate_ratings(values):
+    """S/O/D 评分 → int8 数组。先在 float64 上校验，再窄化，超范围的值不会在转换时回绕。"""
+    a = np.asarray(values, dtype=np.float64)
+    if a.size and not (np.isfinite(a).all() and (a == np.round(a)).all()):
+        raise ValueError("S/O/D 评分必须为整数")
+    if a.size and (a.min() < 1 or a.max() > 10):
+        raise ValueError("S/O/D 评分必须在 1~10 之间")
+    return a.astype(np.int8)
+
+
+class FMEAWorksheet:
+    """列式 FMEA 工作表。
+
+    S/O/D 以 int8 数组保存，RPN(int16) 与 AP(int8: 0=L,1=M,2=H) 整列向量化计算；
+    编辑单行时只重算该行，并只作废该行所在分组的 Top 风险缓存。
+    """
+
+    def __init__(self, df):
+        self.text = {c: np.array(df[c].astype(str), dtype=object) for c in TEXT_COLUMNS}
+        ratings = {c: _validate_ratings(df[c]) for c in RATING_COLUMNS}
+        self.s, self.o, self.d = ratings["severity"], ratings["occurrence"], ratings["detection"]
+        self.rpn = rpn(self.s, self.o, self.d)
+        self.ap = action_priority(self.s, self.o, self.d)
+        self._groups = {}
+        self._top = {}
+        for col in GROUP_COLUMNS:
+            codes, labels = pd.factorize(self.text[col], sort=True)
+            self._set_groups(col, codes, labels)
+
+    def __len__(self):
+        return len(self.s)
+
+    def _set_groups(self, col, codes, labels):
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        self._groups[col] = {
+            "codes": codes.astype(np.int32),
+            "labels": list(labels),
+            "rows": {label: order[bounds[i]:bounds[i + 1]] for i, label in enumerate(labels)},
+        }
+
+    def groups(self, by):
+        return self._groups[by]["labels"]
+
+    def _sort_key(self, rows, rank_by):
+        if rank_by == "ap":
+            # AP 优先，其次严重度，再次 RPN
+            return self.ap[rows].astype(np.int32) * 100000 + self.s[rows].astype(np.int32) * 1000 + self.rpn[rows]
+        return self.rpn[rows].astype(np.int32) * 16 + self.s[rows]
+
+    def top_risks(self, by=None, group=None, k=20, rank_by="ap"):
+        """返回风险最高的 k 行的行号（by/group 为空时在全表内排名）。"""
+        cache_key = (by, group, k, rank_by)
+        if cache_key not in self._top:
+            rows = self._groups[by]["rows"].get(group, np.empty(0, dtype=np.intp)) if by else np.arange(len(self))
+            key = self._sort_key(rows, rank_by)
+            if len(rows) > k:
+                part = np.argpartition(-key, k - 1)[:k]
+                rows, key = rows[part], key[part]
+            self._top[cache_key] = rows[np.argsort(-key, kind="stable")]
+        return self._top[cache_key]
+
+    def update_row(self, i, **changes):
+        """编辑单行：只重算该行 RPN/AP，并作废受影响分组的 Top 缓存。"""
+        # 先校验全部改动，任何一项不合法时整行保持不变
+        unknown = [col for col in changes if col not in RATING_COLUMNS and col not in TEXT_COLUMNS]
+        if unknown:
+            raise KeyError(unknown[0])
+        ratings = {col: _validate_ratings([value])[0] for col, value in changes.items() if col in RATING_COLUMNS}
+        touched = {None}
+        for col, value in changes.items():
+            if col in RATING_COLUMNS:
+                {"severity": self.s, "occurrence": self.o, "detection": self.d}[col][i] = ratings[col]
+            else:
+                old = self.text[col][i]
+                self.text[col][i] = str(value)
+                if col in GROUP_COLUMNS and old != str(value):
+                    self._move_group(col, i, old, str(value))
+                    touched.update({(col, old), (col, str(value))})
+        self.rpn[i] = int(self.s[i]) * int(self.o[i]) * int(self.d[i])
+        self.ap[i] = AP_TABLE[self.s[i], self.o[i], self.d[i]]
+        for col in GROUP_COLUMNS:
+            touched.add((col, self.text[col][i]))
+        self._top = {key: rows for key, rows in self._top.items()
+                     if (key[0], key[1]) not in touched and key[0] is not None}
+
+    def _move_group(self, col, i, old, new):
+        g = self._groups[col]
+        g["rows"][old] = g["rows"][old][g["rows"][old] != i]
+        if new not in g["rows"]:
+            g["labels"].append(new)
+            g["rows"][new] = np.empty(0, dtype=np.intp)
+        g["rows"][new] = np.sort(np.append(g["rows"][new], i))
+        g["codes"][i] = g["labels"].index(new)
+
+    def ap_counts(self, by):
+        """各分组 L/M/H 数量矩阵 (分组数, 3)，一次 bincount 完成。"""
+        g = self._groups[by]
+        n = len(g["labels"])
+        return np.bincount(g["codes"] * 3 + self.ap, minlength=n * 3).reshape(n, 3)
+
+    def to_frame(self, rows=None):
+        rows = np.arange(len(self)) if rows is None else rows
+        df = pd.DataFrame({c: self.text[c][rows] for c in TEXT_COLUMNS})
+        df["severity"], df["occurrence"], df["detection"] = self.s[rows], self.o[rows], self.d[rows]
+        df["rpn"] = self.rpn[rows]
+        df["ap"] = AP_LABELS[self.ap[rows]]
+        df.index = rows
+        return df
+
+
+def demo_frame(n_rows=20000, seed=42):
+    rng = np.random.default_rng(seed)
+    products = ["制动卡钳", "转向节", "副车架", "控制臂", "轮毂轴承", "驱动轴"]
+    processes = ["铸造", "机加工", "热处理", "焊接", "装配", "涂装", "终检"]
+    modes = ["尺寸超差", "气孔", "裂纹", "硬度不足", "漏装", "扭矩不足", "涂层脱落", "毛刺"]
+    effects = ["装配困难", "异响", "早期失效", "功能丧失", "外观投诉", "安全风险"]
+    causes = ["刀具磨损", "参数漂移", "来料不良", "夹具松动", "作业失误", "设备故障"]
+    pick = lambda items: np.array(items, dtype=object)[rng.integers(0, len(items), n_rows)]
+    ratings = lambda hi: np.clip(np.round(rng.triangular(1, 4, hi, n_rows)), 1, 10).astype(np.int8)
+    return pd.DataFrame({
+        "product": pick(products), "process": pick(processes), "failure_mode": pick(modes),
+        "effect": pick(effects), "cause": pick(causes),
+        "severity": ratings(10), "occurrence": ratings(9), "detection": ratings(10),
+    })
@@ -0,0 +1,334 @@
+"""实时数据接入：asyncio 采集线程 + 控制图增量状态。
+
+数据源（每行一个零件：value 测量值, defective 是否不良 0/1）：
+    SQLiteSource  追加写入的数据表（按 rowid 增量读取；SQL 与 Postgres 兼容）
+    CSVTailSource 追加写入的 CSV 文件（按字节偏移增量读取）
+    SocketSource  换行分隔的 "value,defective" 文本流
+    SimulatedSource 本地模拟数据
+
+本地联调可运行：python live_feed.py sqlite plant.db / csv feed.csv / socket 9999
+"""
+import argparse
+import asyncio
+import collections
+import csv
+import os
+import pathlib
+import socket
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+# X-bar 图系数 A2（子组容量 2~10）
+A2 = {2: 1.880, 3: 1.023, 4: 0.729, 5: 0.577, 6: 0.483, 7: 0.419, 8: 0.373, 9: 0.337, 10: 0.308}
+D3 = {2: 0, 3: 0, 4: 0, 5: 0, 6: 0, 7: 0.076, 8: 0.136, 9: 0.184, 10: 0.223}
+D4 = {2: 3.267, 3: 2.574, 4: 2.282, 5: 2.114, 6: 2.004, 7: 1.924, 8: 1.864, 9: 1.816, 10: 1.777}
+
+
+def _parse_row(fields):
+    value = float(fields[0])
+    defective = int(float(fields[1])) if len(fields) > 1 and fields[1] != "" else 0
+    return value, defective
+
+
+def parse_address(target, default_host="127.0.0.1"):
+    """'主机:端口' 或 '端口' → (主机, 端口)；格式不对时抛出 ValueError。"""
+    host, _, port = target.strip().rpartition(":")
+    if not port.isascii() or not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"无效的地址 {target!r}：格式应为 主机:端口，如 127.0.0.1:9999")
+    return host or default_host, int(port)
+
+
+class SimulatedSource:
+    def __init__(self, mean=10.0, sd=0.5, p=0.04, rate=20, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.mean, self.sd, self.p, self.rate = mean, sd, p, rate
+        self.last = time.monotonic()
+
+    async def fetch(self, limit):
+        await asyncio.sleep(0.05)
+        now = time.monotonic()
+        n = min(limit, int((now - self.last) * self.rate))
+        if n == 0:
+            return []
+        self.last = now
+        # 偶尔出现均值漂移（特殊原因）
+        shift = self.sd * 2 if self.rng.random() < 0.05 else 0.0
+        values = self.rng.normal(self.mean + shift, self.sd, n)
+        defects = (self.rng.random(n) < self.p).astype(int)
+        return list(zip(values.tolist(), defects.tolist()))
+
+
+class SQLiteSource:
+    """按 rowid 增量读取；以只读模式打开，阻塞的 DB 调用放到线程池执行。"""
+
+    def __init__(self, path, table="measurements", value_col="value", defect_col="defective"):
+        self.path, self.table = path, table
+        self.query = (f"SELECT rowid, {value_col}, {defect_col} FROM {table} "
+                      f"WHERE rowid > ? ORDER BY rowid LIMIT ?")
+        self.cursor = 0
+        self.conn = None
+
+    def _fetch(self, limit):
+        if self.conn is None:
+            # mode=ro：文件不存在时报错而不是新建，也不会写入被监控的数据库
+            uri = pathlib.Path(self.path).resolve().as_uri() + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        rows = self.conn.execute(self.query, (self.cursor, limit)).fetchall()
+        if rows:
+            self.cursor = rows[-1][0]
+        return [_parse_row((r[1], r[2] if r[2] is not None else "")) for r in rows]
+
+    async def fetch(self, limit):
+        rows = await asyncio.to_thread(self._fetch, limit)
+        if not rows:
+            await asyncio.sleep(0.2)
+        return rows
+
+    async def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+class CSVTailSource:
+    """只读取上次偏移之后新追加的完整行；每次最多读取 max_bytes 字节。"""
+
+    def __init__(self, path, max_bytes=1 << 20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.offset = 0
+        self.inode = None
+
+    def _fetch(self, limit):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as f:
+            info = os.fstat(f.fileno())
+            # 文件被截断或轮转（换成了新文件）时从头读取
+            if info.st_ino != self.inode or info.st_size < self.offset:
+                self.inode, self.offset = info.st_ino, 0
+            f.seek(self.offset)
+            chunk = f.read(self.max_bytes)
+        lines = chunk.split(b"\n")[:-1][:limit]  # 最后一段可能是未写完的行
+        if not lines and len(chunk) == self.max_bytes:
+            # 单行超过 max_bytes：跳过这一段，避免永远卡在同一偏移
+            self.offset += len(chunk)
+            return []
+        self.offset += sum(len(line) + 1 for line in lines)
+        rows = []
+        for fields in csv.reader(line.decode("utf-8") for line in lines):
+            try:
+                rows.append(_parse_row(fields))
+            except (ValueError, IndexError):
+                continue  # 表头或空行
+        return rows
+
+    async def fetch(self, limit):
+        rows = await asyncio.to_thread(self._fetch, limit)
+        if not rows:
+            await asyncio.sleep(0.2)
+        return rows
+
+
+class SocketSource:
+    def __init__(self, host, port, timeout=1.0):
+        self.host, self.port = host, port
+        self.timeout = timeout
+        self.reader = self.writer = None
+        self.partial = b""
+
+    async def fetch(self, limit):
+        if self.reader is None:
+            # 必须持有 writer，否则其被回收时会关闭连接
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        # 一次读取缓冲区中已到达的全部数据，凑成批次；不完整的行留到下次。
+        # 超时返回空批次，让采集循环有机会检查停止信号并按时刷新已有数据
+        try:
+            data = await asyncio.wait_for(self.reader.read(65536), self.timeout)
+        except asyncio.TimeoutError:
+            return []
+        if not data:
+            raise ConnectionError("数据流已关闭")
+        *lines, self.partial = (self.partial + data).split(b"\n")
+        rows = []
+        for line in lines:
+            try:
+                rows.append(_parse_row(line.decode().strip().split(",")))
+            except (ValueError, IndexError):
+                continue  # 空行或格式错误的行，与 CSVTailSource 一致地跳过
+        return rows
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+
+
+class ChartState:
+    """X-bar/R 与 p 图的增量状态：只保留最近 window 个子组用于绘图。
+
+    控制限由基准期（前 baseline 个子组）的累计和计算：基准期内为试行控制限，随数据更新；
+    满 baseline 个子组后冻结，之后的持续漂移会表现为失控点，而不会被滚动的控制限吸收。
+    """
+
+    def __init__(self, subgroup_size=5, window=50, baseline=25):
+        self.n = subgroup_size
+        self.baseline = baseline
+        self.pending = []
+        self.xbar = collections.deque(maxlen=window)
+        self.r = collections.deque(maxlen=window)
+        self.p = collections.deque(maxlen=window)
+        self.index = collections.deque(maxlen=window)
+        self.count = 0
+        self.sum_xbar = self.sum_r = 0.0
+        self.base_defects = self.base_inspected = 0
+        self.defects = self.inspected = 0
+        self.rows = 0
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def push(self, rows):
+        with self.lock:
+            self.rows += len(rows)
+            self.pending.extend(rows)
+            full = len(self.pending) // self.n * self.n
+            if not full:
+                return
+            batch = np.asarray(self.pending[:full], dtype=float).reshape(-1, self.n, 2)
+            del self.pending[:full]
+            values, defects = batch[..., 0], batch[..., 1]
+            means, ranges = values.mean(axis=1), np.ptp(values, axis=1)
+            props = defects.mean(axis=1)
+            # 仍在基准期内的子组计入控制限
+            base = max(0, min(len(means), self.baseline - self.count))
+            self.sum_xbar += means[:base].sum()
+            self.sum_r += ranges[:base].sum()
+            self.base_defects += int(defects[:base].sum())
+            self.base_inspected += defects[:base].size
+            for m, r, p in zip(means, ranges, props):
+                self.count += 1
+                self.index.append(self.count)
+                self.xbar.append(m)
+                self.r.append(r)
+                self.p.append(p)
+            self.defects += int(defects.sum())
+            self.inspected += defects.size
+            self.version += 1
+
+    def snapshot(self):
+        with self.lock:
+            if not self.count:
+                return None
+            base = min(self.count, self.baseline)
+            xbarbar, r_bar = self.sum_xbar / base, self.sum_r / base
+            p_bar = self.base_defects / self.base_inspected
+            a2 = A2.get(self.n, 3 / np.sqrt(self.n))
+            p_sigma = np.sqrt(p_bar * (1 - p_bar) / self.n)
+            return {
+                "index": list(self.index), "xbar": list(self.xbar), "r": list(self.r), "p": list(self.p),
+                "xbar_limits": (xbarbar - a2 * r_bar, xbarbar, xbarbar + a2 * r_bar),
+                "r_limits": (D3.get(self.n, 0) * r_bar, r_bar, D4.get(self.n, 2) * r_bar),
+                "p_limits": (max(0.0, p_bar - 3 * p_sigma), p_bar, p_bar + 3 * p_sigma),
+                "baseline": base, "frozen": self.count >= self.baseline,
+                "p_overall": self.defects / self.inspected,
+                "subgroups": self.count, "rows": self.rows, "version": self.version,
+            }
+
+
+class IngestionWorker:
+    """在后台线程的 asyncio 事件循环中采集数据，按批次（行数或时间）推入 ChartState。"""
+
+    def __init__(self, source, state, batch_size=200, flush_interval=0.5):
+        self.source, self.state = source, state
+        self.batch_size, self.flush_interval = batch_size, flush_interval
+        self.error = None
+        self.users = 0
+        self._users_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def acquire(self):
+        with self._users_lock:
+            self.users += 1
+
+    def release(self):
+        """释放一个使用者；最后一个使用者释放时停止采集并返回 True（已被停止的不重复处理）。"""
+        with self._users_lock:
+            self.users -= 1
+            if self.users > 0 or self._stop.is_set():
+                return False
+        self.stop()
+        return True
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    async def _run(self):
+        batch, deadline = [], time.monotonic() + self.flush_interval
+        try:
+            while not self._stop.is_set():
+                batch.extend(await self.source.fetch(self.batch_size - len(batch)))
+                if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                    if batch:
+                        self.state.push(batch)
+                    batch, deadline = [], time.monotonic() + self.flush_interval
+        except Exception as e:  # 数据源异常在界面上显示
+            self.error = e
+        finally:
+            # 释放连接 / 文件句柄；没有需要释放资源的数据源不实现 close
+            close = getattr(self.source, "close", None)
+            if close is not None:
+                await close()
+
+
+# ─── 本地联调用的数据生成器 ───
+def _generate(rate):
+    rng = np.random.default_rng()
+    while True:
+        time.sleep(1 / rate)
+        yield float(rng.normal(10.0, 0.5)), int(rng.random() < 0.04)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向本地数据源持续写入模拟测量数据")
+    parser.add_argument("kind", choices=["sqlite", "csv", "socket"])
+    parser.add_argument("target", help="SQLite 文件 / CSV 文件 / socket 端口")
+    parser.add_argument("--rate", type=float, default=20, help="每秒行数")
+    args = parser.parse_args()
+
+    if args.kind == "sqlite":
+        conn = sqlite3.connect(args.target)
+        conn.execute("CREATE TABLE IF NOT EXISTS measurements (value REAL, defective INTEGER)")
+        for row in _generate(args.rate):
+            conn.execute("INSERT INTO measurements VALUES (?, ?)", row)
+            conn.commit()
+    elif args.kind == "csv":
+        new = not os.path.exists(args.target)
+        with open(args.target, "a", newline="") as f:
+            if new:
+                f.write("value,defective\n")
+            for value, defective in _generate(args.rate):
+                f.write(f"{value:.5f},{defective}\n")
+                f.flush()
+    else:
+        server = socket.create_server(("127.0.0.1", int(args.target)))
+        conn, _ = server.accept()
+        for value, defective in _generate(args.rate):
+            conn.sendall(f"{value:.5f},{defective}\n".encode())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""MSA 测量系统分析：Gage R&R（ANOVA法 / 均值极差法）、偏倚、线性、稳定性。
+
+所有计算都基于形状为 (..., 零件, 操作员, 试验) 的数组，在最后三个轴上做 NumPy 归约，
+前导轴可用于一次性计算多个研究。
+"""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# d2（大样本组数）与 d2*（g=1），用于 AIAG 均值极差法的 K1/K2/K3 系数
+D2 = {2: 1.128, 3: 1.693, 4: 2.059, 5: 2.326, 6: 2.534, 7: 2.704, 8: 2.847, 9: 2.970, 10: 3.078,
+      11: 3.173, 12: 3.258, 13: 3.336, 14: 3.407, 15: 3.472, 16: 3.532, 17: 3.588, 18: 3.640,
+      19: 3.689, 20: 3.735, 21: 3.778, 22: 3.819, 23: 3.858, 24: 3.895, 25: 3.931}
+D2_STAR = {2: 1.41421, 3: 1.91155, 4: 2.23887, 5: 2.48124, 6: 2.67253, 7: 2.82981, 8: 2.96288,
+           9: 3.07794, 10: 3.17905, 11: 3.26909, 12: 3.35016, 13: 3.42378, 14: 3.49116,
+           15: 3.55333, 16: 3.61071, 17: 3.66422, 18: 3.71424, 19: 3.76118, 20: 3.80537}
+
+# X-bar/R 控制图系数（子组容量 2~10）
+XBAR_R_CONSTANTS = {
+    2: (1.880, 0.000, 3.267), 3: (1.023, 0.000, 2.574), 4: (0.729, 0.000, 2.282),
+    5: (0.577, 0.000, 2.114), 6: (0.483, 0.000, 2.004), 7: (0.419, 0.076, 1.924),
+    8: (0.373, 0.136, 1.864), 9: (0.337, 0.184, 1.816), 10: (0.308, 0.223, 1.777),
+}
+
+COMPONENTS = ["重复性 EV", "再现性 AV", "  操作员", "  操作员×零件", "Gage R&R", "零件间 PV", "总变差 TV"]
+
+
+def to_array(df, part="part", operator="operator", trial="trial", value="value"):
+    """长表 (part, operator, trial, value) → (零件, 操作员, 试验) 数组；要求平衡设计。"""
+    p_codes, parts = pd.factorize(df[part], sort=True)
+    o_codes, operators = pd.factorize(df[operator], sort=True)
+    t_codes, trials = pd.factorize(df[trial], sort=True)
+    y = np.full((len(parts), len(operators), len(trials)), np.nan)
+    y[p_codes, o_codes, t_codes] = df[value].to_numpy(dtype=float)
+    if np.isnan(y).any():
+        raise ValueError("数据不平衡：每个 零件×操作员 组合必须有相同的试验次数")
+    if len(trials) < 2:
+        raise ValueError("每个 零件×操作员 组合至少需要 2 次试验，才能估计重复性")
+    return y, list(parts), list(operators)
+
+
+def demo_study(n_parts=10, n_operators=3, n_trials=3, seed=42):
+    rng = np.random.default_rng(seed)
+    part_effect = rng.normal(0, 1.0, (n_parts, 1, 1))
+    operator_effect = rng.normal(0, 0.15, (1, n_operators, 1))
+    interaction = rng.normal(0, 0.05, (n_parts, n_operators, 1))
+    noise = rng.normal(0, 0.12, (n_parts, n_operators, n_trials))
+    return 10 + part_effect + operator_effect + interaction + noise
+
+
+def _summarize(var, tolerance):
+    var = {k: np.asarray(v, dtype=float) for k, v in var.items()}
+    total = var["总变差 TV"]
+    sd = {k: np.sqrt(v) for k, v in var.items()}
+    result = {
+        "var": var,
+        "study_var": {k: 6 * s for k, s in sd.items()},
+        "pct_contribution": {k: 100 * v / total for k, v in var.items()},
+        "pct_study_var": {k: 100 * s / np.sqrt(total) for k, s in sd.items()},
+        "ndc": np.floor(1.41 * sd["零件间 PV"] / sd["Gage R&R"]),
+    }
+    if tolerance:
+        result["pct_tolerance"] = {k: 100 * 6 * s / tolerance for k, s in sd.items()}
+    return result
+
+
+def gage_rr_anova(y, tolerance=None, alpha_interaction=0.05):
+    """交叉型 Gage R&R（双因子方差分析，含交互项；交互项不显著时合并进误差项）。"""
+    y = np.asarray(y, dtype=float)
+    p, o, r = y.shape[-3:]
+    if r < 2:
+        raise ValueError("每个 零件×操作员 组合至少需要 2 次试验，才能估计重复性")
+    grand = y.mean(axis=(-3, -2, -1))
+    part_means = y.mean(axis=(-2, -1))
+    op_means = y.mean(axis=(-3, -1))
+    cell_means = y.mean(axis=-1)
+
+    g = grand[..., None]
+    ss_p = o * r * ((part_means - g) ** 2).sum(axis=-1)
+    ss_o = p * r * ((op_means - g) ** 2).sum(axis=-1)
+    resid = cell_means - part_means[..., :, None] - op_means[..., None, :] + grand[..., None, None]
+    ss_po = r * (resid ** 2).sum(axis=(-2, -1))
+    ss_e = ((y - cell_means[..., None]) ** 2).sum(axis=(-3, -2, -1))
+
+    df_p, df_o, df_po, df_e = p - 1, o - 1, (p - 1) * (o - 1), p * o * (r - 1)
+    ms_p, ms_o, ms_po, ms_e = ss_p / df_p, ss_o / df_o, ss_po / df_po, ss_e / df_e
+    f_po = ms_po / ms_e
+    p_po = stats.f.sf(f_po, df_po, df_e)
+
+    # 交互项不显著 → 简化模型（合并误差）
+    pooled = p_po > alpha_interaction
+    ms_pool = (ss_po + ss_e) / (df_po + df_e)
+    ms_err = np.where(pooled, ms_pool, ms_po)
+    df_err = np.where(pooled, df_po + df_e, df_po)
+    f_p, f_o = ms_p / ms_err, ms_o / ms_err
+
+    repeat = np.where(pooled, ms_pool, ms_e)
+    var_po = np.where(pooled, 0.0, np.maximum((ms_po - ms_e) / r, 0))
+    var_o = np.maximum((ms_o - ms_err) / (p * r), 0)
+    var_p = np.maximum((ms_p - ms_err) / (o * r), 0)
+    grr = repeat + var_o + var_po
+
+    result = _summarize({
+        "重复性 EV": repeat, "再现性 AV": var_o + var_po, "  操作员": var_o,
+        "  操作员×零件": var_po, "Gage R&R": grr, "零件间 PV": var_p, "总变差 TV": grr + var_p,
+    }, tolerance)
+    result["anova"] = {
+        "来源": ["零件", "操作员", "零件×操作员", "重复性", "合计"],
+        "DF": [df_p, df_o, df_po, df_e, p * o * r - 1],
+        "SS": [ss_p, ss_o, ss_po, ss_e, ss_p + ss_o + ss_po + ss_e],
+        "MS": [ms_p, ms_o, ms_po, ms_e, np.nan],
+        "F": [f_p, f_o, f_po, np.nan, np.nan],
+        "P": [stats.f.sf(f_p, df_p, df_err), stats.f.sf(f_o, df_o, df_err), p_po, np.nan, np.nan],
+    }
+    result["interaction_pooled"] = pooled
+    return result
+
+
+def gage_rr_xbar_r(y, tolerance=None):
+    """AIAG 均值极差法。零件/操作员数量超出常数表时，用均值的样本标准差代替极差估计。"""
+    y = np.asarray(y, dtype=float)
+    p, o, r = y.shape[-3:]
+    if r not in D2:
+        raise ValueError(f"试验次数 {r} 超出 d2 常数表范围（2~25）")
+    r_bar = np.ptp(y, axis=-1).mean(axis=(-2, -1))
+    ev = r_bar / D2[r]
+
+    op_means = y.mean(axis=(-3, -1))
+    if o in D2_STAR:
+        x_diff = np.ptp(op_means, axis=-1)
+        av_raw = x_diff / D2_STAR[o]
+    else:
+        av_raw = op_means.std(axis=-1, ddof=1)
+    av = np.sqrt(np.maximum(av_raw ** 2 - ev ** 2 / (p * r), 0))
+
+    part_means = y.mean(axis=(-2, -1))
+    if p in D2_STAR:
+        pv = np.ptp(part_means, axis=-1) / D2_STAR[p]
+    else:
+        pv = part_means.std(axis=-1, ddof=1)
+
+    grr_var = ev ** 2 + av ** 2
+    return _summarize({
+        "重复性 EV": ev ** 2, "再现性 AV": av ** 2, "  操作员": av ** 2, "  操作员×零件": np.zeros_like(ev),
+        "Gage R&R": grr_var, "零件间 PV": pv ** 2, "总变差 TV": grr_var + pv ** 2,
+    }, tolerance)
+
+
+def components_table(result):
+    cols = {
+        "方差分量": result["var"],
+        "贡献率%": result["pct_contribution"],
+        "研究变差(6σ)": result["study_var"],
+        "%研究变差": result["pct_study_var"],
+    }
+    if "pct_tolerance" in result:
+        cols["%公差"] = result["pct_tolerance"]
+    return pd.DataFrame({name: [float(v[k]) for k in COMPONENTS] for name, v in cols.items()},
+                        index=COMPONENTS)
+
+
+def grr_verdict(pct):
+    if pct < 10:
+        return "优秀", "#48bb78"
+    if pct <= 30:
+        return "可接受", "#ed8936"
+    return "不可接受", "#fc8181"
+
+
+def bias_study(measurements, reference, alpha=0.05):
+    """偏倚研究：同一标准件重复测量 n 次，单样本 t 检验。"""
+    x = np.asarray(measurements, dtype=float)
+    n = x.shape[-1]
+    bias = x.mean(axis=-1) - reference
+    se = x.std(axis=-1, ddof=1) / np.sqrt(n)
+    t = bias / se
+    half = stats.t.ppf(1 - alpha / 2, n - 1) * se
+    return {"bias": bias, "t": t, "p": 2 * stats.t.sf(np.abs(t), n - 1),
+            "ci": (bias - half, bias + half), "repeatability_sd": x.std(axis=-1, ddof=1)}
+
+
+def linearity_study(references, measurements, process_variation=None):
+    """线性研究：references 形状 (g,)，measurements 形状 (g, m)；对偏倚做最小二乘回归。"""
+    ref = np.asarray(references, dtype=float)
+    y = np.asarray(measurements, dtype=float)
+    g, m = y.shape
+    xs = np.repeat(ref, m)
+    bias = (y - ref[:, None]).ravel()
+    X = np.column_stack([np.ones_like(xs), xs])
+    coef, _, _, _ = np.linalg.lstsq(X, bias, rcond=None)
+    fitted = X @ coef
+    dof = xs.size - 2
+    s = np.sqrt(((bias - fitted) ** 2).sum() / dof)
+    sxx = ((xs - xs.mean()) ** 2).sum()
+    t_slope = coef[1] / (s / np.sqrt(sxx))
+    t_int = coef[0] / (s * np.sqrt(1 / xs.size + xs.mean() ** 2 / sxx))
+    r2 = 1 - ((bias - fitted) ** 2).sum() / ((bias - bias.mean()) ** 2).sum()
+    result = {
+        "intercept": coef[0], "slope": coef[1], "r2": r2,
+        "p_slope": 2 * stats.t.sf(abs(t_slope), dof), "p_intercept": 2 * stats.t.sf(abs(t_int), dof),
+        "mean_bias": (y - ref[:, None]).mean(axis=1),
+    }
+    if process_variation:
+        result["linearity"] = abs(coef[1]) * process_variation
+        result["pct_linearity"] = 100 * abs(coef[1])
+    return result
+
+
+def stability_study(subgroups):
+    """稳定性研究：按时间排列的子组 (k, n) → X-bar/R 控制限及失控点。"""
+    x = np.asarray(subgroups, dtype=float)
+    n = x.shape[-1]
+    if n not in XBAR_R_CONSTANTS:
+        raise ValueError(f"子组容量 {n} 超出常数表范围（2~10）")
+    a2, d3, d4 = XBAR_R_CONSTANTS[n]
+    xbar = x.mean(axis=-1)
+    ranges = np.ptp(x, axis=-1)
+    xbarbar, r_bar = xbar.mean(), ranges.mean()
+    limits = {
+        "xbar": (xbarbar - a2 * r_bar, xbarbar, xbarbar + a2 * r_bar),
+        "r": (d3 * r_bar, r_bar, d4 * r_bar),
+    }
+    return {
+        "xbar": xbar, "r": ranges, "limits": limits,
+        "xbar_ooc": (xbar < limits["xbar"][0]) | (xbar > limits["xbar"][2]),
+        "r_ooc": (ranges < limits["r"][0]) | (ranges > limits["r"][2]),
+    }
@@ -0,0 +1,405 @@
+"""运行时性能埋点：页面/区块耗时、图表构建与序列化、缓存命中率；静态图表规格的服务端缓存。
+
+指标保存在进程级注册表中（所有会话共享），可在隐藏的管理面板查看，
+也可导出为 Prometheus 文本格式；设置环境变量 QLA_METRICS_PORT 时
+另起一个 HTTP 线程在 /metrics 上提供抓取。
+"""
+import collections
+import contextlib
+import cProfile
+import functools
+import gzip
+import hashlib
+import http.server
+import io
+import json
+import marshal
+import os
+import pstats
+import threading
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 直方图桶上限：耗时（秒）与负载（字节）
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTE_BUCKETS = (1e3, 1e4, 3e4, 1e5, 3e5, 1e6, 3e6, 1e7)
+RECENT = 512  # 每个序列保留最近的样本数，用于面板中的分位数
+FIGURE_CACHE_BYTES = int(os.environ.get("QLA_FIGURE_CACHE_BYTES", 32 * 2 ** 20))  # 压缩后总字节上限
+FIGURE_CACHE_KEYS = 4096
+PAYLOAD_SAMPLE_EVERY = int(os.environ.get("QLA_PAYLOAD_SAMPLE_EVERY", 20))  # 每个图表每 N 次渲染测一次负载
+
+HELP = {
+    "qla_rerun_seconds": "整页重跑耗时",
+    "qla_section_seconds": "页面与片段渲染耗时",
+    "qla_figure_build_seconds": "图表构建耗时（创建 Figure 到提交渲染）",
+    "qla_chart_render_seconds": "st.plotly_chart 调用耗时",
+    "qla_chart_payload_bytes": "图表 JSON 负载字节数（抽样）",
+    "qla_cache_requests_total": "缓存函数调用次数",
+    "qla_cache_misses_total": "缓存未命中（函数体被执行）次数",
+}
+
+
+class Series:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(bounds)
+        self.recent = collections.deque(maxlen=RECENT)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, upper in enumerate(self.bounds):
+            if value <= upper:
+                self.buckets[i] += 1
+        self.recent.append(value)
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}    # (指标, 名称) → Series
+        self.counters = collections.Counter()  # (指标, 名称) → 计数
+
+    def observe(self, metric, name, value):
+        with self.lock:
+            key = (metric, name)
+            if key not in self.series:
+                self.series[key] = Series(BYTE_BUCKETS if metric.endswith("_bytes") else BUCKETS)
+            self.series[key].observe(value)
+
+    def inc(self, metric, name, value=1):
+        with self.lock:
+            self.counters[(metric, name)] += value
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+            self.counters.clear()
+
+    def rows(self):
+        """面板用的汇总表：每个序列一行。"""
+        with self.lock:
+            items = [(k, s.count, s.sum, s.max, np.array(s.recent)) for k, s in self.series.items()]
+        rows = []
+        for (metric, name), count, total, peak, recent in sorted(items, key=lambda t: t[0]):
+            p50, p95 = (float(v) for v in np.percentile(recent, [50, 95])) if recent.size else (0.0, 0.0)
+            rows.append({"指标": metric, "名称": name, "次数": count, "合计": total,
+                         "均值": total / count, "P50": p50, "P95": p95, "最大": peak})
+        return rows
+
+    def cache_rows(self):
+        with self.lock:
+            counters = dict(self.counters)
+        names = sorted({n for m, n in counters if m == "qla_cache_requests_total"})
+        rows = []
+        for name in names:
+            calls = counters.get(("qla_cache_requests_total", name), 0)
+            misses = counters.get(("qla_cache_misses_total", name), 0)
+            rows.append({"缓存函数": name, "调用": calls, "命中": calls - misses, "未命中": misses,
+                         "命中率": (calls - misses) / calls if calls else 0.0})
+        return rows
+
+    def prometheus(self):
+        """Prometheus 文本格式（histogram + counter）。"""
+        with self.lock:
+            series = {k: (s.count, s.sum, list(zip(s.bounds, s.buckets))) for k, s in self.series.items()}
+            counters = dict(self.counters)
+        lines = []
+        for metric in sorted({m for m, _ in series}):
+            lines += [f"# HELP {metric} {HELP.get(metric, metric)}", f"# TYPE {metric} histogram"]
+            for (m, name), (count, total, buckets) in sorted(series.items()):
+                if m != metric:
+                    continue
+                label = _escape(name)
+                for upper, n in buckets:
+                    lines.append(f'{metric}_bucket{{name="{label}",le="{upper:g}"}} {n}')
+                lines.append(f'{metric}_bucket{{name="{label}",le="+Inf"}} {count}')
+                lines.append(f'{metric}_sum{{name="{label}"}} {total:.6f}')
+                lines.append(f'{metric}_count{{name="{label}"}} {count}')
+        for metric in sorted({m for m, _ in counters}):
+            lines += [f"# HELP {metric} {HELP.get(metric, metric)}", f"# TYPE {metric} counter"]
+            for (m, name), value in sorted(counters.items()):
+                if m == metric:
+                    lines.append(f'{metric}{{name="{_escape(name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(name):
+    return str(name).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Registry()
+
+
+@contextlib.contextmanager
+def timed(metric, name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(metric, name, time.perf_counter() - t0)
+
+
+def section(fn):
+    """页面/片段函数的耗时埋点；放在 @st.fragment 之下，片段单独重跑时同样计时。"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with timed("qla_section_seconds", fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def cache(cache_fn, **options):
+    """st.cache_data / st.cache_resource 的埋点版本：函数体被执行即记为一次未命中。"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def fill(*args, **kwargs):
+            REGISTRY.inc("qla_cache_misses_total", fn.__name__)
+            return fn(*args, **kwargs)
+
+        cached = cache_fn(**options)(fill)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            REGISTRY.inc("qla_cache_requests_total", fn.__name__)
+            return cached(*args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+
+def figure(*args, **kwargs):
+    """go.Figure 的替代：记录创建时刻，由 plotly_chart 计算构建耗时。"""
+    fig = go.Figure(*args, **kwargs)
+    fig._perf_t0 = time.perf_counter()
+    return fig
+
+
+_payload_calls = collections.Counter()
+_payload_lock = threading.Lock()
+
+
+def _sample_payload(name):
+    # 负载大小需要额外序列化一次：每个图表只在第 1 次及此后每 PAYLOAD_SAMPLE_EVERY 次渲染时测量
+    with _payload_lock:
+        n = _payload_calls[name]
+        _payload_calls[name] = n + 1
+    return n % max(PAYLOAD_SAMPLE_EVERY, 1) == 0
+
+
+def plotly_chart(fig, name, **kwargs):
+    t0 = time.perf_counter()
+    created = getattr(fig, "_perf_t0", None)
+    if created is not None:
+        REGISTRY.observe("qla_figure_build_seconds", name, t0 - created)
+    result = st.plotly_chart(fig, **kwargs)
+    REGISTRY.observe("qla_chart_render_seconds", name, time.perf_counter() - t0)
+    # 负载大小单独序列化一次测量（抽样），不计入渲染耗时
+    if _sample_payload(name):
+        REGISTRY.observe("qla_chart_payload_bytes", name, len(pio.to_json(fig, validate=False).encode()))
+    return result
+
+
+# ─── 图表规格缓存 ───
+class _Spec(go.Figure):
+    """缓存的 JSON 规格包装成 Figure。
+
+    本身是正常初始化的空 Figure（约 1 ms），访问其他属性不会出错（得到空 Figure 的值）；
+    to_dict() / to_plotly_json() 返回缓存的规格。
+    st.plotly_chart 对 Figure 只调用 to_dict()，不会像 dict 输入那样按规格重建 go.Figure 并逐属性校验。
+    """
+
+    def __init__(self, spec):
+        super().__init__()
+        self._spec = spec
+
+    def to_dict(self):
+        return json.loads(self._spec)
+
+    def to_plotly_json(self):
+        return self.to_dict()
+
+
+class FigureCache:
+    """服务端图表规格缓存：序列化并压缩（brotli，缺失时 gzip）后按内容哈希（ETag）保存，LRU 淘汰。
+
+    两级映射：输入键（图表名 + 构建函数字节码 + 决定内容的数据）→ ETag → 压缩规格。
+    命中时不调用构建函数、不构建也不校验 Figure；规格仍需解压、json.loads，再由 Streamlit
+    序列化一次（纯 JSON 处理，远小于构建与校验的开销）。内容相同的规格共享同一条目。
+    每次输出的 JSON 逐字节相同，Streamlit 的消息缓存（global.minCachedMessageSize 以上）
+    据此只向浏览器发送哈希引用，不重复传输规格本身。
+    """
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES, max_keys=FIGURE_CACHE_KEYS):
+        self.max_bytes, self.max_keys = max_bytes, max_keys
+        self.lock = threading.Lock()
+        self.keys = collections.OrderedDict()   # 输入键 → ETag
+        self.specs = collections.OrderedDict()  # ETag → (压缩规格, 原始字节数)
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def _compress(data):
+        return brotli.compress(data, quality=5) if brotli is not None else gzip.compress(data, 6)
+
+    @staticmethod
+    def _decompress(blob):
+        return brotli.decompress(blob) if brotli is not None else gzip.decompress(blob)
+
+    def get(self, key):
+        """命中时返回 (ETag, JSON 文本, 原始字节数)，否则 None。"""
+        with self.lock:
+            etag = self.keys.get(key)
+            if etag is None or etag not in self.specs:
+                self.misses += 1
+                return None
+            self.keys.move_to_end(key)
+            self.specs.move_to_end(etag)
+            blob, size = self.specs[etag]
+            self.hits += 1
+        return etag, self._decompress(blob).decode(), size
+
+    def put(self, key, spec):
+        data = spec.encode()
+        etag = hashlib.blake2b(data, digest_size=16).hexdigest()
+        with self.lock:
+            known = etag in self.specs
+        # 压缩在锁外进行；期间条目被淘汰的少见情况在锁内补压缩
+        blob = None if known else self._compress(data)
+        with self.lock:
+            if etag not in self.specs:
+                blob = blob or self._compress(data)
+                self.specs[etag] = (blob, len(data))
+                self.bytes += len(blob)
+            self.keys[key] = etag
+            self.keys.move_to_end(key)
+            while self.bytes > self.max_bytes and len(self.specs) > 1:
+                _, (old, _) = self.specs.popitem(last=False)
+                self.bytes -= len(old)
+                self.evictions += 1
+            while len(self.keys) > self.max_keys:
+                self.keys.popitem(last=False)
+        return etag
+
+    def stats(self):
+        with self.lock:
+            raw = sum(size for _, size in self.specs.values())
+            requests = self.hits + self.misses
+            return {"条目": len(self.specs), "压缩后字节": self.bytes, "原始字节": raw,
+                    "命中": self.hits, "未命中": self.misses, "淘汰": self.evictions,
+                    "命中率": self.hits / requests if requests else 0.0}
+
+    def clear(self):
+        with self.lock:
+            self.keys.clear()
+            self.specs.clear()
+            self.bytes = self.hits = self.misses = self.evictions = 0
+
+
+FIGURES = FigureCache()
+
+
+def _input_key(name, build, inputs):
+    # 构建函数的字节码参与键：修改代码后自动失效（Streamlit 热重载时进程不重启）
+    h = hashlib.blake2b(digest_size=16)
+    h.update(name.encode())
+    h.update(marshal.dumps(build.__code__))
+    h.update(repr(inputs).encode())
+    return h.hexdigest()
+
+
+def cached_chart(name, build, *inputs, **kwargs):
+    """内容只由 inputs 决定的图表：build() 返回 Figure，inputs 为其用到的全部外部数据（需有稳定的 repr）。"""
+    key = _input_key(name, build, inputs)
+    hit = FIGURES.get(key)
+    REGISTRY.inc("qla_cache_requests_total", f"figure:{name}")
+    if hit is None:
+        REGISTRY.inc("qla_cache_misses_total", f"figure:{name}")
+        t0 = time.perf_counter()
+        fig = build()
+        spec = pio.to_json(fig, validate=False)
+        REGISTRY.observe("qla_figure_build_seconds", name, time.perf_counter() - t0)
+        FIGURES.put(key, spec)
+        size = len(spec.encode())
+    else:
+        _, spec, size = hit
+    t0 = time.perf_counter()
+    result = st.plotly_chart(_Spec(spec), **kwargs)
+    REGISTRY.observe("qla_chart_render_seconds", name, time.perf_counter() - t0)
+    REGISTRY.observe("qla_chart_payload_bytes", name, size)
+    return result
+
+
+# ─── 单次重跑剖析 ───
+@contextlib.contextmanager
+def profile():
+    """剖析一次重跑；有 pyinstrument 时用其调用树，否则用 cProfile。结果文本写入 yield 的列表。"""
+    out = []
+    if pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            yield out
+        finally:
+            profiler.stop()
+            out.append(profiler.output_text(unicode=True, color=False))
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield out
+        finally:
+            profiler.disable()
+            buf = io.StringIO()
+            pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(40)
+            out.append(buf.getvalue())
+
+
+# ─── Prometheus 抓取端点 ───
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_metrics(port=None, host=None):
+    """在后台线程提供 /metrics；端口取自参数或 QLA_METRICS_PORT，未配置时不启动。
+
+    默认只监听 127.0.0.1；需要被其他主机抓取时用 QLA_METRICS_HOST 显式指定地址（如 0.0.0.0）。
+    """
+    port = port or os.environ.get("QLA_METRICS_PORT")
+    if not port:
+        return None
+    host = host or os.environ.get("QLA_METRICS_HOST", "127.0.0.1")
+    server = http.server.ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
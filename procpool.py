@@ -0,0 +1,63 @@
+"""进程内共享的进程池：所有会话与后台任务共用一个固定大小的 spawn 进程池。
+
+池的大小固定为 default_workers()，运行中从不关闭或重建（仅在工作进程崩溃、池已损坏时重建），
+因此一个会话的任务不会中断另一个会话的任务；单个任务的并发度由 run() 的 limit 限制。
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+_LOCK = threading.Lock()
+_POOL = None
+
+
+def default_workers():
+    return max(1, min(8, (os.cpu_count() or 1)))
+
+
+def executor():
+    global _POOL
+    with _LOCK:
+        if _POOL is None or _POOL._broken:
+            # spawn：避免在多线程的 Streamlit 服务进程中 fork
+            _POOL = ProcessPoolExecutor(max_workers=default_workers(),
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _POOL
+
+
+@atexit.register
+def _shutdown():
+    with _LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(cancel_futures=True)
+
+
+def run(tasks, limit, stop=None, timeout=0.2):
+    """把 [(函数, 参数元组)] 提交到共享池，同时在途的任务不超过 limit，按完成顺序产出 (序号, 结果)。
+
+    每隔 timeout 秒检查一次 stop()；stop() 为真、或调用方不再迭代时，取消尚未开始的任务
+    （已在运行的任务在池中跑完，结果丢弃）。
+    """
+    pool = executor()
+    queue = iter(enumerate(tasks))
+    running = {}
+    try:
+        while True:
+            while len(running) < max(1, limit):
+                item = next(queue, None)
+                if item is None:
+                    break
+                i, (fn, args) = item
+                running[pool.submit(fn, *args)] = i
+            if not running:
+                return
+            finished, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for f in finished:
+                yield running.pop(f), f.result()
+            if stop is not None and stop():
+                return
+    finally:
+        for f in running:
+            f.cancel()
@@ -0,0 +1,173 @@
+"""薄弱领域 → 学习内容推荐：字符 n-gram TF-IDF 相似度索引。
+
+不依赖标签或词向量：题目、面试题与工具/体系页面的文本切成 2~3 字符片段，
+按 TF-IDF 加权并做 L2 归一化，存为 CSR 稀疏矩阵（文档 × 片段），并保留其转置作为倒排表。
+一次推荐把各薄弱领域的查询文本向量化后与倒排表做一次稀疏矩阵乘法，
+耗时只与查询片段的倒排长度有关，题库很大时也在毫秒级。
+"""
+import re
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+NGRAMS = (2, 3)
+MIN_SCORE = 0.05  # 低于此相似度的结果视为不相关
+
+# 领域名称较短，附上关键词扩展查询（与能力图谱的 12 个领域一一对应）
+AREA_KEYWORDS = {
+    "ISO 9001 七大原则": "ISO 9001 质量管理原则 以顾客为关注焦点 领导作用 过程方法 循证决策 关系管理",
+    "IATF 16949 核心工具": "IATF 16949 汽车 五大工具 APQP PPAP FMEA MSA SPC 控制计划",
+    "FMEA 应用": "FMEA 失效模式 影响分析 严重度 频度 探测度 RPN 行动优先级 AP",
+    "SPC 控制图分析": "SPC 统计过程控制 控制图 控制限 UCL LCL 失控 特殊原因 普通原因",
+    "MSA 测量系统分析": "MSA 测量系统 GR&R 重复性 再现性 偏倚 线性 稳定性 量具",
+    "8D 问题解决": "8D 问题解决 团队 临时措施 根本原因 永久纠正措施 预防再发",
+    "DMAIC 方法论": "DMAIC 定义 测量 分析 改善 控制 六西格玛 项目",
+    "统计假设检验": "假设检验 P值 显著性 t检验 方差分析 ANOVA 卡方 原假设",
+    "过程能力分析(Cpk)": "过程能力 Cp Cpk Pp Ppk 规格限 USL LSL 西格玛水平",
+    "DOE 实验设计": "DOE 实验设计 因子 水平 主效应 交互作用 正交 部分因子",
+    "内部审核技能": "内部审核 审核员 不符合项 审核计划 审核证据 纠正措施",
+    "柏拉图与根因分析": "柏拉图 帕累托 二八原则 鱼骨图 因果图 5Why 根本原因",
+}
+
+_PUNCT = re.compile(r"[\s\W_]+")
+
+
+def _text(obj):
+    """嵌套的字典/列表内容展开为一段文本。"""
+    if isinstance(obj, dict):
+        return " ".join(f"{k} {_text(v)}" for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return " ".join(_text(v) for v in obj)
+    return str(obj)
+
+
+def ngrams(text):
+    # 去掉空白与标点后切片：中文没有空格，字符片段同时覆盖中文词与英文缩写
+    text = _PUNCT.sub("", text.lower())
+    return [text[i:i + n] for n in NGRAMS for i in range(len(text) - n + 1)]
+
+
+def documents(quiz, interview, tools, systems, six_sigma):
+    """把各题库与页面内容整理为 [{kind, title, page, ref, text}]。ref 为在原列表中的位置或小节名。"""
+    docs = []
+    for i, q in enumerate(quiz):
+        docs.append({"kind": "测验题", "title": q["q"], "page": "🧠 随机测验", "ref": i,
+                     "text": _text([q["q"], q["options"], q["explain"]])})
+    for i, q in enumerate(interview):
+        docs.append({"kind": "面试题", "title": q["q"], "page": "💼 面试题库", "ref": i,
+                     "text": _text([q["category"], q["q"], q["a"]])})
+    for cat, data in tools.items():
+        for tool in data["tools"]:
+            docs.append({"kind": "工具", "title": tool["name"], "page": "🔧 质量工具", "ref": cat,
+                         "text": _text(tool)})
+    for name, data in systems.items():
+        docs.append({"kind": "体系", "title": name, "page": "📋 质量体系", "ref": name, "text": f"{name} {_text(data)}"})
+    for name, data in six_sigma.items():
+        docs.append({"kind": "六西格玛", "title": name, "page": "📐 六西格玛", "ref": name, "text": f"{name} {_text(data)}"})
+    return docs
+
+
+class Index:
+    """文档 × 字符片段的 TF-IDF 矩阵（CSR，行已 L2 归一化）。
+
+    词表是排序后的定长字符串数组，查询用二分查找定位片段；索引全部由 numpy 数组构成，
+    可以原样发布到共享内存，由其他进程零拷贝挂载（见 shared.py）。
+    """
+
+    ARRAYS = ["vocab", "idf", "data", "indices", "indptr", "post_data", "post_indices", "post_indptr"]
+
+    def __init__(self, docs):
+        vocab = {}
+        indptr, indices, tf = [0], [], []
+        for doc in docs:
+            counts = Counter(vocab.setdefault(g, len(vocab)) for g in ngrams(doc["text"]))
+            indices.extend(counts)
+            tf.extend(counts.values())
+            indptr.append(len(indices))
+        # 片段编号改为在排序词表中的位置
+        order = np.array(list(vocab), dtype=str).argsort(kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        words = np.array(list(vocab), dtype=str)[order]
+        indices = rank[np.asarray(indices, dtype=np.int64)].astype(np.int32)
+        df = np.bincount(indices, minlength=len(words))
+        idf = np.log((1 + len(docs)) / (1 + df)) + 1
+        # 次线性词频：长文本中反复出现的片段不至于主导相似度
+        data = (1 + np.log(np.asarray(tf, dtype=float))) * idf[indices]
+        matrix = _normalize(sparse.csr_matrix((data, indices, np.asarray(indptr)), shape=(len(docs), len(words))))
+        matrix.sort_indices()
+        # 倒排形式（片段 × 文档）：查询只触及其片段所在的行
+        postings = matrix.T.tocsr()
+        self._attach(docs, words, idf, matrix, postings)
+
+    def _attach(self, docs, vocab, idf, matrix, postings):
+        # 原文只用于建索引，不随索引保留
+        self.docs = [{k: v for k, v in d.items() if k != "text"} for d in docs]
+        self.kinds = np.array([d["kind"] for d in docs])
+        self.vocab, self.idf, self.matrix, self.postings = vocab, idf, matrix, postings
+
+    def arrays(self):
+        m, p = self.matrix, self.postings
+        return dict(zip(self.ARRAYS, (self.vocab, self.idf, m.data, m.indices, m.indptr, p.data, p.indices, p.indptr)))
+
+    @classmethod
+    def from_arrays(cls, docs, arrays):
+        """由 arrays() 的结果（可以是共享内存上的只读数组）重建索引，不复制数据。"""
+        a = arrays
+        shape = (len(a["indptr"]) - 1, len(a["vocab"]))
+        index = cls.__new__(cls)
+        index._attach(docs, a["vocab"], a["idf"],
+                      _csr(a["data"], a["indices"], a["indptr"], shape),
+                      _csr(a["post_data"], a["post_indices"], a["post_indptr"], shape[::-1]))
+        return index
+
+    def vectorize(self, texts):
+        """查询文本 → (查询数, 片段数) CSR；词表外的片段忽略。"""
+        grams = [ngrams(text) for text in texts]
+        rows = np.repeat(np.arange(len(texts)), [len(g) for g in grams])
+        grams = np.array([g for gs in grams for g in gs], dtype=str)
+        cols = np.searchsorted(self.vocab, grams).clip(max=len(self.vocab) - 1)
+        hit = self.vocab[cols] == grams if grams.size else np.zeros(0, dtype=bool)
+        # 重复的 (行, 列) 在转换时累加为词频
+        tf = sparse.csr_matrix((np.ones(hit.sum()), (rows[hit], cols[hit])), shape=(len(texts), len(self.vocab)))
+        tf.sum_duplicates()
+        tf.data = (1 + np.log(tf.data)) * self.idf[tf.indices]
+        return _normalize(tf)
+
+    def scores(self, texts):
+        """(查询数, 文档数) 余弦相似度，CSR：一次稀疏矩阵乘法，只访问查询片段的倒排行。"""
+        return self.vectorize(texts) @ self.postings
+
+    def recommend(self, areas, k=5, kinds=None, min_score=MIN_SCORE):
+        """每个领域取相似度最高的 k 条：{领域: [(文档, 相似度)]}。kinds 限定文档类别。"""
+        if not areas:
+            return {}
+        sim = self.scores([f"{a} {AREA_KEYWORDS.get(a, '')}" for a in areas])
+        result = {}
+        for j, area in enumerate(areas):
+            row = sim.getrow(j)
+            docs, values = row.indices, row.data
+            if kinds is not None:
+                keep = np.isin(self.kinds[docs], list(kinds))
+                docs, values = docs[keep], values[keep]
+            if len(values) > k:
+                part = np.argpartition(-values, k - 1)[:k]
+                docs, values = docs[part], values[part]
+            order = np.argsort(-values)
+            result[area] = [(self.docs[i], float(v)) for i, v in zip(docs[order], values[order]) if v >= min_score]
+        return result
+
+
+def _csr(data, indices, indptr, shape):
+    # 直接设置各分量，避免构造函数对只读数组做检查或复制
+    m = sparse.csr_matrix(shape, dtype=data.dtype)
+    m.data, m.indices, m.indptr = data, indices, indptr
+    m.has_sorted_indices = True
+    return m
+
+
+def _normalize(m):
+    norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ m).tocsr()
@@ -0,0 +1,233 @@
+"""PPAP 报告导出：按特性批量生成单值控制图与过程能力图（PNG/PDF）和汇总表（XLSX），打包为 ZIP。
+
+图表规格直接以 Plotly JSON 字典生成（不经 go.Figure 逐属性校验，可缓存、可跨进程传递）；
+静态图片由共享进程池（procpool）中的 kaleido 按批渲染，一批共用一个浏览器会话。
+kaleido>=1.0（需要 Chrome，且 plotly>=6.1）与 openpyxl 是可选依赖，缺失或版本过旧时对应格式不可选。
+"""
+import importlib.metadata
+import io
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+import capability
+import procpool
+import spc
+
+try:
+    import kaleido
+except ImportError:
+    kaleido = None
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+IMAGE_FORMATS = ["png", "pdf"]
+BATCH = 20  # 每个渲染任务的图表数
+GRID = 200  # 密度曲线的网格点数
+
+# 报告用浅色版式（打印 / 交给客户）
+LAYOUT = {
+    "paper_bgcolor": "white", "plot_bgcolor": "white", "width": 900, "height": 420,
+    "font": {"family": "Noto Sans SC, Microsoft YaHei, sans-serif", "size": 12, "color": "#1a202c"},
+    "xaxis": {"gridcolor": "#e2e8f0", "zeroline": False}, "yaxis": {"gridcolor": "#e2e8f0", "zeroline": False},
+    "margin": {"l": 60, "r": 30, "t": 60, "b": 50}, "legend": {"orientation": "h", "y": -0.15},
+}
+
+
+def _can_render_images():
+    # 批量渲染用的 pio.write_images 需要 plotly>=6.1 与 kaleido>=1.0（旧版 kaleido 不支持）
+    if kaleido is None:
+        return False
+    import plotly.io as pio
+    major = importlib.metadata.version("kaleido").split(".")[0]
+    return hasattr(pio, "write_images") and major.isdigit() and int(major) >= 1
+
+
+def available_formats():
+    formats = list(IMAGE_FORMATS) if _can_render_images() else []
+    if openpyxl is not None:
+        formats.append("xlsx")
+    return formats
+
+
+def study(X, chars, lsl, usl):
+    """全部特性的 SPC 与能力汇总（整列向量化）；同时返回绘图所需的拟合结果。"""
+    X = np.asarray(X, dtype=float)
+    lsl, usl = np.asarray(lsl, dtype=float), np.asarray(usl, dtype=float)
+    fits, best = capability.fit_all(X)
+    cols = np.arange(X.shape[1])
+    caps = {f: capability.capability(f, fits[f]["params"], lsl, usl) for f in capability.FAMILIES}
+    pick = lambda key: np.vstack([caps[f][key] for f in capability.FAMILIES])[best, cols]
+    mean, std = X.mean(axis=0), X.std(axis=0, ddof=1)
+    lcl, cl, ucl = spc.sigma_limits(X, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cp = (usl - lsl) / (6 * std)
+        cpk = np.fmin((usl - mean) / (3 * std), (mean - lsl) / (3 * std))
+    summary = pd.DataFrame({
+        "特性": chars, "n": X.shape[0], "均值": mean, "标准差": std, "LSL": lsl, "USL": usl,
+        "Cp": cp, "Cpk": cpk, "最优分布": ["—" if flat else capability.FAMILIES[b] for b, flat in zip(best, capability.constant_columns(X))],
+        "Ppk（最优分布）": pick("ppk"), "预期PPM": pick("ppm"),
+        "LCL": lcl, "CL": cl, "UCL": ucl, "失控点": ((X < lcl) | (X > ucl)).sum(axis=0),
+    })
+    return summary, fits, best
+
+
+def _best_density(X, fits, best):
+    """每个特性在其最优分布下的密度曲线：按分布族分组，一次计算整组。"""
+    lo, hi = X.min(axis=0), X.max(axis=0)
+    spread = np.where(hi > lo, hi - lo, 1.0)
+    grid = np.linspace(lo - 0.1 * spread, hi + 0.1 * spread, GRID)
+    dens = np.zeros_like(grid)
+    h = spread * 1e-4
+    for k, family in enumerate(capability.FAMILIES):
+        cols = np.flatnonzero(best == k)
+        if cols.size:
+            prm = {key: v[cols] for key, v in fits[family]["params"].items()}
+            g = grid[:, cols]
+            dens[:, cols] = (capability.cdf(family, g + h[cols], prm) - capability.cdf(family, g - h[cols], prm)) / (2 * h[cols])
+    return grid, np.nan_to_num(dens)
+
+
+def _safe_name(name):
+    # 特性名来自上传的 CSV 表头：只保留字母数字（含中文）、下划线与连字符，防止路径穿越
+    return re.sub(r"[^\w\-]+", "_", str(name)).strip("_")[:60] or "特性"
+
+
+def _spec_lines(lsl, usl):
+    shapes = []
+    for v in (lsl, usl):
+        if not np.isnan(v):
+            shapes.append({"type": "line", "xref": "x", "yref": "paper", "x0": v, "x1": v, "y0": 0, "y1": 1,
+                           "line": {"color": "#e53e3e", "width": 2}})
+    return shapes
+
+
+def chart_specs(X, summary, fits, best):
+    """[(文件名, 规格字典)]：每个特性一张单值控制图、一张能力图。"""
+    X = np.asarray(X, dtype=float)
+    grid, dens = _best_density(X, fits, best)
+    index = list(range(1, X.shape[0] + 1))
+    specs = []
+    cols = {c: summary[c].tolist() for c in ["特性", "LCL", "CL", "UCL", "LSL", "USL", "最优分布", "Ppk（最优分布）", "预期PPM"]}
+    for j, name in enumerate(cols["特性"]):
+        stem = f"{j + 1:03d}_{_safe_name(name)}"
+        lcl, cl, ucl = cols["LCL"][j], cols["CL"][j], cols["UCL"][j]
+        family = cols["最优分布"][j]
+        x = X[:, j]
+        ooc = (x < lcl) | (x > ucl)
+        limits = [{"type": "line", "xref": "paper", "x0": 0, "x1": 1, "y0": y, "y1": y,
+                   "line": {"color": color, "width": 1.5, "dash": dash}}
+                  for y, color, dash in ((ucl, "#e53e3e", "dash"), (cl, "#38a169", "solid"), (lcl, "#e53e3e", "dash"))]
+        specs.append((f"{stem}_控制图", {
+            "data": [{"type": "scatter", "mode": "lines+markers", "x": index, "y": x.tolist(), "name": "测量值",
+                      "line": {"color": "#3182ce", "width": 1},
+                      "marker": {"size": 5, "color": np.where(ooc, "#e53e3e", "#3182ce").tolist()}}],
+            "layout": {**LAYOUT, "title": {"text": f"{name} 单值控制图  UCL={ucl:.4g}  CL={cl:.4g}  LCL={lcl:.4g}"},
+                       "shapes": limits, "showlegend": False},
+        }))
+        specs.append((f"{stem}_过程能力", {
+            "data": [
+                {"type": "histogram", "x": x.tolist(), "histnorm": "probability density", "nbinsx": 30,
+                 "name": "数据", "marker": {"color": "rgba(49,130,206,0.35)"}},
+                {"type": "scatter", "mode": "lines", "x": grid[:, j].tolist(), "y": dens[:, j].tolist(),
+                 "name": family, "line": {"color": "#2f855a", "width": 2.5}},
+            ],
+            "layout": {**LAYOUT, "shapes": _spec_lines(cols["LSL"][j], cols["USL"][j]),
+                       "title": {"text": f"{name} 过程能力  最优分布 {family}  "
+                                         f"Ppk={cols['Ppk（最优分布）'][j]:.2f}  预期PPM={cols['预期PPM'][j]:,.0f}"}},
+        }))
+    return specs
+
+
+def render_batch(specs, names, fmt, out_dir):
+    """在工作进程中把一批规格渲染为图片文件；一批共用一个 kaleido 浏览器会话。"""
+    import plotly.io as pio
+    paths = [os.path.join(out_dir, fmt, f"{name}.{fmt}") for name in names]
+    os.makedirs(os.path.join(out_dir, fmt), exist_ok=True)
+    pio.write_images(specs, paths, format=fmt, validate=False)
+    return len(paths)
+
+
+def xlsx_bytes(summary, X, chars):
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        summary.to_excel(writer, sheet_name="汇总", index=False)
+        pd.DataFrame(np.asarray(X), columns=chars).to_excel(writer, sheet_name="原始数据", index=False)
+    return buf.getvalue()
+
+
+class ExportJob:
+    """后台导出任务：在线程中调度进程池渲染并打包，界面只轮询进度，不阻塞会话。"""
+
+    def __init__(self, specs, summary, X, chars, formats, workers=1):
+        self.specs, self.summary, self.X, self.chars = specs, summary, X, chars
+        self.formats = [f for f in formats if f in available_formats()]
+        self.workers = workers
+        n_images = sum(f in IMAGE_FORMATS for f in self.formats)
+        self.total = len(specs) * n_images + ("xlsx" in self.formats)
+        self.done = 0
+        self.result = self.error = None
+        self.started = self.finished = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def _run(self):
+        try:
+            with tempfile.TemporaryDirectory() as out_dir:
+                self._render(out_dir)
+                if self._cancel.is_set():
+                    return
+                buf = io.BytesIO()
+                with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+                    if "xlsx" in self.formats:
+                        zf.writestr("汇总.xlsx", xlsx_bytes(self.summary, self.X, self.chars))
+                        self.done += 1
+                    for root, _, files in os.walk(out_dir):
+                        for f in sorted(files):
+                            zf.write(os.path.join(root, f), os.path.relpath(os.path.join(root, f), out_dir))
+                self.result = buf.getvalue()
+        except Exception as e:  # 渲染异常在界面上显示
+            self.error = e
+        finally:
+            self.finished = time.perf_counter()
+
+    def _render(self, out_dir):
+        names = [name for name, _ in self.specs]
+        specs = [spec for _, spec in self.specs]
+        batches = [(specs[i:i + BATCH], names[i:i + BATCH], fmt, out_dir)
+                   for fmt in self.formats if fmt in IMAGE_FORMATS
+                   for i in range(0, len(specs), BATCH)]
+        if self.workers <= 1:
+            for batch in batches:
+                if self._cancel.is_set():
+                    return
+                self.done += render_batch(*batch)
+            return
+        # 与重抽样共用进程池，本任务同时在途的批次不超过 workers
+        for _, n in procpool.run([(render_batch, batch) for batch in batches], self.workers, stop=self._cancel.is_set):
+            self.done += n
@@ -0,0 +1,135 @@
+"""多进程部署：只读的大型数据（推荐索引等）构建一次，发布为内存映射文件，各工作进程零拷贝挂载。
+
+设置 QLA_SHARED_DIR（建议放在 /dev/shm 下，即内存文件系统）后启用：每个数据集保存为
+<目录>/<名称>-<源码指纹>/ 下的若干 .npy 文件，进程以 mmap 只读方式打开，物理页由所有
+进程共享，新增一个工作进程只增加 Python 基线内存。未设置时在进程内构建，行为与单进程相同。
+
+没有直接使用 multiprocessing.shared_memory：Python 3.13 之前，挂载方进程退出时其
+resource_tracker 会删除共享段，独立启动的多个 Streamlit 进程之间难以管理生命周期；
+/dev/shm 上的文件同样位于内存中，且可由任意进程按路径挂载。
+
+    python shared.py build                          # 预先构建（可选，首个进程也会自动构建）
+    python shared.py serve --workers 4 --port 8501  # 启动 4 个工作进程（8501~8504），前置反向代理
+
+反向代理需要会话粘滞（如 nginx 的 ip_hash），Streamlit 的会话状态保存在各自进程中。
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import content
+import recommend
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SHARED_DIR = os.environ.get("QLA_SHARED_DIR")
+
+
+def fingerprint(*modules):
+    """数据集依赖的模块源码的指纹：题库或算法变化后自动换用新目录。"""
+    h = hashlib.sha1()
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+def publish(path, arrays):
+    """写入临时目录后整体改名，多个进程同时构建时只有一个生效。"""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"arrays": list(arrays), "created": time.time()}, f)
+    try:
+        os.rename(tmp, path)
+    except OSError:  # 其他进程已发布
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def attach(path):
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        names = json.load(f)["arrays"]
+    return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+
+
+def _prune(directory, name, keep):
+    # 旧版本目录可以直接删除：已挂载的进程仍持有映射，直到其退出
+    for entry in os.listdir(directory):
+        if entry.startswith(f"{name}-") and entry != keep and ".tmp-" not in entry:
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+def load(name, build, *modules):
+    """取数据集 {数组名: 数组}：启用共享时挂载（不存在则构建并发布），否则直接构建。"""
+    if not SHARED_DIR:
+        return build()
+    os.makedirs(SHARED_DIR, exist_ok=True)
+    entry = f"{name}-{fingerprint(*modules)}"
+    path = os.path.join(SHARED_DIR, entry)
+    if not os.path.exists(path):
+        publish(path, build())
+        _prune(SHARED_DIR, name, entry)
+    return attach(path)
+
+
+# ─── 数据集 ───
+def recommend_index():
+    docs = recommend.documents(content.QUIZ_QUESTIONS, content.INTERVIEW_QA, content.QUALITY_TOOLS,
+                               content.QUALITY_SYSTEMS, content.SIX_SIGMA)
+    arrays = load("recommend", lambda: recommend.Index(docs).arrays(), content, recommend)
+    return recommend.Index.from_arrays(docs, arrays)
+
+
+ARTIFACTS = {"recommend": recommend_index}
+
+
+def build_all():
+    for name, fn in ARTIFACTS.items():
+        t0 = time.perf_counter()
+        fn()
+        print(f"{name:<12} {time.perf_counter() - t0:6.2f} s")
+
+
+def serve(workers, port, args):
+    build_all()
+    procs = [subprocess.Popen([sys.executable, "-m", "streamlit", "run", os.path.join(ROOT, "app.py"),
+                               "--server.port", str(port + i), "--server.headless", "true", *args])
+             for i in range(workers)]
+    print(f"工作进程端口 {port}~{port + workers - 1}，共享目录 {SHARED_DIR}")
+    try:
+        for p in procs:
+            p.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs:
+            p.send_signal(signal.SIGTERM)
+
+
+def main():
+    global SHARED_DIR
+    parser = argparse.ArgumentParser(description="构建共享只读数据集 / 启动多个工作进程")
+    parser.add_argument("command", choices=["build", "serve"])
+    parser.add_argument("--dir", default=SHARED_DIR or "/dev/shm/qla", help="共享目录（默认 QLA_SHARED_DIR 或 /dev/shm/qla）")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8501, help="第一个工作进程的端口")
+    args, extra = parser.parse_known_args()
+
+    SHARED_DIR = os.environ["QLA_SHARED_DIR"] = args.dir  # 子进程继承
+    if args.command == "build":
+        build_all()
+    else:
+        serve(args.workers, args.port, extra)
+
+
+if __name__ == "__main__":
+    main()
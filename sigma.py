@@ -0,0 +1,96 @@
+"""西格玛水平换算：DPMO、合格率、PPM 与 σ 水平互换，以及多工序的滚动合格率（RTY）。
+
+全部基于 scipy.special 的 ndtr / ndtri（标准正态分布函数及其反函数，内部用 erfc 计算），
+输入可以是整列数组，一次向量化换算。约定：
+    σ 水平（短期）= 长期 Z + 漂移，漂移默认 1.5σ；不含漂移时 shift=0
+    单侧：缺陷率 p = Φ(shift − σ)；双侧：另加 Φ(−σ − shift)（规格两侧都可能超差）
+    PPM 为每百万“单位”不良数：每单位 m 个缺陷机会相互独立时，单位合格率 = (1 − p)^m
+RTY 在对数域累加（Σ log 合格率），上千道工序也不会下溢。
+"""
+import numpy as np
+import pandas as pd
+from scipy import special
+
+SHIFT = 1.5
+KINDS = ["σ水平", "DPMO", "PPM", "合格率(%)"]
+
+
+def defect_rate(sigma, shift=SHIFT, two_sided=False):
+    sigma = np.asarray(sigma, dtype=float)
+    p = special.ndtr(shift - sigma)
+    if two_sided:
+        p = p + special.ndtr(-sigma - shift)
+    return p
+
+
+def sigma_level(p, shift=SHIFT, two_sided=False, iters=30):
+    """缺陷率 → σ 水平。双侧且有漂移时无闭式解，从单侧解出发逐元素牛顿迭代。"""
+    p = np.asarray(p, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if not two_sided:
+            return shift - special.ndtri(p)
+        if shift == 0:
+            return -special.ndtri(p / 2)
+        z = shift - special.ndtri(p)
+        ok = np.isfinite(z)
+        for _ in range(iters):
+            f = defect_rate(z, shift, True) - p
+            df = -(np.exp(-0.5 * (z - shift) ** 2) + np.exp(-0.5 * (z + shift) ** 2)) / np.sqrt(2 * np.pi)
+            step = np.where(ok, f / np.where(df == 0, -np.inf, df), 0)
+            z = z - step
+            if not np.any(np.abs(step) > 1e-12):
+                break
+        return z
+
+
+def unit_defect_rate(p, opportunities=1):
+    # 1 − (1 − p)^m，用 log1p / expm1 保持小概率时的精度
+    return -np.expm1(opportunities * np.log1p(-np.asarray(p, dtype=float)))
+
+
+def opportunity_defect_rate(p_unit, opportunities=1):
+    return -np.expm1(np.log1p(-np.asarray(p_unit, dtype=float)) / opportunities)
+
+
+def convert(values, kind, shift=SHIFT, two_sided=False, opportunities=1):
+    """把一列数值（kind 为 KINDS 之一）换算为全部指标的表格。"""
+    values = np.asarray(values, dtype=float)
+    if kind == "σ水平":
+        p = defect_rate(values, shift, two_sided)
+    elif kind == "DPMO":
+        p = values / 1e6
+    elif kind == "PPM":
+        p = opportunity_defect_rate(values / 1e6, opportunities)
+    elif kind == "合格率(%)":
+        p = 1 - values / 100
+    else:
+        raise ValueError(f"未知指标：{kind}")
+    p = np.where((p >= 0) & (p <= 1), p, np.nan)
+    unit = unit_defect_rate(p, opportunities)
+    return pd.DataFrame({
+        "输入": values, "σ水平": sigma_level(p, shift, two_sided), "DPMO": p * 1e6,
+        "合格率(%)": (1 - p) * 100, "PPM": unit * 1e6, "单位合格率(%)": (1 - unit) * 100,
+    })
+
+
+def level_table(levels=np.arange(1, 7), two_sided=False):
+    """σ 水平对照表：不含漂移与含 1.5σ 漂移两种口径。"""
+    levels = np.asarray(levels, dtype=float)
+    p0, p1 = defect_rate(levels, 0, two_sided), defect_rate(levels, SHIFT, two_sided)
+    return pd.DataFrame({
+        "σ水平": [f"{s:g}σ" for s in levels],
+        "合格率(%)（无漂移）": (1 - p0) * 100, "DPMO（无漂移）": p0 * 1e6,
+        "合格率(%)（1.5σ漂移）": (1 - p1) * 100, "DPMO（1.5σ漂移）": p1 * 1e6,
+    })
+
+
+def rolled_throughput_yield(yields):
+    """各工序一次合格率（0~1）→ (累计 RTY 数组, 总 RTY, log10 总 RTY, 归一化合格率 RTY^(1/n))。
+
+    总 RTY 极小而下溢为 0 时，log10 值仍然有效。
+    """
+    with np.errstate(divide="ignore"):
+        log_y = np.log(np.clip(np.asarray(yields, dtype=float), 0, 1))
+    cumulative = np.cumsum(log_y)
+    total = cumulative[-1]
+    return np.exp(cumulative), float(np.exp(total)), float(total / np.log(10)), float(np.exp(total / len(log_y)))
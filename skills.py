@@ -0,0 +1,273 @@
+"""能力图谱存储：工程师自评历史（SQLite）与按团队/部门预聚合的分布，增量维护。
+
+assessments 每次自评一行（记录当时所在团队），12 个领域的分数打包为 12 字节 BLOB。
+group_stats 保存每个 (层级, 分组, 领域) 在各人“最新一次自评”下的 1~5 分人数；
+团队层级的分组名带部门前缀（“部门 / 团队”），不同部门的同名团队分开统计。
+trend_stats 保存每个 (层级, 分组, 月份, 领域) 当月全部自评的 1~5 分人数。
+均值与分布都由人数直方图得到；新增一次自评只改动该人所在团队/部门的 12 行计数，
+读取热力图只扫描 分组数×12 行，与人数无关。
+"""
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+AREAS = [
+    "ISO 9001 七大原则", "IATF 16949 核心工具", "FMEA 应用", "SPC 控制图分析",
+    "MSA 测量系统分析", "8D 问题解决", "DMAIC 方法论", "统计假设检验",
+    "过程能力分析(Cpk)", "DOE 实验设计", "内部审核技能", "柏拉图与根因分析",
+]
+N_AREAS = len(AREAS)
+LEVELS = {"team": "团队", "department": "部门"}
+STATS_VERSION = 1  # 预聚合表的分组口径；低于此版本的库在打开时重建
+COUNT_COLUMNS = ", ".join(f"c{k}" for k in range(1, 6))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY, team TEXT NOT NULL, department TEXT NOT NULL, UNIQUE (team, department)
+);
+CREATE TABLE IF NOT EXISTS engineers (
+    id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, team_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS assessments (
+    engineer_id INTEGER NOT NULL, ts INTEGER NOT NULL, team_id INTEGER NOT NULL, scores BLOB NOT NULL,
+    PRIMARY KEY (engineer_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS group_stats (
+    level TEXT NOT NULL, grp TEXT NOT NULL, area INTEGER NOT NULL,
+    c1 INTEGER NOT NULL DEFAULT 0, c2 INTEGER NOT NULL DEFAULT 0, c3 INTEGER NOT NULL DEFAULT 0,
+    c4 INTEGER NOT NULL DEFAULT 0, c5 INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (level, grp, area)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS trend_stats (
+    level TEXT NOT NULL, grp TEXT NOT NULL, period TEXT NOT NULL, area INTEGER NOT NULL,
+    c1 INTEGER NOT NULL DEFAULT 0, c2 INTEGER NOT NULL DEFAULT 0, c3 INTEGER NOT NULL DEFAULT 0,
+    c4 INTEGER NOT NULL DEFAULT 0, c5 INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (level, grp, period, area)
+) WITHOUT ROWID;
+"""
+
+
+def pack(scores):
+    scores = np.asarray(scores, dtype=np.uint8)
+    if scores.shape[-1] != N_AREAS or scores.min() < 1 or scores.max() > 5:
+        raise ValueError(f"需要 {N_AREAS} 个 1~5 的分数")
+    return scores.tobytes()
+
+
+def unpack(blob):
+    return np.frombuffer(blob, dtype=np.uint8)
+
+
+def _label(text, what):
+    # 姓名/团队/部门：空白（含制表符、换行）压缩为单个空格
+    text = " ".join(str(text).split())
+    if not text:
+        raise ValueError(f"{what}不能为空")
+    return text
+
+
+def groups_of(team, department):
+    """按 LEVELS 的顺序返回一条自评所属的各层级分组名。"""
+    return f"{department} / {team}", department
+
+
+def period(ts):
+    return time.strftime("%Y-%m", time.localtime(ts))
+
+
+def _histogram(scores):
+    """(人数, 12) 分数 → (12, 5) 人数直方图。"""
+    scores = np.asarray(scores, dtype=np.int64).reshape(-1, N_AREAS)
+    flat = np.arange(N_AREAS) * 5 + scores - 1
+    return np.bincount(flat.ravel(), minlength=N_AREAS * 5).reshape(N_AREAS, 5)
+
+
+def mean_of(counts):
+    counts = np.asarray(counts, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (counts * np.arange(1, 6)).sum(axis=-1) / counts.sum(axis=-1)
+
+
+class SkillStore:
+    """共享一个 SQLite 连接（check_same_thread=False），所有读写都在 self.lock 下进行。"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < STATS_VERSION:
+            self.rebuild()
+            self.conn.execute(f"PRAGMA user_version = {STATS_VERSION}")
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM engineers").fetchone()[0]
+
+    def _team(self, team, department):
+        self.conn.execute("INSERT OR IGNORE INTO teams (team, department) VALUES (?, ?)", (team, department))
+        return self.conn.execute("SELECT id FROM teams WHERE team = ? AND department = ?",
+                                 (team, department)).fetchone()[0]
+
+    def _engineer(self, name, team_id):
+        row = self.conn.execute("SELECT id FROM engineers WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return self.conn.execute("INSERT INTO engineers (name, team_id) VALUES (?, ?)", (name, team_id)).lastrowid
+        self.conn.execute("UPDATE engineers SET team_id = ? WHERE id = ?", (team_id, row[0]))
+        return row[0]
+
+    def _add(self, table, keys, hist, sign=1):
+        """把 (12, 5) 直方图按 sign 累加到 table 中 keys 对应的 12 行。"""
+        cols = [f"c{k}" for k in range(1, 6)]
+        key_cols = {"group_stats": "level, grp", "trend_stats": "level, grp, period"}[table]
+        marks = ", ".join("?" * (len(keys) + 1 + 5))
+        updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in cols)
+        self.conn.executemany(
+            f"INSERT INTO {table} ({key_cols}, area, {COUNT_COLUMNS}) VALUES ({marks}) "
+            f"ON CONFLICT DO UPDATE SET {updates}",
+            [(*keys, area, *(sign * int(c) for c in hist[area])) for area in range(N_AREAS)])
+
+    def record(self, name, team, department, scores, ts=None):
+        """保存一次自评并增量更新预聚合：该人旧的最新分数从其当时的团队/部门中扣除，新分数加入。"""
+        ts = int(time.time() if ts is None else ts)
+        name, team, department = _label(name, "姓名"), _label(team, "团队"), _label(department, "部门")
+        blob = pack(scores)
+        hist = _histogram(unpack(blob))
+        with self.lock, self.conn:
+            team_id = self._team(team, department)
+            eid = self._engineer(name, team_id)
+            query = ("SELECT a.ts, a.scores, t.team, t.department FROM assessments a JOIN teams t ON t.id = a.team_id "
+                     "WHERE a.engineer_id = ? {} ORDER BY a.ts DESC LIMIT 1")
+            last = self.conn.execute(query.format(""), (eid,)).fetchone()
+            same = self.conn.execute(query.format("AND a.ts = ?"), (eid, ts)).fetchone()
+            if same is not None:  # 同一秒内重复保存：替换原记录
+                for level, grp in zip(LEVELS, groups_of(*same[2:])):
+                    self._add("trend_stats", (level, grp, period(ts)), _histogram(unpack(same[1])), sign=-1)
+                self.conn.execute("DELETE FROM assessments WHERE engineer_id = ? AND ts = ?", (eid, ts))
+            self.conn.execute("INSERT INTO assessments VALUES (?, ?, ?, ?)", (eid, ts, team_id, blob))
+            for level, grp in zip(LEVELS, groups_of(team, department)):
+                self._add("trend_stats", (level, grp, period(ts)), hist)
+            if last is not None and last[0] > ts:
+                return  # 补录的历史自评不影响“最新”分布
+            if last is not None:
+                for level, grp in zip(LEVELS, groups_of(*last[2:])):
+                    self._add("group_stats", (level, grp), _histogram(unpack(last[1])), sign=-1)
+            for level, grp in zip(LEVELS, groups_of(team, department)):
+                self._add("group_stats", (level, grp), hist)
+
+    def record_many(self, people, scores, ts):
+        """批量导入：people 为 [(姓名, 团队, 部门)]，scores (行数, 12)，ts (行数,)；之后整体重建预聚合。"""
+        scores = np.asarray(scores, dtype=np.uint8)
+        people = [(_label(n, "姓名"), _label(t, "团队"), _label(d, "部门")) for n, t, d in people]
+        with self.lock, self.conn:
+            teams = {key: self._team(*key) for key in dict.fromkeys(p[1:] for p in people)}
+            ids = {p[0]: self._engineer(p[0], teams[p[1:]]) for p in dict.fromkeys(people)}
+            self.conn.executemany("INSERT OR REPLACE INTO assessments VALUES (?, ?, ?, ?)",
+                                  [(ids[p[0]], int(t), teams[p[1:]], pack(s)) for p, s, t in zip(people, scores, ts)])
+        self.rebuild()
+
+    def rebuild(self):
+        """从 assessments 全量重建两张预聚合表（批量导入或校验时使用）。"""
+        # 整个重建持有锁：读取与写回之间不能插入新的自评
+        with self.lock, self.conn:
+            rows = self.conn.execute(
+                "SELECT a.engineer_id, a.ts, a.scores, t.team, t.department "
+                "FROM assessments a JOIN teams t ON t.id = a.team_id ORDER BY a.engineer_id, a.ts").fetchall()
+            if not rows:
+                return
+            group_rows, trend_rows = _aggregate(rows)
+            self.conn.execute("DELETE FROM group_stats")
+            self.conn.execute("DELETE FROM trend_stats")
+            self.conn.executemany(f"INSERT INTO group_stats VALUES (?, ?, ?, {', '.join('?' * 5)})", group_rows)
+            self.conn.executemany(f"INSERT INTO trend_stats VALUES (?, ?, ?, ?, {', '.join('?' * 5)})", trend_rows)
+
+    def _read(self, query, args):
+        with self.lock:
+            return self.conn.execute(query, args).fetchall()
+
+    def heatmap(self, level):
+        """各分组 × 领域：人数直方图 (分组数, 12, 5)；只读预聚合表。"""
+        # 人员调出后计数归零的分组不显示
+        rows = self._read(f"SELECT grp, area, {COUNT_COLUMNS} FROM group_stats WHERE level = ? "
+                          f"AND grp IN (SELECT grp FROM group_stats WHERE level = ? GROUP BY grp "
+                          f"HAVING SUM({' + '.join(f'c{k}' for k in range(1, 6))}) > 0) "
+                          "ORDER BY grp, area", (level, level))
+        groups = list(dict.fromkeys(r[0] for r in rows))
+        counts = np.zeros((len(groups), N_AREAS, 5), dtype=np.int64)
+        index = {g: i for i, g in enumerate(groups)}
+        for r in rows:
+            counts[index[r[0]], r[1]] = r[2:]
+        return groups, counts
+
+    def trend(self, level, grp):
+        """某分组按月的人数直方图 (月份数, 12, 5)。"""
+        rows = self._read(f"SELECT period, area, {COUNT_COLUMNS} FROM trend_stats "
+                          "WHERE level = ? AND grp = ? ORDER BY period, area", (level, grp))
+        periods = list(dict.fromkeys(r[0] for r in rows))
+        counts = np.zeros((len(periods), N_AREAS, 5), dtype=np.int64)
+        index = {p: i for i, p in enumerate(periods)}
+        for r in rows:
+            counts[index[r[0]], r[1]] = r[2:]
+        return periods, counts
+
+    def history(self, name):
+        rows = self._read("SELECT a.ts, a.scores FROM assessments a JOIN engineers e ON e.id = a.engineer_id "
+                          "WHERE e.name = ? ORDER BY a.ts", (name,))
+        return [r[0] for r in rows], np.array([unpack(r[1]) for r in rows]).reshape(-1, N_AREAS)
+
+    def engineer(self, name):
+        rows = self._read("SELECT t.team, t.department FROM engineers e JOIN teams t ON t.id = e.team_id "
+                          "WHERE e.name = ?", (name,))
+        return rows[0] if rows else None
+
+
+def _aggregate(rows):
+    """(engineer_id, ts, scores, team, department) 行（按人、时间排序）→ 两张预聚合表的全部行。"""
+    eid = np.array([r[0] for r in rows])
+    scores = np.frombuffer(b"".join(r[2] for r in rows), dtype=np.uint8).reshape(-1, N_AREAS).astype(np.int64)
+    m_codes, m_labels = _factorize([period(r[1]) for r in rows])
+    latest = np.r_[eid[1:] != eid[:-1], True]  # 按 (人, 时间) 排序后每人最后一行
+    grps = [groups_of(r[3], r[4]) for r in rows]
+    group_rows, trend_rows = [], []
+    for i, level in enumerate(LEVELS):
+        g_codes, g_labels = _factorize([g[i] for g in grps])
+        hist = _grouped_histogram(g_codes[latest], scores[latest], len(g_labels))
+        group_rows += [(level, g, a, *map(int, hist[j, a])) for j, g in enumerate(g_labels) for a in range(N_AREAS)]
+        # (分组, 月份) 按编码对合并，不拼接字符串
+        k_codes, keys = _factorize(g_codes * len(m_labels) + m_codes)
+        hist = _grouped_histogram(k_codes, scores, len(keys))
+        for j, key in enumerate(keys):
+            grp, month = g_labels[key // len(m_labels)], m_labels[key % len(m_labels)]
+            trend_rows += [(level, grp, month, a, *map(int, hist[j, a])) for a in range(N_AREAS)]
+    return group_rows, trend_rows
+
+
+def _factorize(values):
+    labels, codes = np.unique(values, return_inverse=True)
+    return codes, labels.tolist()
+
+
+def _grouped_histogram(codes, scores, n_groups):
+    """按分组统计 (分组数, 12, 5) 人数：一次 bincount。"""
+    flat = (codes[:, None] * N_AREAS + np.arange(N_AREAS)) * 5 + scores - 1
+    return np.bincount(flat.ravel(), minlength=n_groups * N_AREAS * 5).reshape(n_groups, N_AREAS, 5)
+
+
+def seed_demo(store, n_people=5000, n_rounds=6, seed=42):
+    """演示组织：8 个部门、每部门若干团队，每人每两个月自评一次，能力逐步提升。"""
+    rng = np.random.default_rng(seed)
+    departments = ["质量部", "制造一部", "制造二部", "研发中心", "供应链", "工艺部", "测试中心", "客户质量"]
+    teams = [(f"{k + 1}组", d) for d in departments for k in range(6)]  # 各部门的团队同名
+    team_of = rng.integers(0, len(teams), n_people)
+    level = np.clip(rng.normal(2.6, 0.6, (len(teams), N_AREAS)), 1.2, 4.2)
+    now = time.time()
+    people, scores, ts = [], [], []
+    for r in range(n_rounds):
+        t = now - (n_rounds - 1 - r) * 61 * 86400
+        s = np.clip(np.rint(level[team_of] + 0.12 * r + rng.normal(0, 0.8, (n_people, N_AREAS))), 1, 5)
+        for i in range(n_people):
+            people.append((f"E{i + 1:05d}", *teams[team_of[i]]))
+        scores.append(s)
+        ts.append(np.full(n_people, int(t)) - rng.integers(1, 86400 * 20, n_people))
+    store.record_many(people, np.vstack(scores), np.concatenate(ts))
@@ -0,0 +1,30 @@
+"""SPC 与柏拉图的计算核心（向量化），页面与 benchmarks/ 共用。"""
+import numpy as np
+
+
+def sigma_limits(x, k=3, axis=None):
+    """(LCL, CL, UCL)：均值 ± kσ（σ 取总体标准差，与控制图演示一致）；axis=0 时按列计算。"""
+    x = np.asarray(x, dtype=float)
+    mean, std = x.mean(axis=axis), x.std(axis=axis)
+    return mean - k * std, mean, mean + k * std
+
+
+def out_of_control(x, limits):
+    lcl, _, ucl = limits
+    x = np.asarray(x, dtype=float)
+    return (x < lcl) | (x > ucl)
+
+
+def defect_counts(records):
+    """缺陷记录（每条一个类别）→ 各类别名称与数量。"""
+    names, counts = np.unique(np.asarray(records), return_counts=True)
+    return names, counts
+
+
+def pareto(names, counts):
+    """按数量降序排列，返回 (名称, 数量, 累计百分比)。"""
+    counts = np.asarray(counts)
+    order = np.argsort(-counts, kind="stable")
+    counts = counts[order]
+    cumulative = np.cumsum(counts) / counts.sum() * 100
+    return np.asarray(names)[order], counts, cumulative
@@ -0,0 +1,139 @@
+"""假设检验工作台：经典检验 + 分块、多进程的 Bootstrap / 置换检验。
+
+重抽样以索引矩阵 (块大小, n) 一次性向量化计算；块大小按内存预算确定，
+各块使用独立的 SeedSequence 子种子，结果与进程数无关、可复现。
+"""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import procpool
+
+STATISTICS = {
+    "mean": np.mean,
+    "median": np.median,
+    "std": lambda a, axis: np.std(a, axis=axis, ddof=1),
+}
+STAT_NAMES = {"mean": "均值", "median": "中位数", "std": "标准差"}
+
+CHUNK_BYTES = 32 * 2 ** 20
+INLINE_WORK = 2_000_000  # 重抽样总元素数低于此值时不启用进程池
+
+
+def one_sample_t(x, mu0):
+    r = stats.ttest_1samp(x, mu0)
+    return {"检验": "单样本 t 检验", "统计量": r.statistic, "P值": r.pvalue, "H₀": f"μ = {mu0}"}
+
+
+def two_sample_t(a, b):
+    r = stats.ttest_ind(a, b, equal_var=False)
+    return {"检验": "双样本 t 检验 (Welch)", "统计量": r.statistic, "P值": r.pvalue, "H₀": "μ₁ = μ₂"}
+
+
+def paired_t(a, b):
+    r = stats.ttest_rel(a, b)
+    return {"检验": "配对 t 检验", "统计量": r.statistic, "P值": r.pvalue, "H₀": "μ_d = 0"}
+
+
+def one_way_anova(groups):
+    r = stats.f_oneway(*groups)
+    return {"检验": "单因子方差分析 ANOVA", "统计量": r.statistic, "P值": r.pvalue, "H₀": "各组均值相等"}
+
+
+def mann_whitney(a, b):
+    r = stats.mannwhitneyu(a, b, alternative="two-sided")
+    return {"检验": "Mann-Whitney U 检验", "统计量": r.statistic, "P值": r.pvalue, "H₀": "两组分布位置相同"}
+
+
+def kruskal_wallis(groups):
+    r = stats.kruskal(*groups)
+    return {"检验": "Kruskal-Wallis 检验", "统计量": r.statistic, "P值": r.pvalue, "H₀": "各组中位数相等"}
+
+
+def wilcoxon_signed_rank(a, b):
+    r = stats.wilcoxon(a, b)
+    return {"检验": "Wilcoxon 符号秩检验", "统计量": r.statistic, "P值": r.pvalue, "H₀": "配对差值中位数为 0"}
+
+
+def chi_square(table):
+    chi2, p, dof, _ = stats.chi2_contingency(table)
+    return {"检验": f"卡方独立性检验 (df={dof})", "统计量": chi2, "P值": p, "H₀": "两变量独立"}
+
+
+def chunk_size(n, n_resamples):
+    # 索引矩阵 int64 + 取值后的 float64 矩阵
+    return int(max(1, min(n_resamples, CHUNK_BYTES // (16 * max(n, 1)))))
+
+
+def _bootstrap_chunk(x, stat, size, seed):
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(x), size=(size, len(x)))
+    return STATISTICS[stat](x[idx], axis=1)
+
+
+def _permutation_chunk(pooled, n_a, stat, size, seed):
+    rng = np.random.default_rng(seed)
+    # 每行独立打乱（逐行 Fisher-Yates）
+    shuffled = rng.permuted(np.broadcast_to(pooled, (size, len(pooled))), axis=1)
+    f = STATISTICS[stat]
+    return f(shuffled[:, :n_a], axis=1) - f(shuffled[:, n_a:], axis=1)
+
+
+def _run_chunks(fn, args, n, n_resamples, seed, workers, progress):
+    size = chunk_size(n, n_resamples)
+    sizes = [size] * (n_resamples // size) + ([n_resamples % size] if n_resamples % size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    results = [None] * len(sizes)
+    done = 0
+
+    if workers <= 1 or n * n_resamples < INLINE_WORK:
+        for i, (s, ss) in enumerate(zip(sizes, seeds)):
+            results[i] = fn(*args, s, ss)
+            done += s
+            if progress:
+                progress(done, n_resamples)
+        return np.concatenate(results)
+
+    # 共享进程池，本任务同时在途的块不超过 workers；
+    # 页面中断（progress 回调抛出异常）时 procpool.run 丢弃尚未开始的块
+    tasks = [(fn, (*args, s, ss)) for s, ss in zip(sizes, seeds)]
+    for i, result in procpool.run(tasks, workers):
+        results[i] = result
+        done += sizes[i]
+        if progress:
+            progress(done, n_resamples)
+    return np.concatenate(results)
+
+
+def bootstrap_ci(x, stat="mean", n_resamples=100_000, alpha=0.05, seed=0, workers=1, progress=None):
+    """百分位 Bootstrap 置信区间。"""
+    x = np.asarray(x, dtype=float)
+    if not len(x):
+        raise ValueError("样本为空")
+    dist = _run_chunks(_bootstrap_chunk, (x, stat), len(x), n_resamples, seed, workers, progress)
+    lo, hi = np.quantile(dist, [alpha / 2, 1 - alpha / 2])
+    return {"estimate": float(STATISTICS[stat](x, axis=0)), "ci": (lo, hi), "se": dist.std(ddof=1),
+            "distribution": dist}
+
+
+def permutation_test(a, b, stat="mean", n_resamples=100_000, seed=0, workers=1, progress=None):
+    """双样本置换检验（双侧），统计量为两组 stat 之差。"""
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if not len(a) or not len(b):
+        raise ValueError("两组样本都不能为空")
+    f = STATISTICS[stat]
+    observed = f(a, axis=0) - f(b, axis=0)
+    pooled = np.concatenate([a, b])
+    dist = _run_chunks(_permutation_chunk, (pooled, len(a), stat), len(pooled), n_resamples, seed,
+                       workers, progress)
+    p = (np.count_nonzero(np.abs(dist) >= abs(observed)) + 1) / (n_resamples + 1)
+    return {"observed": float(observed), "p": p, "distribution": dist}
+
+
+def demo_frame(seed=42):
+    rng = np.random.default_rng(seed)
+    lines = np.repeat(["产线A", "产线B", "产线C"], 40)
+    value = np.concatenate([rng.normal(10.0, 0.5, 40), rng.normal(10.3, 0.5, 40), rng.gamma(20, 0.5, 40)])
+    shift = np.tile(np.repeat(["白班", "夜班"], 20), 3)
+    defect = np.where(rng.random(120) < np.where(shift == "夜班", 0.25, 0.1), "不良", "良品")
+    return pd.DataFrame({"line": lines, "shift": shift, "value": value, "result": defect})
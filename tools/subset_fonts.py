@@ -0,0 +1,69 @@
+"""生成 static/fonts/ 下的字体子集（woff2），只保留应用源码中出现的字符。
+
+从 Google Fonts / Noto 官方仓库下载原始字体（可在有外网的机器上完成）后运行：
+
+    pip install fonttools brotli
+    python tools/subset_fonts.py NotoSansSC-Light.ttf NotoSansSC-Regular.ttf NotoSansSC-Bold.ttf \\
+        Rajdhani-SemiBold.ttf Rajdhani-Bold.ttf
+
+Google Fonts 只提供 Noto Sans SC 的可变字体时，也可以使用 Noto Sans CJK SC 的 OTF（字形相同），
+先重命名为 NotoSansSC-<字重>.otf。输出文件名沿用原文件名（扩展名改为 .woff2），并打印对应的 [[theme.fontFaces]] 段落，
+首次生成后追加到 .streamlit/config.toml。题库或界面文字增加后重新运行即可。
+"""
+import argparse
+import glob
+import os
+import string
+
+from fontTools import subset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUT = os.path.join(ROOT, "static", "fonts")
+# 数字、字母、常用标点与符号始终保留
+ALWAYS = string.printable + "，。、；：？！“”‘’（）【】《》—…·×÷±≤≥≈≠σμ²³√∑Δ→←↑↓°％"
+FAMILIES = {"NotoSansSC": "Noto Sans SC", "Rajdhani": "Rajdhani"}
+WEIGHTS = {"Light": 300, "Regular": 400, "Medium": 500, "SemiBold": 600, "Bold": 700}
+
+
+def font_face(filename):
+    """NotoSansSC-Bold.woff2 → config.toml 中的 [[theme.fontFaces]] 段落。"""
+    family, _, style = os.path.splitext(filename)[0].partition("-")
+    return (f'[[theme.fontFaces]]\nfamily = "{FAMILIES.get(family, family)}"\n'
+            f'url = "app/static/fonts/{filename}"\nweight = {WEIGHTS.get(style, 400)}\n')
+
+
+def used_text():
+    chars = set(ALWAYS)
+    for path in glob.glob(os.path.join(ROOT, "*.py")) + [os.path.join(ROOT, "static", "style.css")]:
+        with open(path, encoding="utf-8") as f:
+            chars.update(f.read())
+    return "".join(sorted(c for c in chars if c.isprintable()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按应用用字生成 woff2 字体子集")
+    parser.add_argument("fonts", nargs="+", help="原始 TTF/OTF 字体文件")
+    parser.add_argument("--out", default=OUT)
+    args = parser.parse_args()
+
+    text = used_text()
+    os.makedirs(args.out, exist_ok=True)
+    faces = []
+    for path in args.fonts:
+        target = os.path.join(args.out, os.path.splitext(os.path.basename(path))[0] + ".woff2")
+        options = subset.Options()
+        options.flavor = "woff2"
+        options.layout_features = ["*"]
+        font = subset.load_font(path, options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=text)
+        subsetter.subset(font)
+        subset.save_font(font, target, options)
+        print(f"{os.path.basename(target)}: {os.path.getsize(path) / 1024:.0f} KiB → {os.path.getsize(target) / 1024:.0f} KiB")
+        faces.append(font_face(os.path.basename(target)))
+    print("\n# 追加到 .streamlit/config.toml（已有相同段落时无需重复添加）：\n")
+    print("\n".join(faces))
+
+
+if __name__ == "__main__":
+    main()